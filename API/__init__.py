@@ -25,6 +25,9 @@ if not os.path.exists(PATH_CONFIG.RESULT_ML_PREPROCESS_TRANS_DIR) or not os.path
 if not os.path.exists(PATH_CONFIG.RESULT_ML_MODEL_DIR) or not os.path.isdir(PATH_CONFIG.RESULT_ML_MODEL_DIR):
     os.mkdir(PATH_CONFIG.RESULT_ML_MODEL_DIR)
 
+if not os.path.exists(PATH_CONFIG.RESULT_ML_FEATURE_CACHE_DIR) or not os.path.isdir(PATH_CONFIG.RESULT_ML_FEATURE_CACHE_DIR):
+    os.mkdir(PATH_CONFIG.RESULT_ML_FEATURE_CACHE_DIR)
+
 if not os.path.exists(PATH_CONFIG.RESULT_DL_ORIGINAL_DATA_DIR) or not os.path.isdir(PATH_CONFIG.RESULT_DL_ORIGINAL_DATA_DIR):
     os.mkdir(PATH_CONFIG.RESULT_DL_ORIGINAL_DATA_DIR)
 
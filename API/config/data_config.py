@@ -0,0 +1,72 @@
+# API/config
+import os
+
+
+class DATA_CONFIG:
+
+    # 전처리 데이터(P_*) 저장 형식 => 'npz'(컬럼 단위 바이너리) 또는 'original'(원본 확장자와 동일)
+    PREPROCESSED_DATA_FORMAT = os.environ.get('ANALYTICS_PREPROCESSED_DATA_FORMAT', 'npz')
+
+    # 원본 데이터(O_*) 등록시 컬럼 단위 바이너리 사본(O_*.npz)을 함께 저장할지 여부
+    ORIGINAL_DATA_COLUMNAR_COPY = True
+
+    # 청크 단위로 읽을 때 한 번에 읽는 행 수
+    DATA_CHUNK_ROWS = 100000
+
+    # 파일 크기가 이 값(byte)보다 크면 DataSummary 를 청크 단위(StreamingDataSummary)로 계산
+    STREAMING_SUMMARY_MIN_BYTES = 256 * 1024 * 1024
+
+    # 근사 통계 모드 사용 여부 (HyperLogLog/Misra-Gries/분위수 스케치로 DataSummary 계산)
+    APPROX_SUMMARY = os.environ.get('ANALYTICS_APPROX_SUMMARY', 'false').lower() == 'true'
+
+    # 근사 통계 허용 오차 (고유값 수 상대오차, 빈도 오차/전체 행 수, 분위수 순위 오차)
+    APPROX_SUMMARY_ERROR = 0.01
+
+    # 근사 통계 모드에서 bar 그래프에 저장하는 최대 범주 수
+    APPROX_SUMMARY_TOP_K = 20
+
+    # 청크 단위 통계(정확 모드)에서 범주형 컬럼 빈도표의 최대 고유값 수
+    # (넘으면 그 컬럼만 HyperLogLog/Misra-Gries 근사 통계로 전환해서 메모리를 제한)
+    SUMMARY_CATEGORICAL_COUNTS_LIMIT = int(os.environ.get('ANALYTICS_SUMMARY_CATEGORICAL_COUNTS_LIMIT', 100000))
+
+    # DataSummary 컬럼 통계를 나눠 계산할 프로세스 수 (1 => 순차 계산, 0 => CPU 코어 수)
+    SUMMARY_N_JOBS = int(os.environ.get('ANALYTICS_SUMMARY_N_JOBS', 0))
+
+    # 컬럼 수가 이 값보다 적으면 순차 계산 (프로세스 생성 비용이 더 큼)
+    SUMMARY_PARALLEL_MIN_COLUMNS = 16
+
+    # 전처리 데이터를 파일로 저장하는 동안 메모리의 데이터로 DataSummary 를 함께 계산할지 여부
+    SUMMARY_WHILE_SAVING = True
+
+    # 전처리 테스트(원본 데이터 PATCH) 기본 방식 => 'stratified', 'sample' 또는 'exact'
+    # (sample/stratified 는 최대 PREVIEW_SAMPLE_ROWS 행으로 fit, exact 는 전체 행으로 fit)
+    # (stratified 는 숫자가 아닌 필드의 범주별 행 수 비율대로 추출)
+    PREVIEW_MODE = os.environ.get('ANALYTICS_PREVIEW_MODE', 'stratified')
+    PREVIEW_SAMPLE_ROWS = 10000
+
+    # 서로 다른 필드의 전처리 단계를 동시에 수행할 스레드 수 (1 => 순차 수행, 0 => CPU 코어 수)
+    PREPROCESS_N_JOBS = int(os.environ.get('ANALYTICS_PREPROCESS_N_JOBS', 0))
+
+    # 프로세스별 DataFrame 캐시 최대 크기(byte), 0 이면 캐시를 사용하지 않음
+    # (웹 서버 프로세스마다 따로 보관하므로 프로세스 수 x 이 값까지 메모리를 사용할 수 있음)
+    DATA_CACHE_MAX_BYTES = int(os.environ.get('ANALYTICS_DATA_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    # celery worker 프로세스의 DataFrame 캐시 최대 크기(byte), 기본값 0 => worker 에서는 사용하지 않음
+    # (worker 프로세스(-c)마다 따로 보관하고 작업마다 다른 데이터를 로드하는 경우가 많으므로 필요한 경우에만 설정)
+    DATA_CACHE_WORKER_MAX_BYTES = int(os.environ.get('ANALYTICS_DATA_CACHE_WORKER_MAX_BYTES', 0))
+
+    # 컬럼 단위 전처리 결과 캐시(디스크) 최대 크기(byte), 0 이면 캐시를 사용하지 않음
+    FEATURE_CACHE_MAX_BYTES = int(os.environ.get('ANALYTICS_FEATURE_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+
+    # 원본 파일 크기가 이 값(byte)보다 크면 전처리를 청크 단위(StreamingPreprocessTask)로 수행
+    STREAMING_PREPROCESS_MIN_BYTES = int(os.environ.get('ANALYTICS_STREAMING_PREPROCESS_MIN_BYTES', 1024 * 1024 * 1024))
+
+    # 전처리 작업 허용 판단 (cost_estimator) => 예상 최대 메모리(byte)가 이 값보다 크면 거부(4022)
+    # (0 => worker 가 실행되는 서버 전체 메모리의 80%)
+    PREPROCESS_WORKER_MEMORY_BYTES = int(os.environ.get('ANALYTICS_PREPROCESS_WORKER_MEMORY_BYTES', 0))
+
+    # 예상 실행 시간(초)이 이 값보다 긴 전처리 작업은 PREPROCESS_LONG_JOB_QUEUE 큐로 보냄
+    PREPROCESS_LONG_JOB_SECONDS = int(os.environ.get('ANALYTICS_PREPROCESS_LONG_JOB_SECONDS', 600))
+
+    # 긴 전처리 작업을 보낼 celery 큐 이름 ('' => 큐를 나누지 않고 기본 큐에서 실행)
+    # (큐를 지정하면 해당 큐를 처리하는 worker 를 따로 실행해야 함, eg. -Q preprocess_long)
+    PREPROCESS_LONG_JOB_QUEUE = os.environ.get('ANALYTICS_PREPROCESS_LONG_JOB_QUEUE', '')
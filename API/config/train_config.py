@@ -0,0 +1,73 @@
+# API/config
+import os
+
+
+class TRAIN_CONFIG:
+
+    # 모델 검증 전략 ('validation_strategy' 를 요청하지 않은 경우 사용)
+    # cv_holdout(교차검증 + 홀드아웃), cv_fold_holdout(교차검증 fold 하나를 홀드아웃으로 사용),
+    # cv_only(교차검증만), holdout_only(홀드아웃만), adaptive(행 수와 예상 fit 시간으로 선택)
+    # (기본값은 기존 방식인 cv_holdout, 빠른 전략은 요청 또는 환경변수로 선택)
+    VALIDATION_STRATEGY = os.environ.get('ANALYTICS_VALIDATION_STRATEGY', 'cv_holdout')
+    VALIDATION_STRATEGIES = ['cv_holdout', 'cv_fold_holdout', 'cv_only', 'holdout_only', 'adaptive']
+
+    # 교차검증 (KFold)
+    CV_N_SPLITS = 5
+    CV_RANDOM_STATE = 2019
+    # cv_fold_holdout 에서 홀드아웃 점수로 사용할 fold 번호
+    CV_HOLDOUT_FOLD = 0
+
+    # 홀드아웃 검증 (train_test_split)
+    HOLDOUT_TEST_SIZE = 0.3
+    HOLDOUT_RANDOM_STATE = 2019
+
+    # adaptive => 이 행 수로 한 번 fit 해서 전체 데이터의 fit 시간을 추정
+    ADAPTIVE_PROBE_ROWS = 5000
+    # adaptive => 행 수가 이 값보다 많거나 교차검증 예상 시간(초)이 이 값보다 길면 holdout_only
+    ADAPTIVE_CV_MAX_ROWS = int(os.environ.get('ANALYTICS_ADAPTIVE_CV_MAX_ROWS', 1000000))
+    ADAPTIVE_CV_MAX_SECONDS = int(os.environ.get('ANALYTICS_ADAPTIVE_CV_MAX_SECONDS', 600))
+
+    # 학습 작업 하나가 사용할 CPU 코어 수 (교차검증 fold 병렬 수 x 모델 내부 스레드 수)
+    # (0 => 서버 CPU 코어 수 // TRAIN_WORKER_CONCURRENCY, worker 마다 환경변수로 다르게 지정 가능)
+    TRAIN_CPU_BUDGET = int(os.environ.get('ANALYTICS_TRAIN_CPU_BUDGET', 0))
+    # 같은 서버에서 동시에 실행되는 학습 작업 수 (celery worker 의 -c 값과 같게 설정)
+    # (0 => CELERYD_CONCURRENCY 설정값, 설정하지 않은 경우 CPU 코어 수(celery 기본값))
+    TRAIN_WORKER_CONCURRENCY = int(os.environ.get('ANALYTICS_TRAIN_WORKER_CONCURRENCY', 0))
+
+    # 학습 실행 방식 ('execution_mode' 를 요청하지 않은 경우 사용)
+    # local(worker 하나에서 학습), distributed(검증 fit/최종 fit 을 celery 하위 작업으로 나눠 여러 worker 에서 학습)
+    # (distributed 는 학습 데이터/모델 경로를 모든 worker 가 공유하는 스토리지에 두어야 함)
+    TRAIN_EXECUTION_MODE = os.environ.get('ANALYTICS_TRAIN_EXECUTION_MODE', 'local')
+    TRAIN_EXECUTION_MODES = ['local', 'distributed']
+    # distributed 학습의 제한 시간(초), 하위 작업이 이 시간 안에 끝나지 않으면 중지하고 학습 실패로 저장
+    DISTRIBUTED_TRAIN_TIMEOUT = int(os.environ.get('ANALYTICS_DISTRIBUTED_TRAIN_TIMEOUT', 6 * 60 * 60))
+
+    # 희소 행렬(csr_matrix)로 학습하는 모델 클래스명 (희소 컬럼이 있는 데이터, 그 외 모델은 dense 로 변환해서 학습)
+    # (쉼표로 구분한 환경변수 값의 클래스명을 추가)
+    SPARSE_ESTIMATORS = [
+        'LinearRegression', 'Ridge', 'RidgeClassifier', 'Lasso', 'ElasticNet', 'LogisticRegression',
+        'SGDClassifier', 'SGDRegressor', 'Perceptron', 'PassiveAggressiveClassifier', 'PassiveAggressiveRegressor',
+        'LinearSVC', 'LinearSVR', 'SVC', 'SVR', 'KNeighborsClassifier', 'KNeighborsRegressor',
+        'DecisionTreeClassifier', 'DecisionTreeRegressor', 'RandomForestClassifier', 'RandomForestRegressor',
+        'ExtraTreesClassifier', 'ExtraTreesRegressor', 'GradientBoostingClassifier', 'GradientBoostingRegressor',
+        'AdaBoostClassifier', 'AdaBoostRegressor', 'MultinomialNB', 'BernoulliNB', 'ComplementNB',
+        'MLPClassifier', 'MLPRegressor', 'LGBMClassifier', 'LGBMRegressor',
+    ] + [name.strip() for name in os.environ.get('ANALYTICS_SPARSE_ESTIMATORS', '').split(',') if name.strip()]
+
+    # 하이퍼파라미터 탐색 ('search' 요청, hyperparameter_search.py 참고)
+    SEARCH_METHODS = ['grid', 'random', 'halving', 'hyperband']
+    # halving/hyperband 에서 단계마다 늘리는 자원 (학습 행 수 또는 n_estimators)
+    SEARCH_RESOURCES = ['rows', 'n_estimators']
+    # random/halving 후보 수 (hyperband 는 가장 공격적인 halving 의 후보 수)
+    SEARCH_N_CANDIDATES = 27
+    # halving 에서 다음 단계로 남기는 비율(1/factor)과 자원 증가 배수
+    SEARCH_FACTOR = 3
+    # 요청 하나에서 평가하는 최대 trial 수 (grid 조합 수 포함)
+    SEARCH_MAX_TRIALS = 200
+    # resource='rows' 인 경우 가장 작은 단계의 최소 행 수
+    SEARCH_MIN_ROWS = 500
+    # resource='n_estimators' 인 경우 모델의 n_estimators 가 정수가 아니면 사용할 최대 n_estimators
+    SEARCH_MAX_N_ESTIMATORS = 100
+    SEARCH_RANDOM_STATE = 2019
+    # SEARCH_SUMMARY 에 저장할 상위 trial 수
+    SEARCH_LEADERBOARD_SIZE = 20
@@ -13,6 +13,12 @@ class OriginalData(models.Model):
     SAMPLE_DATA=models.TextField()
     AMOUNT=models.BigIntegerField()
     DELETE_FLAG=models.BooleanField(default=False)
+    # 비동기 등록 작업 상태 (기존 데이터는 동기 방식으로 등록이 끝난 상태이므로 기본값 success)
+    PROGRESS_STATE=models.CharField(max_length=30, default='success')
+    PROGRESS_START_DATETIME=models.DateTimeField(blank=True, null=True)
+    PROGRESS_END_DATETIME=models.DateTimeField(blank=True, null=True)
+    # 파일 내용 해시 (sha256, 전처리 결과 재사용에 사용)
+    FILE_HASH=models.CharField(max_length=64, blank=True, null=True)
 
     class Meta:
         managed = True
@@ -7,6 +7,9 @@ class PreprocessedData(models.Model):
     FILEPATH = models.CharField(max_length=300, blank=True)
     FILENAME = models.CharField(max_length=100, blank=True)
     SUMMARY = models.TextField(blank=True)
+    PIPELINE_FILENAME = models.CharField(max_length=100, blank=True, null=True)
+    REQUEST_FINGERPRINT = models.CharField(max_length=64, blank=True, null=True)
+    TELEMETRY = models.TextField(blank=True, null=True)
     CREATE_DATETIME = models.DateTimeField(auto_now_add=True)
     PROGRESS_STATE = models.CharField(max_length=30, default='standby')
     PROGRESS_START_DATETIME = models.DateTimeField(blank=True, null=True)
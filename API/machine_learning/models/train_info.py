@@ -8,6 +8,7 @@ class TrainInfo(models.Model):
     FILENAME = models.CharField(max_length=100, blank=True)
     TRAIN_SUMMARY = models.TextField(blank=True)
     VALIDATION_SUMMARY = models.TextField(blank=True)
+    SEARCH_SUMMARY = models.TextField(blank=True)
     CREATE_DATETIME = models.DateTimeField(auto_now_add=True)
     PROGRESS_STATE = models.CharField(max_length=30, default='standby')
     PROGRESS_START_DATETIME = models.DateTimeField(blank=True, null=True)
@@ -17,6 +18,8 @@ class TrainInfo(models.Model):
     ORIGINAL_DATA_SEQUENCE_FK1 = models.BigIntegerField()
     PREPROCESSED_DATA_SEQUENCE_FK2 = models.BigIntegerField(null=True)
     JOB_ID = models.CharField(max_length=100, blank=True)
+    CPU_BUDGET = models.IntegerField(blank=True, null=True)
+    SUBTASK_IDS = models.TextField(blank=True)
     
     class Meta:
         managed = True
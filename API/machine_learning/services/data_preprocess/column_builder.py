@@ -0,0 +1,101 @@
+# API/ml/services/data_preprocess
+"""
+전처리 결과 컬럼을 모아두었다가 마지막에 한 번만 DataFrame 으로 만드는 빌더
+
+전처리 단계마다 pd.concat([data, new_columns], axis=1) 과 data.drop(field_name) 을
+하면 매번 전체 데이터가 복사되므로, 컬럼명 => 1차원 배열 목록만 바꾸고
+to_frame() 에서 한 번만 DataFrame 을 생성함
+(OneHotEncoder 등의 2차원 결과는 열 단위 view 로 보관하므로 복사하지 않음,
+ 희소 행렬 결과는 행렬 하나(csc)와 열 번호(SparseColumn)로만 보관하고
+ to_frame() 에서 행렬의 값을 공유하는 희소 컬럼으로 만듦 => 열 단위 슬라이싱/dense 변환 없음)
+"""
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from pandas._libs.sparse import IntIndex
+
+# 희소 행렬 'matrix' 의 'position' 번째 열
+SparseColumn = namedtuple("SparseColumn", ["matrix", "position"])
+
+
+def _column_array(values):
+    # SparseColumn => csc 행렬의 data/indices 를 공유하는 1차원 SparseArray, 그 외 => 그대로
+    if not isinstance(values, SparseColumn):
+        return values
+    matrix = values.matrix
+    start, end = matrix.indptr[values.position], matrix.indptr[values.position + 1]
+    return pd.arrays.SparseArray(matrix.data[start:end], dtype=pd.SparseDtype(matrix.dtype, 0),
+                                 sparse_index=IntIndex(matrix.shape[0], matrix.indices[start:end]))
+
+
+class ColumnBlockBuilder:
+    """
+    Ordered column name => 1-D array mapping with DataFrame like access
+
+        Attributes:
+        -----------
+            index (pandas.Index) : index of source data
+            blocks (OrderedDict) : column name => 1-D values or SparseColumn
+    """
+
+    def __init__(self, data):
+        self.index = data.index
+        self.blocks = OrderedDict((name, data[name].array if isinstance(
+            data[name].dtype, pd.SparseDtype) else data[name].values) for name in data.columns)
+
+    def subset(self, names):
+        """
+        Return new builder having only 'names' columns (sharing arrays, no copy)
+        """
+        builder = ColumnBlockBuilder.__new__(ColumnBlockBuilder)
+        builder.index = self.index
+        builder.blocks = OrderedDict((name, self.blocks[name]) for name in names if name in self.blocks)
+        return builder
+
+    @property
+    def columns(self):
+        return list(self.blocks.keys())
+
+    def __contains__(self, name):
+        return name in self.blocks
+
+    def __getitem__(self, name):
+        return pd.Series(_column_array(self.blocks[name]), index=self.index, name=name)
+
+    def __setitem__(self, name, values):
+        # 새 컬럼이면 마지막에 추가, 있으면 같은 위치에서 교체
+        if sparse.issparse(values):
+            values = values.toarray()
+        if values.ndim == 2 and values.shape[1] == 1:
+            values = values[:, 0]
+        self.blocks[name] = values
+
+    def values_of(self, name):
+        """
+        Return values of column 'name' as dense numpy array
+        """
+        return np.asarray(_column_array(self.blocks[name]))
+
+    def drop(self, name):
+        del self.blocks[name]
+
+    def expand(self, name, new_names, block):
+        """
+        Replace column 'name' with columns of 2-D 'block' appended at the end
+        (same order as pd.concat([data, new_columns], axis=1).drop(name, axis=1))
+        """
+        if sparse.issparse(block):
+            block = block.tocsc()
+            block.sort_indices()  # SparseArray 의 위치는 정렬되어 있어야 함
+            self.blocks.update((new_name, SparseColumn(block, i)) for i, new_name in enumerate(new_names))
+            del self.blocks[name]
+            return
+        for i, new_name in enumerate(new_names):
+            self.blocks[new_name] = block[:, i]
+        del self.blocks[name]
+
+    def to_frame(self):
+        return pd.DataFrame(OrderedDict((name, _column_array(values)) for name, values in self.blocks.items()),
+                            index=self.index, columns=self.columns)
@@ -0,0 +1,366 @@
+# API/ml/services/data_preprocess
+"""
+컬럼 통계 엔진 (DataSummary.statistics_info 에서 사용)
+
+컬럼마다 값을 한 번만 numpy 배열로 변환한 뒤 결측값 수, 최솟값/최댓값,
+평균/표준편차, 사분위수, 히스토그램(numpy.histogram), 빈도 상위 범주를
+벡터 연산으로 계산함 (isna/unique/describe/value_counts 반복 호출 없음)
+
+ColumnAccumulator 는 같은 결과를 청크 단위로 누적/병합해서 계산함
+(StreamingDataSummary 에서 사용)
+
+ColumnAccumulator(approx=True) 는 근사 통계 모드로, 고유값 수는 HyperLogLog,
+빈도 상위 범주는 Misra-Gries, 히스토그램/분위수는 QuantileSketch 로 계산하고
+bar 그래프의 범주는 top_k 개까지만 저장함 (고유값이 매우 많은 ID 컬럼 등)
+정확 모드에서도 범주형 컬럼의 고유값 수가 DATA_CONFIG.SUMMARY_CATEGORICAL_COUNTS_LIMIT 를 넘으면
+그 컬럼은 같은 방법(HyperLogLog, Misra-Gries)으로 전환함
+"""
+import numpy as np
+import pandas as pd
+
+from .sketches import QuantileSketch, StreamingHistogram, HyperLogLog, MisraGries
+from ....config.data_config import DATA_CONFIG
+
+HISTOGRAM_BINS = 10
+NUMERICAL_DTYPES = ["float64", "float32", "int64", "int32"]
+QUANTILE_NAMES = ["min", "25%", "50%", "75%", "max"]
+# 수치형 컬럼이 범주형으로 판정될 경우(0/1 컬럼 등)를 대비해 유지하는 빈도표의 최대 크기
+NUMERICAL_COUNTS_LIMIT = 1000
+
+
+def _is_binary(valid):
+    """
+    Return True if values are exactly {0, 1} (encoded binary column)
+    """
+    return (valid.size > 0 and valid.min() == 0 and valid.max() == 1
+            and bool(np.all((valid == 0) | (valid == 1))))
+
+
+def numerical_summary(valid, nan_count, n_distinct=None):
+    """
+    Return histogram graph data of numerical column
+
+        Parameters:
+        -----------
+             valid (numpy.ndarray) : float values without nan
+             nan_count (int) : number of nan values
+             n_distinct (int) : number of distinct values (None => counted from 'valid')
+
+        Returns:
+        --------
+             ("histogram", compact_data) (tuple)
+    """
+    freq, bins = np.histogram(valid, bins=HISTOGRAM_BINS)
+    bins_means = (bins[:-1] + bins[1:]) / 2
+    quantiles = np.percentile(valid, [0, 25, 50, 75, 100])
+    std = valid.std(ddof=1) if valid.size > 1 else np.nan
+    if n_distinct is None:
+        n_distinct = len(pd.unique(valid))
+    return "histogram", {"bins_means": list(map(str, np.round(bins_means, decimals=3))),
+                         "frequency": list(map(str, np.round(freq.astype(float), decimals=3))),
+                         "additional_info": {"valid": str(valid.size),
+                                             "nan": str(nan_count),
+                                             "distinct": str(n_distinct),
+                                             "mean": str(valid.mean()),
+                                             "std": str(std),
+                                             "quantiles": dict(zip(QUANTILE_NAMES, quantiles.tolist()))}}
+
+
+def categorical_summary(value_counts, total, nan_count, n_distinct=None, error=0.0):
+    """
+    Return count/pie/bar graph data of categorical column
+
+        Parameters:
+        -----------
+             value_counts (pandas.Series) : value_counts() of column (nan excluded)
+             total (int) : number of rows
+             nan_count (int) : number of nan values
+             n_distinct (int) : number of distinct values (nan excluded),
+                                None => len(value_counts)
+             error (float) : relative error of n_distinct (approximate mode)
+
+        Returns:
+        --------
+             (graph_type, compact_data) (tuple)
+    """
+    if n_distinct is None:
+        n_distinct = len(value_counts)
+    n_distinct = n_distinct + (1 if nan_count else 0)
+    if n_distinct >= total * (1 - error):
+        return "count", {"elements": "unique",
+                         "frequency": [str(total)],
+                         "additional_info": {"nan": str(nan_count)}}
+    elements = value_counts.index.tolist()
+    frequency = list(map(str, value_counts.values.tolist()))
+    if n_distinct < 3:
+        return "pie", {"elements": elements,
+                       "frequency": frequency,
+                       "additional_info": {"valid": str(total - nan_count),
+                                           "nan": str(nan_count)}}
+    return "bar", {"elements": elements,
+                   "frequency": frequency,
+                   "additional_info": {"valid": str(total - nan_count),
+                                       "nan": str(nan_count),
+                                       "most_frequence": str(elements[0])}}
+
+
+def profile_column(col_data):
+    """
+    Return column type and graph data of single column in one pass
+
+        Parameters:
+        -----------
+             col_data (pandas.Series) : single column of data
+
+        Returns:
+        --------
+             (data_type, graph_type, compact_data) (tuple) :
+             data_type is 'numerical' or 'categorical'
+    """
+    total = len(col_data)
+    if str(col_data.dtype) in NUMERICAL_DTYPES:
+        values = np.asarray(col_data, dtype=np.float64)
+        nan_mask = np.isnan(values)
+        nan_count = int(nan_mask.sum())
+        valid = values[~nan_mask] if nan_count else values
+        # 전부 결측값이거나 0/1 로만 이루어진 컬럼은 범주형으로 취급
+        if nan_count < total and not (nan_count == 0 and _is_binary(valid)):
+            return ("numerical",) + numerical_summary(valid, nan_count)
+    else:
+        nan_count = int(col_data.isna().sum())
+    value_counts = col_data.value_counts(dropna=True, sort=True)
+    return ("categorical",) + categorical_summary(value_counts, total, nan_count)
+
+
+def _add_counts(counts, new_counts):
+    if counts is None:
+        return new_counts
+    return counts.add(new_counts, fill_value=0)
+
+
+class ColumnAccumulator:
+    """
+    Mergeable statistics of single column computed chunk by chunk
+
+    평균/분산은 병합 가능한 모멘트(n, mean, M2)로, 히스토그램은 적응형 bin 으로,
+    분위수는 QuantileSketch 로 계산하므로 메모리는 청크 크기에만 비례함
+    (범주형 컬럼의 빈도표는 DATA_CONFIG.SUMMARY_CATEGORICAL_COUNTS_LIMIT 까지 고유값 수에 비례하고
+     넘으면 근사 통계로 전환, approx=True 이면 error 에만 비례)
+
+        Attributes:
+        -----------
+            total (int) : number of rows
+            nan_count (int) : number of nan values
+            numerical (bool) : True, if every chunk had numerical dtype
+            n, mean, m2 (float) : moments of valid numerical values
+            vmin, vmax (float) : min and max of valid numerical values
+            value_counts (pandas.Series) : frequency of values (nan excluded)
+            counts_overflow (bool) : True, if value_counts exceeded its limit (value_counts is None)
+            approx (bool) : True, if approximate mode
+            distinct (HyperLogLog) : distinct count of values (approximate mode,
+                                     또는 빈도표가 한도를 넘은 경우)
+            heavy (MisraGries) : frequent values (approximate mode,
+                                 또는 범주형 빈도표가 한도를 넘은 경우)
+            binary (bool) : True, if every valid value is 0 or 1 (approximate mode)
+    """
+
+    def __init__(self, approx=False, error=0.01, top_k=20):
+        self.total = 0
+        self.nan_count = 0
+        self.numerical = True
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.vmin = np.inf
+        self.vmax = -np.inf
+        self.value_counts = None
+        self.counts_overflow = False
+        self.approx = approx
+        self.error = error
+        self.top_k = top_k
+        if approx:
+            self.histogram = None
+            self.sketch = QuantileSketch.from_error(error)
+            self.distinct = HyperLogLog.from_error(error)
+            self.heavy = MisraGries.from_error(error, min_capacity=top_k)
+            self.binary = True
+        else:
+            self.histogram = StreamingHistogram()
+            self.sketch = QuantileSketch()
+            self.distinct = None
+            self.heavy = None
+
+    def _merge_moments(self, n, mean, m2):
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+    def _keep_counts(self, new_counts):
+        if self.counts_overflow:
+            return
+        self.value_counts = _add_counts(self.value_counts, new_counts)
+        if self.numerical and len(self.value_counts) > NUMERICAL_COUNTS_LIMIT:
+            # 이후 고유값 수는 HyperLogLog 로 추정 (지금까지의 고유값으로 시작)
+            self.distinct = self._counts_distinct()
+            self.value_counts = None
+            self.counts_overflow = True
+        elif not self.numerical and len(self.value_counts) > DATA_CONFIG.SUMMARY_CATEGORICAL_COUNTS_LIMIT:
+            # 이후 고유값 수/빈도 상위 범주는 근사 통계 모드와 같이 계산 (지금까지의 빈도표로 시작)
+            self.distinct, self.heavy = self._counts_distinct(), self._counts_heavy()
+            self.value_counts = None
+            self.counts_overflow = True
+
+    def _counts_distinct(self):
+        distinct = HyperLogLog.from_error(self.error)
+        if self.value_counts is not None:
+            distinct.update(self.value_counts.index.values)
+        return distinct
+
+    def _counts_heavy(self):
+        heavy = MisraGries.from_error(self.error, min_capacity=self.top_k)
+        if self.value_counts is not None:
+            heavy.add_counts(self.value_counts)
+        return heavy
+
+    def _sketches(self):
+        # 빈도표(또는 한도를 넘은 뒤의 스케치)를 (HyperLogLog, MisraGries) 로 반환
+        if not self.counts_overflow:
+            return self._counts_distinct(), self._counts_heavy()
+        if self.heavy is None:  # 수치형 빈도표가 한도를 넘은 경우 빈도는 유지하지 않음
+            return self.distinct, MisraGries.from_error(self.error, min_capacity=self.top_k)
+        return self.distinct, self.heavy
+
+    def update(self, col_data):
+        self.total += len(col_data)
+        if self.numerical and str(col_data.dtype) not in NUMERICAL_DTYPES:
+            # 문자열이 섞인 컬럼은 전체를 읽었을 때와 같이 범주형으로 취급
+            # (빈도표 한도를 넘었던 앞 청크의 수치값은 범주형 빈도표에서 빠짐)
+            self.numerical = False
+            self.counts_overflow = False
+            self.distinct = HyperLogLog.from_error(self.error) if self.approx else None
+            if not self.approx:
+                self.heavy = None
+        if not self.numerical:
+            if self.approx or self.counts_overflow:
+                valid = col_data.dropna()
+                self.nan_count += len(col_data) - len(valid)
+                self.distinct.update(valid)
+                self.heavy.update(valid)
+                return
+            self.nan_count += int(col_data.isna().sum())
+            self._keep_counts(col_data.value_counts(dropna=True))
+            return
+
+        values = np.asarray(col_data, dtype=np.float64)
+        nan_mask = np.isnan(values)
+        self.nan_count += int(nan_mask.sum())
+        valid = values[~nan_mask]
+        if valid.size == 0:
+            return
+        mean = valid.mean()
+        self._merge_moments(valid.size, mean, float(((valid - mean) ** 2).sum()))
+        self.vmin = min(self.vmin, valid.min())
+        self.vmax = max(self.vmax, valid.max())
+        self.sketch.update(valid)
+        if self.approx:
+            self.distinct.update(valid)
+            # 0/1 컬럼(범주형으로 취급)인 동안에만 빈도를 셈
+            self.binary = self.binary and bool(np.all((valid == 0) | (valid == 1)))
+            if self.binary:
+                self.heavy.update(valid)
+            return
+        self.histogram.update(valid)
+        if self.counts_overflow:
+            self.distinct.update(valid)
+        else:
+            self._keep_counts(pd.Series(valid).value_counts())
+
+    def merge(self, other):
+        self.total += other.total
+        self.nan_count += other.nan_count
+        self.numerical = self.numerical and other.numerical
+        self._merge_moments(other.n, other.mean, other.m2)
+        self.vmin = min(self.vmin, other.vmin)
+        self.vmax = max(self.vmax, other.vmax)
+        self.sketch.merge(other.sketch)
+        if self.approx:
+            self.binary = self.binary and other.binary
+            self.distinct.merge(other.distinct)
+            self.heavy.merge(other.heavy)
+            return self
+        self.histogram.merge(other.histogram)
+        if self.numerical and (self.counts_overflow or other.counts_overflow):
+            distinct = self.distinct if self.counts_overflow else self._counts_distinct()
+            self.distinct = distinct.merge(other.distinct if other.counts_overflow
+                                           else other._counts_distinct())
+            self.value_counts = None
+            self.counts_overflow = True
+        elif not self.numerical and (self.counts_overflow or other.counts_overflow):
+            (distinct, heavy), (other_distinct, other_heavy) = self._sketches(), other._sketches()
+            self.distinct, self.heavy = distinct.merge(other_distinct), heavy.merge(other_heavy)
+            self.value_counts = None
+            self.counts_overflow = True
+        elif other.value_counts is not None:
+            self._keep_counts(other.value_counts)
+        return self
+
+    def _is_binary(self):
+        if self.approx:
+            return self.nan_count == 0 and self.binary and self.vmin == 0 and self.vmax == 1
+        return (self.nan_count == 0 and self.vmin == 0 and self.vmax == 1
+                and self.value_counts is not None and len(self.value_counts) == 2)
+
+    def _n_distinct(self):
+        if self.distinct is not None and (self.approx or self.counts_overflow):
+            return min(int(round(self.distinct.estimate())), self.n)
+        return len(self.value_counts) if self.value_counts is not None else 0
+
+    def _numerical_summary(self):
+        value_range = (self.vmin, self.vmax)
+        if self.approx:
+            freq, bins = self.sketch.histogram(HISTOGRAM_BINS, value_range)
+        else:
+            freq, bins = self.histogram.histogram(HISTOGRAM_BINS, value_range)
+        bins_means = (bins[:-1] + bins[1:]) / 2
+        quantiles = self.sketch.quantiles([0.25, 0.5, 0.75]).tolist()
+        quantiles = [float(self.vmin)] + quantiles + [float(self.vmax)]
+        std = np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+        return "histogram", {"bins_means": list(map(str, np.round(bins_means, decimals=3))),
+                             "frequency": list(map(str, np.round(freq.astype(float), decimals=3))),
+                             "additional_info": {"valid": str(self.n),
+                                                 "nan": str(self.nan_count),
+                                                 "distinct": str(self._n_distinct()),
+                                                 "mean": str(self.mean),
+                                                 "std": str(std),
+                                                 "quantiles": dict(zip(QUANTILE_NAMES, quantiles))}}
+
+    def _approx_categorical_summary(self):
+        value_counts = self.heavy.top(self.top_k)
+        if self.numerical:
+            # 수치형 컬럼은 0/1 (또는 전부 결측값) 인 경우에만 여기로 오므로 빈도가 정확함
+            n_distinct = len(self.heavy.counts)
+            value_counts.index = value_counts.index.astype(np.int64)
+        else:
+            n_distinct = min(int(round(self.distinct.estimate())), self.total - self.nan_count)
+        return categorical_summary(value_counts, self.total, self.nan_count,
+                                   n_distinct=n_distinct, error=self.error)
+
+    def result(self):
+        """
+        Return (data_type, graph_type, compact_data) like `profile_column`
+        """
+        if self.numerical and self.n > 0 and not self._is_binary():
+            return ("numerical",) + self._numerical_summary()
+        if self.approx or self.counts_overflow:
+            return ("categorical",) + self._approx_categorical_summary()
+        value_counts = self.value_counts
+        if value_counts is None:
+            value_counts = pd.Series([], dtype=np.int64)
+        value_counts = value_counts.astype(np.int64).sort_values(ascending=False, kind="mergesort")
+        if self.numerical and (value_counts.index == value_counts.index.astype(np.int64)).all():
+            value_counts.index = value_counts.index.astype(np.int64)
+        return ("categorical",) + categorical_summary(value_counts, self.total, self.nan_count)
@@ -0,0 +1,349 @@
+# API/ml/services/data_preprocess
+"""
+전처리 실행 비용 추정 및 작업 허용(admission) 판단 (PreprocessedData 생성 요청시 사용)
+
+    입력 : OriginalData.AMOUNT(행 수), STATISTICS(컬럼별 type, 고유값 수), 요청한 전처리 단계
+    계수 : 전처리 기능(PREPROCESS_FUNCTIONS_NAME)별 행당 fit_transform 시간(초)과
+           셀당 로드/저장/요약 시간(초, '__io__')
+           => `calibrate_cost_coefficients` 로 합성 데이터에 벤치마크해서 COST_COEFFICIENTS_PATH 에 저장
+              (파일이 없거나 벤치마크하지 않은 기능은 DEFAULT_COST_COEFFICIENTS 사용)
+    출력 : 출력 컬럼 수, 예상 최대 메모리(byte), 예상 실행 시간(초), admission
+        accept : 기본 celery 큐에서 실행
+        defer  : 예상 실행 시간이 PREPROCESS_LONG_JOB_SECONDS 보다 길면 PREPROCESS_LONG_JOB_QUEUE 큐에서 실행
+                 (worker 는 `celery -A dasolution worker -Q {큐 이름}` 으로 따로 실행)
+        reject : 예상 최대 메모리가 worker 메모리 한도(PREPROCESS_WORKER_MEMORY_BYTES)보다 큰 경우 (4022)
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+from ast import literal_eval
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from .data_summary import DataSummary
+from .preprocess_helper import PreprocessTask
+from .streaming_preprocess import streaming_fitter
+from ...models.original_data import OriginalData
+from ....config.data_config import DATA_CONFIG
+from ....config.result_path_config import PATH_CONFIG
+from ....utils.columnar_storage import save_columnar
+from ....utils.custom_decorator import where_exception
+from ....utils.class_registry import preprocess_function_registry
+
+logger = logging.getLogger("collect_log_helper")
+
+COST_COEFFICIENTS_PATH = os.path.join(PATH_CONFIG.RESULT_ML_DIR, "preprocess_cost.json")
+
+# 벤치마크 전 기본값 (초/행, '__io__' 는 초/셀)
+DEFAULT_COST_COEFFICIENTS = {
+    "__default__": 5e-7,
+    "__io__": 1e-6,
+}
+BENCHMARK_ROWS = 100000
+BENCHMARK_CATEGORIES = 100
+
+NUMERIC_CELL_BYTES = 8
+OBJECT_CELL_BYTES = 64  # 문자열 컬럼의 셀당 평균 크기 (포인터 + 짧은 문자열 객체)
+SPARSE_CELL_BYTES = 12  # 0 이 아닌 값(float64) + 위치(int32)
+# pandas/numpy 임시 복사본 등을 고려한 여유 배수
+MEMORY_SAFETY_FACTOR = 1.5
+
+
+def load_cost_coefficients():
+    """
+    Return cost coefficients (benchmark result merged into DEFAULT_COST_COEFFICIENTS)
+    """
+    coefficients = dict(DEFAULT_COST_COEFFICIENTS)
+    try:
+        with open(COST_COEFFICIENTS_PATH, "r", encoding="utf-8") as f:
+            coefficients.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"전처리 비용 계수 파일을 읽지 못해 기본값을 사용합니다 ({e})")
+    return coefficients
+
+
+def _benchmark_seconds(func, repeat=2):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _benchmark_columns(rows):
+    random_state = np.random.RandomState(0)
+    numeric = random_state.normal(size=rows)
+    categorical = random_state.randint(BENCHMARK_CATEGORIES, size=rows).astype(str).astype(object)
+    return numeric, categorical
+
+
+def calibrate_cost_coefficients(rows=BENCHMARK_ROWS):
+    """
+    Benchmark every PreprocessFunction on synthetic data and Save cost coefficients
+
+        Parameters:
+        -----------
+             rows (int) : number of synthetic rows
+
+        Returns:
+        --------
+             coefficients (dict) : PREPROCESS_FUNCTIONS_NAME => seconds per row
+                                   ('__io__' => seconds per cell of load/save/summary)
+    """
+    numeric, categorical = _benchmark_columns(rows)
+    coefficients = dict()
+    for pfunc_pk in preprocess_function_registry.ids():
+        func_query = preprocess_function_registry.row(pfunc_pk)
+        func_name = func_query["PREPROCESS_FUNCTIONS_NAME"]
+        if func_name == "DropColumns" or not func_query["USE_FLAG"]:
+            continue
+        transformer = preprocess_function_registry.new_instance(pfunc_pk)
+        if transformer is None:
+            continue
+        # 수치형으로 fit 할 수 없는 기능(인코더 등)은 범주형 데이터로 측정
+        for values in (numeric, categorical):
+            try:
+                seconds = _benchmark_seconds(
+                    lambda: transformer.fit_transform(values.reshape(-1, 1)))
+            except Exception:
+                continue
+            coefficients[func_name] = seconds / rows
+            break
+        else:
+            logger.warning(f"{func_name} 의 실행 비용을 측정하지 못했습니다")
+
+    data = pd.DataFrame(dict(n0=numeric, n1=numeric, c0=categorical, c1=categorical))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = os.path.join(tmp_dir, "benchmark.npz")
+        seconds = _benchmark_seconds(lambda: (
+            save_columnar(data, tmp_path), DataSummary(data=data).statistics_info()))
+    coefficients["__io__"] = seconds / data.size
+
+    tmp_path = COST_COEFFICIENTS_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(coefficients, f, indent=2)
+    os.replace(tmp_path, COST_COEFFICIENTS_PATH)
+    logger.info(f"전처리 비용 계수를 저장했습니다 ({COST_COEFFICIENTS_PATH})")
+    return coefficients
+
+
+def worker_memory_bytes():
+    """
+    Return memory capacity of single preprocessing worker
+    (DATA_CONFIG.PREPROCESS_WORKER_MEMORY_BYTES, 0 => 80% of total memory)
+    """
+    if DATA_CONFIG.PREPROCESS_WORKER_MEMORY_BYTES > 0:
+        return DATA_CONFIG.PREPROCESS_WORKER_MEMORY_BYTES
+    return int(psutil.virtual_memory().total * 0.8)
+
+
+def _column_profiles(statistics, amount):
+    """
+    Return column name => (is_numerical, cardinality) from OriginalData.STATISTICS
+    (고유값 수를 알 수 없으면 cardinality 는 None, eg. 'distinct' 를 저장하기 전에 등록된 데이터)
+    """
+    try:
+        statistics = json.loads(statistics)
+    except ValueError:
+        statistics = literal_eval(statistics)
+    profiles = dict()
+    for column in statistics:
+        compact_data = column.get("compact_data") or {}
+        additional_info = compact_data.get("additional_info") or {}
+        if column.get("type") == "numerical":
+            cardinality = additional_info.get("distinct")
+            profiles[column["name"]] = (True, None if cardinality is None else max(int(cardinality), 1))
+        elif not compact_data:
+            profiles[column["name"]] = (False, None)
+        elif compact_data.get("elements") == "unique":
+            profiles[column["name"]] = (False, max(amount, 1))
+        else:
+            cardinality = len(compact_data["elements"]) + (1 if int(additional_info.get("nan", 0)) else 0)
+            profiles[column["name"]] = (False, max(cardinality, 1))
+    return profiles
+
+
+def _output_shape(transformer, cardinality):
+    """
+    Return (number of output columns, sparse or not, cardinality of output)
+    of single field transformed by 'transformer'
+    (same routing as `routing_of`, 출력 컬럼이 2개 이상이면 'expand',
+     입력 고유값 수(cardinality)를 모르면 범주마다 컬럼을 만드는 전처리기의 출력 컬럼 수는 None)
+    """
+    name = type(transformer).__name__
+    if cardinality is None and name in ("OneHotEncoder", "LabelBinarizer"):
+        sparse = getattr(transformer, "sparse_output", getattr(transformer, "sparse", False))
+        return None, bool(sparse), 2
+    if name == "OneHotEncoder":
+        sparse = getattr(transformer, "sparse_output", getattr(transformer, "sparse", True))
+        drop = getattr(transformer, "drop", None)
+        width = cardinality - 1 if drop is not None and cardinality > 1 else cardinality
+        return width, bool(sparse), 2
+    elif name == "LabelBinarizer":
+        width = cardinality if cardinality > 2 else 1
+        return width, bool(transformer.sparse_output), 2
+    elif name == "KBinsDiscretizer":
+        n_bins = int(np.max(transformer.n_bins))
+        if transformer.encode == "ordinal":
+            return 1, False, n_bins
+        return n_bins, transformer.encode == "onehot", 2
+    elif name == "Binarizer":
+        return 1, False, 2
+    return 1, False, cardinality
+
+
+class PreprocessCostEstimator:
+    """
+    Estimate output width, peak memory and runtime of preprocessing request
+
+        Attributes:
+        -----------
+            amount (int) : number of rows (OriginalData.AMOUNT)
+            profiles (dict) : column name => (is_numerical, cardinality)
+            file_size (int) : original data file size (byte)
+            coefficients (dict) : cost coefficients (`load_cost_coefficients`)
+    """
+
+    def __init__(self, original_data_pk, data_path):
+        original_data = OriginalData.objects.get(pk=original_data_pk)
+        self.amount = int(original_data.AMOUNT)
+        self.profiles = _column_profiles(original_data.STATISTICS, self.amount)
+        self.file_size = os.path.getsize(data_path)
+        self.coefficients = load_cost_coefficients()
+
+    def _per_row_seconds(self, function_name):
+        return self.coefficients.get(function_name, self.coefficients["__default__"])
+
+    def _streaming(self, steps):
+        # preprocess_task 와 같은 기준 (지원하지 않는 전처리기가 있으면 메모리에서 처리)
+        if self.file_size <= DATA_CONFIG.STREAMING_PREPROCESS_MIN_BYTES:
+            return False
+        return all(step["transformer"] is None or streaming_fitter(step["transformer"]) is not None
+                   for step in steps)
+
+    def estimate(self, request_data):
+        """
+        Return cost estimate of 'request_data'
+
+            Parameters:
+            -----------
+                 request_data (list) : 'request_data' of user's request body
+
+            Returns:
+            --------
+                 (dict) : rows, input_columns, output_columns, streaming,
+                          memory_bytes, runtime_seconds, steps (per step estimate),
+                          worker_memory_bytes, admission ('accept', 'defer' or 'reject'), queue,
+                          unknown_cardinality (fields whose output width is unknown)
+                 (출력 컬럼 수를 모르는 단계는 1 컬럼으로 계산하고, output_columns 는 None,
+                  메모리가 과소 추정될 수 있으므로 'reject' 하지 않음)
+        """
+        steps = PreprocessTask(pk=None)._plan_steps(request_data)
+        streaming = self._streaming(steps)
+        rows = self.amount
+        # 청크 단위 처리이면 메모리에는 한 청크만 올라감
+        rows_in_memory = min(rows, DATA_CONFIG.DATA_CHUNK_ROWS) if streaming else rows
+
+        profiles = dict(self.profiles)
+        input_bytes = sum(NUMERIC_CELL_BYTES if numerical else OBJECT_CELL_BYTES
+                          for numerical, _ in profiles.values()) * rows_in_memory
+        width = len(profiles)
+        # 저장/요약 비용은 셀 수에 비례 (희소 블록은 0 이 아닌 값의 수)
+        output_cells = width * rows
+        added_bytes = 0
+        fitter_bytes = 0
+        step_peak = 0
+        transform_seconds = 0.0
+        steps_per_field = dict()
+        step_estimates = []
+        unknown_cardinality = []
+        for step in steps:
+            field_name = step["field_name"]
+            steps_per_field[field_name] = steps_per_field.get(field_name, 0) + 1
+            numerical, cardinality = profiles.get(field_name, (False, None))
+            if step["transformer"] is None:  # DropColumns
+                if profiles.pop(field_name, None) is not None:
+                    width -= 1
+                    output_cells -= rows
+                step_estimates.append(dict(
+                    field_name=field_name, function_name=step["function_name"],
+                    output_columns=0, memory_bytes=0, runtime_seconds=0.0))
+                continue
+
+            out_width, sparse, out_cardinality = _output_shape(step["transformer"], cardinality)
+            output_columns = out_width
+            if out_width is None:
+                unknown_cardinality.append(field_name)
+                out_width = 1
+            if sparse:
+                out_bytes = rows_in_memory * SPARSE_CELL_BYTES
+            else:
+                out_bytes = rows_in_memory * out_width * NUMERIC_CELL_BYTES
+            # fit_transform 입력 복사본(float 또는 object) + 출력 블록
+            temp_bytes = rows_in_memory * (NUMERIC_CELL_BYTES if numerical else OBJECT_CELL_BYTES) + out_bytes
+            step_peak = max(step_peak, temp_bytes)
+            added_bytes += out_bytes
+            if streaming and not numerical and cardinality is not None:
+                fitter_bytes += cardinality * OBJECT_CELL_BYTES  # CategoryFitter 의 범주 집합
+
+            seconds = rows * self._per_row_seconds(step["function_name"])
+            transform_seconds += seconds
+            if out_width > 1:  # expand => 원래 필드 제외
+                profiles.pop(field_name, None)
+                width += out_width - 1
+                output_cells += 0 if sparse else rows * (out_width - 1)
+            else:
+                profiles[field_name] = (True, out_cardinality)
+            step_estimates.append(dict(
+                field_name=field_name, function_name=step["function_name"],
+                output_columns=output_columns, memory_bytes=int(out_bytes),
+                runtime_seconds=round(seconds, 3)))
+
+        memory_bytes = int((input_bytes + added_bytes + step_peak + fitter_bytes) * MEMORY_SAFETY_FACTOR)
+        # 청크 단위 처리는 같은 필드에 이어진 단계 수만큼 fit pass 를 반복한 뒤 transform pass 수행
+        n_pass = 1 + max(steps_per_field.values(), default=0) if streaming else 1
+        io_seconds = self.coefficients["__io__"] * (rows * len(self.profiles) * n_pass + output_cells)
+        runtime_seconds = io_seconds + transform_seconds * (2 if streaming else 1)
+
+        capacity = worker_memory_bytes()
+        queue = None
+        if memory_bytes > capacity and not unknown_cardinality:
+            admission = "reject"
+        elif runtime_seconds > DATA_CONFIG.PREPROCESS_LONG_JOB_SECONDS and DATA_CONFIG.PREPROCESS_LONG_JOB_QUEUE:
+            admission = "defer"
+            queue = DATA_CONFIG.PREPROCESS_LONG_JOB_QUEUE
+        else:
+            admission = "accept"
+        return dict(
+            rows=rows,
+            input_columns=len(self.profiles),
+            output_columns=None if unknown_cardinality else width,
+            streaming=streaming,
+            memory_bytes=memory_bytes,
+            runtime_seconds=round(runtime_seconds, 3),
+            steps=step_estimates,
+            worker_memory_bytes=capacity,
+            admission=admission,
+            queue=queue,
+            unknown_cardinality=unknown_cardinality,
+        )
+
+
+def estimate_preprocess_cost(original_data_pk, data_path, request_data):
+    """
+    Return `PreprocessCostEstimator.estimate` result (None if estimation failed)
+    (추정에 실패하면 작업 허용 판단 없이 기존처럼 실행)
+    """
+    try:
+        return PreprocessCostEstimator(original_data_pk, data_path).estimate(request_data)
+    except Exception as e:
+        where_exception(error_msg=e)
+        return None
@@ -1,59 +1,48 @@
 import os
 import json
+import contextlib
 import logging
+import multiprocessing
 import pandas as pd
 import numpy as np
-import matplotlib # 맥에서 에러 처리용
-matplotlib.use("agg") # 맥에서 에러 처리용
-import matplotlib.pyplot as plt
 
+from .column_statistics import profile_column, ColumnAccumulator
+from ....config.data_config import DATA_CONFIG
+from ....utils.custom_call import iter_data_chunks
 from ....utils.custom_decorator import where_exception
+from ....utils.columnar_storage import is_columnar_file, fresh_columnar_copy, load_columnar
 
 logger = logging.getLogger('collect_log_helper')
 
 
+# fork 된 작업 프로세스가 부모의 DataSummary 를 복사 없이(copy-on-write) 참조하기 위한 변수
+_SHARED_SUMMARY = None
+
+
+def _profile_shared(name):
+    return _SHARED_SUMMARY._safe_profile(name)
+
+
 class DataSummary:
 
-    def __init__(self, path):
-        self.data = self.get_data(path)
-        self.columns = self.data.columns
+    # process_pool() 블록 안에서 미리 만들어 둔 작업 프로세스 풀
+    _pool = None
 
-    def _categorical(self, col_name):
-        col_data = self.data[col_name]
-        if len(set(col_data)) == len(col_data):
-            return "count", {"elements":"unique",
-                             "frequency":[str(len(col_data))], 
-                             "additional_info":{"nan":str(len(col_data)-len(col_data.dropna()))}}
-        elif len(set(col_data)) < 3:
-            dic = dict(col_data.value_counts())
-            return "pie", {"elements":list(dic.keys()),
-                           "frequency":list(map(str,dic.values())), 
-                           "additional_info":{"valid":str(len(col_data.dropna())), 
-                                              "nan":str(len(col_data)-len(col_data.dropna()))}}
-        else:
-            dic = dict(col_data.value_counts())
-            return "bar", {"elements":list(dic.keys()),
-                           "frequency":list(map(str,dic.values())), 
-                           "additional_info":{"valid":str(len(col_data.dropna())), 
-                                              "nan":str(len(col_data)-len(col_data.dropna())), 
-                                              "most_frequence":str(max(dic, key=lambda k: dic[k]))}}
-
-    def _numerical(self, col_name):
-        col_data=self.data[col_name]
-        (freq, bins, patches) = plt.hist(col_data)
-        bins_means = []
-        for i in range(len(bins) - 1):
-            bins_means.append(np.mean([bins[i], bins[i + 1]]))
-        return "histogram", {"bins_means":list(map(str,np.round(bins_means,decimals=3))),
-                             "frequency":list(map(str,np.round(freq,decimals=3))), 
-                             "additional_info":{"valid":str(len(col_data.dropna())),
-                                                "nan":str(len(col_data)-len(col_data.dropna())), 
-                                                "mean" : str(col_data.describe()["mean"]), 
-                                                "std" : str(col_data.describe()["std"]), 
-                                                "quantiles": dict(col_data.describe()[3:])}}
+    def __init__(self, path=None, approx=None, n_jobs=None, data=None):
+        # data (pandas.DataFrame) 를 넘기면 파일을 다시 읽지 않고 메모리의 데이터로 계산
+        self.approx = DATA_CONFIG.APPROX_SUMMARY if approx is None else approx
+        self.n_jobs = DATA_CONFIG.SUMMARY_N_JOBS if n_jobs is None else n_jobs
+        self.data = self.get_data(path) if data is None else data
+        self.columns = self.data.columns
 
     def get_data(self, path):
-        if os.path.splitext(path)[1] == '.csv':
+        columnar_copy = fresh_columnar_copy(path)
+        if is_columnar_file(path) or columnar_copy:
+            # 컬럼 단위 바이너리 형식 (O_*.npz 사본 또는 P_*.npz)
+            df_data = load_columnar(columnar_copy or path)
+            if 'O' in os.path.basename(path) and os.path.splitext(path)[1] == '.json':
+                df_data = df_data.fillna("None")
+        elif os.path.splitext(path)[1] == '.csv':
             df_data = pd.read_csv(path)
         elif os.path.splitext(path)[1] == '.json':
             if 'O' in path:
@@ -76,38 +65,82 @@ class DataSummary:
         amount = self.data.shape[0]
         return amount
 
+    def _new_accumulator(self):
+        return ColumnAccumulator(approx=self.approx,
+                                 error=DATA_CONFIG.APPROX_SUMMARY_ERROR,
+                                 top_k=DATA_CONFIG.APPROX_SUMMARY_TOP_K)
+
+    def _profile(self, name):
+        if not self.approx:
+            return profile_column(self.data[name])
+        # 근사 통계 모드 : 청크 크기만큼씩 스케치에 누적
+        col_data = self.data[name]
+        accumulator = self._new_accumulator()
+        for start in range(0, len(col_data), DATA_CONFIG.DATA_CHUNK_ROWS):
+            accumulator.update(col_data.iloc[start:start + DATA_CONFIG.DATA_CHUNK_ROWS])
+        return accumulator.result()
+
+    def _safe_profile(self, name):
+        try:
+            return self._profile(name)
+        except Exception as e:
+            where_exception(e)
+            logger.error("Cant Extract Graph Data "+name)
+            return "categorical", "", {}
+
+    def _n_jobs(self):
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        return min(n_jobs, len(self.columns))
+
+    def _use_pool(self):
+        return self._n_jobs() > 1 and len(self.columns) >= DATA_CONFIG.SUMMARY_PARALLEL_MIN_COLUMNS
+
+    @contextlib.contextmanager
+    def process_pool(self):
+        """
+        Fork profile worker processes in advance and Keep them until exit
+
+        fork 방식으로 작업 프로세스를 만들기 때문에 각 프로세스는 부모의 컬럼 버퍼를
+        복사/직렬화 없이 그대로 읽고, 컬럼명과 결과(compact_data)만 주고받음
+        다른 스레드(예: 전처리 데이터 저장)를 시작하기 전에 이 블록에 들어가야 함
+        (스레드가 잠금을 가진 채로 fork 되면 자식 프로세스가 멈출 수 있음)
+        """
+        global _SHARED_SUMMARY
+        if self._pool is not None or not self._use_pool():
+            yield
+            return
+        try:
+            _SHARED_SUMMARY = self
+            pool = multiprocessing.get_context("fork").Pool(processes=self._n_jobs())
+        except Exception as e:
+            # fork 를 지원하지 않거나 자식 프로세스를 만들 수 없는 환경이면 순차 계산
+            _SHARED_SUMMARY = None
+            logger.warning(f"컬럼 통계를 순차 계산합니다 ({e})")
+            yield
+            return
+        self._pool = pool
+        try:
+            with pool:
+                yield
+        finally:
+            self._pool = None
+            _SHARED_SUMMARY = None
+
+    def _profile_columns(self):
+        names = list(self.columns)
+        with self.process_pool():
+            if self._pool is not None:
+                try:
+                    return self._pool.map(_profile_shared, names, chunksize=1)
+                except Exception as e:
+                    logger.warning(f"컬럼 통계를 순차 계산합니다 ({e})")
+        return [self._safe_profile(name) for name in names]
+
     def statistics_info(self):
-        graph_types = []
-        compact_datas = []
         data_statistics = []
-        column_dtypes = self.data.dtypes.replace('object', 'string')
-        
-        for i, j in enumerate(column_dtypes):
-            if sum(self.data[self.columns[i]].isna())==len(self.data[self.columns[i]]):
-                j="string"
-            if list(self.data[self.columns[i]].unique()) in [[0, 1], [1, 0]]:
-                j="string"
-                
-            try:                    
-                if j in ["float64", "float32", "int64", "int32"]:  # numerical 일 경우
-                    column_dtypes[i] = 'numerical'
-                    get_graph_type, get_compact_data = self._numerical(self.columns[i])
-
-                else:  # categorical 일 경우
-                    column_dtypes[i] = 'categorical'
-                    get_graph_type, get_compact_data = self._categorical(self.columns[i])
-
-                graph_types.append(get_graph_type)
-                compact_datas.append(get_compact_data)
-
-            except Exception as e:
-                where_exception(e)
-                logger.error("Cant Extract Graph Data "+self.columns[i])
-                graph_types.append("")
-                compact_datas.append({})
-
-        for name, data_type, graph_type, compact_data in zip(
-                self.columns, column_dtypes, graph_types, compact_datas):
+
+        for name, profile in zip(self.columns, self._profile_columns()):
+            data_type, graph_type, compact_data = profile
             single_column_info = {'name': name,
                                   'type': data_type,
                                   'graph_type': graph_type,
@@ -116,3 +149,81 @@ class DataSummary:
 
         data_statistics = json.dumps(data_statistics)
         return data_statistics
+
+
+class StreamingDataSummary(DataSummary):
+    """
+    DataSummary computed chunk by chunk with bounded memory
+
+    파일을 DATA_CONFIG.DATA_CHUNK_ROWS 행씩 한 번만 읽으면서
+    컬럼별 ColumnAccumulator 에 누적하므로 전체 데이터를 메모리에 올리지 않음
+    (히스토그램/사분위수는 근사값, approx=True 이면 고유값 수/빈도 상위 범주도 근사값)
+
+        Attributes:
+        -----------
+            columns (list) : column names of data
+            amount (int) : number of rows
+            sample (pandas.DataFrame) : first 5 rows
+            accumulators (dict) : ColumnAccumulator per column name
+    """
+
+    def __init__(self, path=None, chunksize=DATA_CONFIG.DATA_CHUNK_ROWS, approx=None):
+        self.approx = DATA_CONFIG.APPROX_SUMMARY if approx is None else approx
+        self.columns = None
+        self.amount = 0
+        self.sample = None
+        self.accumulators = dict()
+        if path is None:  # 호출자가 update(chunk) 로 직접 누적 (eg. 청크 단위 전처리)
+            return
+        fill_none = 'O' in os.path.basename(path) and os.path.splitext(path)[1] == '.json'
+
+        for chunk in iter_data_chunks(path, chunksize=chunksize):
+            if fill_none:
+                chunk = chunk.fillna("None")
+            self.update(chunk)
+
+    def update(self, chunk):
+        """
+        Accumulate pd.DataFrame 'chunk' (same columns as first chunk)
+        """
+        if self.columns is None:
+            self.columns = chunk.columns
+            self.sample = chunk.iloc[:5].reset_index(drop=True)
+            self.accumulators = {name: self._new_accumulator() for name in self.columns}
+        self.amount += chunk.shape[0]
+        for name in self.columns:
+            self.accumulators[name].update(chunk[name])
+
+    def sample_info(self):
+        sample_data = self.sample.to_json()
+        sample_data = json.loads(sample_data)
+        return str(sample_data)
+
+    def size_info(self):
+        return self.amount
+
+    def _n_jobs(self):
+        # 청크를 읽으면서 누적이 끝났으므로 결과만 순차 계산
+        return 1
+
+    def _profile(self, name):
+        return self.accumulators[name].result()
+
+
+def load_data_summary(path):
+    """
+    Return DataSummary or StreamingDataSummary according to file size
+
+        Parameters:
+        -----------
+             path (str) : data file path
+
+        Returns:
+        --------
+             (DataSummary) : StreamingDataSummary, if file is larger than
+                             DATA_CONFIG.STREAMING_SUMMARY_MIN_BYTES
+    """
+    if os.path.getsize(path) > DATA_CONFIG.STREAMING_SUMMARY_MIN_BYTES:
+        logger.info(f"{path} 파일의 요약 정보를 청크 단위로 계산합니다")
+        return StreamingDataSummary(path)
+    return DataSummary(path)
@@ -1,10 +1,10 @@
 # API/ml/services/data_preprocess
-import glob
 import logging
 from django.shortcuts import get_object_or_404
 
 from ...models.preprocessed_data import PreprocessedData
 from ...serializers.serializers import PreprocessedDataSerializer
+from .result_cache import transformer_files
 from ....config.result_path_config import PATH_CONFIG
 
 logger = logging.getLogger('collect_log_helper')
@@ -44,7 +44,8 @@ class PreprocessedDownload:
         return self.serializer['FILEPATH'], self.serializer['FILENAME']
 
     def case_transformer(self):
-        pk_savad_list = glob.glob("{}/T_{}_*.pickle".format(transformer_saved_path, self.pk))
+        # 재사용한 결과는 처음 생성한 요청 ID 의 전처리기(T_*)를 가리킴
+        pk_savad_list = transformer_files(self.serializer)
         if not pk_savad_list:
             raise FileNotExistedError()
         return pk_savad_list
@@ -2,18 +2,28 @@
 import os
 import logging
 import warnings
+from ast import literal_eval
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 from django.http import Http404
+from sklearn.base import clone
 
 from .data_summary import DataSummary
+from .column_builder import ColumnBlockBuilder
+from .preprocess_pipeline import PreprocessPipeline, PIPELINE_FILE_NAME, routing_of
 from .preprocess_base import PreprocessorBase
+from .result_cache import original_file_hash
+from .step_telemetry import StepTelemetry
 from ...models.original_data import OriginalData
 from ...serializers.serializers import OriginalDataSerializer
 from ....config.result_path_config import PATH_CONFIG
+from ....config.data_config import DATA_CONFIG
 from ....utils.custom_decorator import where_exception
-from ....common.models.preprocess_function import PreprocessFunction
-from ....common.serializers.serializers import PreprocessFunctionSerializer
+from ....utils.columnar_storage import ColumnarTypeError
+from ....utils.feature_cache import feature_cache, lineage_key
+from ....utils.class_registry import preprocess_function_registry
 
 warnings.filterwarnings("ignore")
 logger = logging.getLogger("collect_log_helper")
@@ -49,7 +59,7 @@ class InspectUserRequest(PreprocessorBase):
         original_data_id (int) : user requested ID of original Data
         data_saved_path (str) : original data's saved path (eg. ['FILEPATH'] from query)
         pfunction_ids (list) : list of all '_key_func_pk' from user request
-        data_loaded (pandas.DataFrame) : user requested Data for Preprocessing
+        data_columns (list) : column names of user requested Data (OriginalData.COLUMNS)
     """
 
     def __init__(self):
@@ -58,7 +68,7 @@ class InspectUserRequest(PreprocessorBase):
         self.original_data_id = None
         self.data_saved_path = None
         self.pfunction_ids = None
-        self.data_loaded = None
+        self.data_columns = None
 
     @staticmethod
     def _mandatory_key_exists_preprocessed_post(element):
@@ -95,7 +105,8 @@ class InspectUserRequest(PreprocessorBase):
         Check IDs of original data and preprocess function (valid DB)
 
         check self.original_data_id & self.pfunction_ids
-        new value to self.data_loaded & self.data_saved_path is added
+        new value to self.data_columns & self.data_saved_path is added
+        (컬럼 검사는 저장된 스키마(OriginalData.COLUMNS)로 하므로 데이터를 로드하지 않음)
         if True is returned
 
             Returns:
@@ -103,7 +114,7 @@ class InspectUserRequest(PreprocessorBase):
                  True (bool) : if all IDs are valid
                  or
                  _error_return_dict (dict) :
-                 if self.data_saved_path not valid
+                 if self.data_saved_path not valid or original data is not ready
 
             Raises:
             -------
@@ -119,24 +130,21 @@ class InspectUserRequest(PreprocessorBase):
             logger.error(f"{self._key_data_pk}가 잘못 요청되었습니다")
             raise Http404
         else:
-            self.data_saved_path = OriginalDataSerializer(
+            original_data = OriginalDataSerializer(
                 OriginalData.objects.get(pk=self.original_data_id)
-            ).data["FILEPATH"]
+            ).data
+            self.data_saved_path = original_data["FILEPATH"]
 
+            # 원본 데이터 등록 작업이 끝나지 않은 경우 (4009)
+            if original_data["PROGRESS_STATE"] != "success":
+                logger.error(f"{self._key_data_pk} {self.original_data_id}의 등록 작업이 완료되지 않았습니다")
+                return _error_return_dict("4009", original_data["PROGRESS_STATE"])
             if not os.path.isfile(self.data_saved_path):
                 logger.error(f"{self.data_saved_path} 경로가 존재하지 않습니다")
                 return _error_return_dict("4004", self.data_saved_path)
             else:
-                self.data_loaded = super()._load_data(
-                    base_path="ORIGINAL_DATA_DIR",
-                    file_name=os.path.split(self.data_saved_path)[1],
-                )
-        all_pfunc_id = list(
-            PreprocessFunction.objects.all().values_list(
-                "PREPROCESS_FUNCTIONS_SEQUENCE_PK", flat=True
-            )
-        )
-        is_ids = [True if i in all_pfunc_id else False for i in self.pfunction_ids]
+                self.data_columns = literal_eval(original_data["COLUMNS"])
+        is_ids = [i in preprocess_function_registry for i in self.pfunction_ids]
         if not all(is_ids):
             logger.error(f"{self._key_func_pk}가 잘못 요청되었습니다")
             raise Http404
@@ -168,7 +176,7 @@ class InspectUserRequest(PreprocessorBase):
         self.original_data_id = request_info[self._key_data_pk]
         self.pfunction_ids = list(map(int, [i[self._key_func_pk] for i in request_all]))
 
-        # 요청한 원본데이터 ID와 전처리 ID가 있는지 검사 (Http404/4004)
+        # 요청한 원본데이터 ID와 전처리 ID가 있는지 검사 (Http404/4004/4009)
         is_valid = self._check_request_pk()
         if isinstance(is_valid, dict):
             return _error_return_dict(is_valid["error_type"], is_valid["error_msg"])
@@ -183,7 +191,7 @@ class InspectUserRequest(PreprocessorBase):
                 field_name_list = [field_name]
 
             for field_name_ in field_name_list:
-                if field_name_ not in list(self.data_loaded.columns):
+                if field_name_ not in self.data_columns:
                     return _error_return_dict("4102", field_name_)
         return True  # 에러 상태가 없으면 True
 
@@ -201,10 +209,19 @@ class PreprocessTask(PreprocessorBase):
                               (eg. os.path.join(PREPROCESSED_DATA_DIR, file_name))
             file_name (str) : file name of preprocessed data
                               (eg. 'P_{}.json'.format(self.pk))
+            original_file_ext (str) : format of original data ('csv' or 'json')
+                                      (used when preprocessed data cannot be saved as npz)
             real_final_list (list) : which saved as 'SUMMARY' in PreprocessedData DB
                 (eg. info_dict = {"field_name":field_name, "function_name":pfunc_name,
                                   "function_pk":pfunc_pk, "file_name":file_name,
                                   "original_classes":None, "encoded_classes":None})
+            pipeline (PreprocessPipeline) : fitted transformers of all steps
+                                            (saved as T_{pk}_pipeline.pickle)
+            column_lineage (dict) : column name => lineage key of feature_cache
+                                    (eg. sha256 of original file hash, column name and
+                                    steps applied to the column so far)
+            telemetry (StepTelemetry) : wall/CPU time, peak RSS delta and output shape per step
+                                        (saved as 'TELEMETRY' in PreprocessedData DB)
     """
 
     def __init__(self, pk):
@@ -212,12 +229,16 @@ class PreprocessTask(PreprocessorBase):
         self.func_query = None
         self.file_path = None
         self.file_name = None
+        self.original_file_ext = "csv"
         self.real_final_list = []
+        self.pipeline = PreprocessPipeline()
+        self.column_lineage = dict()
+        self.telemetry = StepTelemetry()
 
     # 전처리된 데이터를(pandas.DataFrame)을 저장하는 함수(원본데이터 확장자에 따름)
     def _save_prep_data(self, prep_data, file_name):
         """
-        Save preprocessed Data as json
+        Save preprocessed Data as npz(columnar), json or csv
 
             Parameters:
             -----------
@@ -225,7 +246,7 @@ class PreprocessTask(PreprocessorBase):
                  preprocessed data after all preprocessing finished
                  file_name (str) :
                  saved name of preprocessed data
-                 (eg. 'P_{}.json'.format(self.pk))
+                 (eg. 'P_{}.npz'.format(self.pk))
 
             Returns:
             --------
@@ -234,7 +255,15 @@ class PreprocessTask(PreprocessorBase):
         """
         file_ext = os.path.splitext(file_name)[1]
         self.file_path = os.path.join(PREPROCESSED_DATA_DIR, file_name)
-        if file_ext == ".json":
+        if file_ext == ".npz":
+            try:
+                super()._save_columnar_data(data=prep_data, file_path=self.file_path)
+            except ColumnarTypeError as e:
+                # 컬럼 단위 형식으로 저장할 수 없는 값이 있으면 원본 데이터 형식으로 저장
+                logger.warning(f"전처리 데이터를 {self.original_file_ext} 형식으로 저장합니다 ({e})")
+                self.file_name = "P_{}.{}".format(self.pk, self.original_file_ext)
+                self._save_prep_data(prep_data=prep_data, file_name=self.file_name)
+        elif file_ext == ".json":
             prep_data.to_json(self.file_path, orient="index")
         elif file_ext == ".csv":
             prep_data.to_csv(self.file_path, sep=',', header=True,
@@ -246,12 +275,12 @@ class PreprocessTask(PreprocessorBase):
     def _train_data_transformer(self, data, field_name, processor):
         """
         Making 'changed_field' using 'field_name' with 'processor'
-        and Overwriting 'data' from original 'field_column' to 'changed_field'
-        and Return 'data' (used by the related function `_task_result`)
+        and Return it with how it is merged into 'data'
+        (merged by `_merge_changed_field` in the related function `_task_result`)
 
             Parameters:
             -----------
-                 data (pandas.DataFrame) :
+                 data (ColumnBlockBuilder) :
                  preprocessed data in progress
                  field_name (str) : one of the column name
                  processor (object) :
@@ -259,149 +288,164 @@ class PreprocessTask(PreprocessorBase):
 
             Returns:
             --------
-                 data (pandas.DataFrame) :
-                 preprocessed data in progress
+                 changed_field (numpy.ndarray or csc_matrix) :
+                 result of 'fit_transform'
                  processor (object) :
                  preprocessor after `fit` and `transform`
                  encoded_info (dict) :
                  saving original and encoded classes or categories
+                 routing (str) :
+                 how 'changed_field' is merged ('replace', 'expand' or 'skip')
         """
-        encoded_info = dict()
         trans_name = type(processor).__name__
 
         try:
             field_column = data[field_name].astype(float)
         except ValueError:
-            field_column = data[field_name]
+            # 캐시와 공유하는 배열이므로 전처리기가 값을 바꾸지 않도록 복사
+            field_column = data[field_name].copy()
         except Exception as e:
             where_exception(error_msg=e)
         try:
-            changed_field = processor.fit_transform(field_column.values.reshape(-1, 1))
-            changed_field = super()._to_array(changed_field)
-
-            # transform 된 데이터와 원본 데이터 통합
-            if len(changed_field.shape) == 2 and changed_field.shape[1] == 1:
-                # case 04 : 실제로 작동할 수 없는 전처리 기능 Pass
-                if trans_name == "Normalizer":
-                    logger.warning("Not working in this version!!!")
-                else:  # case 01 : 새로운 칼럼이 추가 되지 않음 + 인코딩 아님 (스케일링 등)
-                    data[field_name] = changed_field
-
-                    # case 02 : 인코딩 필요한 경우
-                    if trans_name == "Binarizer":
-                        encoded_info["origin_class"] = np.unique(field_column).tolist()
-                        encoded_class = processor.transform(
-                            np.unique(field_column).reshape(-1, 1)
-                        )
-                        encoded_info["encode_class"] = encoded_class.tolist()
-                    # case 02 : 인코딩 필요한 경우
-                    elif trans_name == "OrdinalEncoder":
-                        encoded_info["origin_class"] = list(processor.categories_[0])
-                        encoded_class = processor.transform(
-                            processor.categories_[0].reshape(-1, 1)
-                        )
-                        encoded_info["encode_class"] = encoded_class.tolist()
-            # case 02 : 새로운 칼럼이 추가 되지 않음 + 인코딩
-            elif len(changed_field.shape) == 1:  # LabelEncoder
-                encoded_info["origin_class"] = list(processor.classes_)
-                encoded_info["encode_class"] = list(np.unique(changed_field))
-                data[field_name] = changed_field
-            # case 03 : 새로운 칼럼이 추가 됨 + 인코딩
-            else:
-                # KBinsDiscretizer, LabelBinarizer, MultiLabelBinarizer, OneHotEncoder
-                if trans_name == "KBinsDiscretizer":
-                    print(changed_field)
-                    encoded_info["origin_class"] = processor.bin_edges_[0].tolist()
-                    encoded_class = processor.transform(
-                        processor.bin_edges_[0].reshape(-1, 1)
-                    )
-                elif trans_name == "OneHotEncoder":
-                    encoded_info["origin_class"] = list(processor.categories_[0])
-                    encoded_class = processor.transform(
-                        processor.categories_[0].reshape(-1, 1)
-                    )
-                else:
-                    encoded_info["origin_class"] = list(processor.classes_)
-                    encoded_class = processor.transform(
-                        processor.classes_.reshape(-1, 1)
-                    )
-                encoded_info["encode_class"] = super()._to_array(encoded_class).tolist()
+            changed_field = processor.fit_transform(np.asarray(field_column).reshape(-1, 1))
+            changed_field = super()._to_array(changed_field, keep_sparse=True)
 
-                col_name = super()._new_columns(
-                    field_name=field_name, after_fitted=changed_field
-                )
-                new_columns = pd.DataFrame(changed_field, columns=col_name)
-                data = pd.concat([data, new_columns], axis=1, sort=False)
-                data = data.drop(field_name, axis=1)
-            return data, processor, encoded_info
+            encoded_info = self._encoded_info(processor, field_column, changed_field)
+            return changed_field, processor, encoded_info, routing_of(trans_name, changed_field)
         except Exception as e:
             where_exception(error_msg=e)
             return False
 
-    def _task_drop_columns(self, data, request_dict):
+    def _encoded_info(self, processor, field_column, changed_field):
         """
-        Drop Columns and Return Data without request columns
+        Return original and encoded classes or categories of fitted 'processor'
 
             Parameters:
             -----------
-                 data (pandas.DataFrame) :
-                 preprocessed data in progress
-                 request_dict (dict) :
-                 single request info from user's request body
+                 processor (object) : preprocessor after `fit`
+                 field_column (pandas.Series or numpy.ndarray) :
+                 values used for fitting (Binarizer 는 고유값만 사용)
+                 changed_field (numpy.ndarray or csc_matrix) :
+                 result of 'transform' of 'field_column'
 
             Returns:
             --------
-                 data (pandas.DataFrame):
-                 pandas DataFrame without 'field_name'
-                 (append new value to self.real_final_list)
+                 encoded_info (dict) :
+                 saving original and encoded classes or categories
         """
-        field_name = request_dict["field_name"]
-        pfunc_pk = request_dict["preprocess_functions_sequence_pk"]
-
-        if len(field_name.split(",")) != 1:
-            field_name_list = list(map(lambda x:x.strip(), field_name.split(",")))
+        encoded_info = dict()
+        trans_name = type(processor).__name__
+        if len(changed_field.shape) == 2 and changed_field.shape[1] == 1:
+            # case 04 : 실제로 작동할 수 없는 전처리 기능 Pass
+            if trans_name == "Normalizer":
+                logger.warning("Not working in this version!!!")
+            else:  # case 01 : 새로운 칼럼이 추가 되지 않음 + 인코딩 아님 (스케일링 등)
+                # case 02 : 인코딩 필요한 경우
+                if trans_name == "Binarizer":
+                    encoded_info["origin_class"] = np.unique(field_column).tolist()
+                    encoded_class = processor.transform(
+                        np.unique(field_column).reshape(-1, 1)
+                    )
+                    encoded_info["encode_class"] = encoded_class.tolist()
+                # case 02 : 인코딩 필요한 경우
+                elif trans_name == "OrdinalEncoder":
+                    encoded_info["origin_class"] = list(processor.categories_[0])
+                    encoded_class = processor.transform(
+                        processor.categories_[0].reshape(-1, 1)
+                    )
+                    encoded_info["encode_class"] = encoded_class.tolist()
+        # case 02 : 새로운 칼럼이 추가 되지 않음 + 인코딩
+        elif len(changed_field.shape) == 1:  # LabelEncoder
+            encoded_info["origin_class"] = list(processor.classes_)
+            encoded_info["encode_class"] = list(np.unique(changed_field))
+        # case 03 : 새로운 칼럼이 추가 됨 + 인코딩
         else:
-            field_name_list = [field_name]
-        for single_field_name in field_name_list:
-            data = super()._drop_columns(data=data, columns=single_field_name)
-            single_result = dict(
-                field_name=single_field_name,
-                function_name="DropColumns",
-                function_pk=pfunc_pk,
-                file_name=None,
-                original_classes=None,
-                encoded_classes=None,
-            )
-
-            self.real_final_list.append(single_result)
-        return data
+            # KBinsDiscretizer, LabelBinarizer, MultiLabelBinarizer, OneHotEncoder
+            if trans_name == "KBinsDiscretizer":
+                encoded_info["origin_class"] = processor.bin_edges_[0].tolist()
+                encoded_class = processor.transform(
+                    processor.bin_edges_[0].reshape(-1, 1)
+                )
+            elif trans_name == "OneHotEncoder":
+                encoded_info["origin_class"] = list(processor.categories_[0])
+                encoded_class = processor.transform(
+                    processor.categories_[0].reshape(-1, 1)
+                )
+            else:
+                encoded_info["origin_class"] = list(processor.classes_)
+                encoded_class = processor.transform(
+                    processor.classes_.reshape(-1, 1)
+                )
+            encoded_info["encode_class"] = super()._to_array(encoded_class).tolist()
+        return encoded_info
 
-    def _task_result(self, data, request_dict, save_n):
+    @staticmethod
+    def _merge_changed_field(data, field_name, changed_field, routing):
+        """
+        Overwriting 'data' from original 'field_name' to 'changed_field'
+        according to 'routing' (see `routing_of`)
         """
-        Preparation for calling `_train_data_transformer` and `_save_transformer`
-        according to 'request_dict'
+        if routing == "replace":
+            data[field_name] = changed_field
+        elif routing == "expand":
+            col_name = PreprocessorBase._new_columns(
+                field_name=field_name, after_fitted=changed_field
+            )
+            # 전체 데이터를 복사하지 않고 컬럼 목록만 변경 (DataFrame 은 마지막에 한 번 생성)
+            data.expand(field_name, col_name, changed_field)
+            return col_name
+        return [field_name]
 
-            Parameters:
-            -----------
-                 data (pandas.DataFrame) :
-                 preprocessed data in progress
-                 request_dict (dict) :
-                 single request info from user's request body
-                 save_n (int) :
-                 incremental Num for naming pickle file of transformer
+    def _cached_data_transformer(self, data, field_name, processor, pfunc_pk):
+        """
+        `_train_data_transformer` with per column cache (feature_cache)
+        and merging 'changed_field' into 'data'
+        and Return ('changed_field', fitted processor, encoded_info, routing)
+        (전처리기를 적용할 수 없으면 ValueError, 실패한 결과는 캐시/병합하지 않음)
 
-            Returns:
-            --------
-                 data (pandas.DataFrame):
-                 pandas DataFrame without 'field_name'
-                 save_n (int) :
-                 incremental Num for naming pickle file of transformer
+        cache key 는 컬럼 계보(self.column_lineage[field_name])와
+        전처리 기능 ID, 실제 적용되는 파라미터(get_params)로 만듦
+        """
+        step_key = lineage_key(
+            self.column_lineage.get(field_name, field_name), pfunc_pk,
+            type(processor).__name__, sorted(processor.get_params().items(), key=lambda x: x[0])
+        )
+        cached = feature_cache.get(step_key) if field_name in self.column_lineage else None
+        if cached is not None:
+            logger.info(f"{field_name} 필드의 전처리 결과를 캐시에서 로드했습니다")
+            changed_field, processor = cached["changed_field"], cached["transformer"]
+            encoded_info, routing = cached["encoded_info"], cached["routing"]
+        else:
+            trained = self._train_data_transformer(
+                data=data, field_name=field_name, processor=processor
+            )
+            if not trained:
+                raise ValueError(
+                    f"{field_name} 필드에 {type(processor).__name__} 전처리 기능을 적용할 수 없습니다")
+            changed_field, processor, encoded_info, routing = trained
+            if field_name in self.column_lineage:
+                feature_cache.put(step_key, dict(
+                    changed_field=changed_field, transformer=processor,
+                    encoded_info=encoded_info, routing=routing))
+
+        new_names = self._merge_changed_field(data, field_name, changed_field, routing)
+        # 결과 컬럼의 계보 갱신 (expand 는 원래 필드를 제외하고 '{필드명}_{i}' 필드 추가)
+        lineage = self.column_lineage.pop(field_name, None)
+        if lineage is not None and routing == "skip":  # 값이 바뀌지 않음
+            self.column_lineage[field_name] = lineage
+        elif lineage is not None:
+            for i, new_name in enumerate(new_names):
+                self.column_lineage[new_name] = step_key if routing != "expand" \
+                    else lineage_key(step_key, i)
+        return changed_field, processor, encoded_info, routing
+
+    def _build_transformer(self, request_dict):
+        """
+        Return transformer of self.func_query with 'condition' of 'request_dict'
         """
-        field_name = request_dict["field_name"]
-        pfunc_pk = request_dict["preprocess_functions_sequence_pk"]
         pfunc_name = self.func_query["PREPROCESS_FUNCTIONS_NAME"]
-
-        transformer = super()._get_base_object(params=self.func_query)
+        transformer = preprocess_function_registry.new_instance(
+            self.func_query["PREPROCESS_FUNCTIONS_SEQUENCE_PK"])
 
         if "condition" in request_dict.keys():  # 파라미터 수정을 요청한 경우
             request_condition = request_dict["condition"]
@@ -416,43 +460,218 @@ class PreprocessTask(PreprocessorBase):
             logger.info(
                 f"{pfunc_name} run with basic parameter {transformer.get_params()}"
             )
-        if len(field_name.split(",")) != 1:
-            field_name_list = list(map(lambda x:x.strip(), field_name.split(",")))
-        else:
-            field_name_list = [field_name]
-        for single_field_name in field_name_list:
+        return transformer
 
-            data, fitted_transformer, encode_info = self._train_data_transformer(
-                data=data, field_name=single_field_name, processor=transformer
-            )
+    def _plan_steps(self, request_data):
+        """
+        Return list of single field steps of 'request_data' in request order
 
-            save_n += 1
-            saved_name = "T_{}_{}.pickle".format(self.pk, save_n)
-            logger.info(f'save "{saved_name}" <{pfunc_name} | {single_field_name}> ')
+            Parameters:
+            -----------
+                 request_data (list) : 'request_data' from user's request body
 
-            _ = super()._dump_pickle(
-                save_object=fitted_transformer,
-                base_path="PREPROCESS_TRANSFORMER_DIR",
-                file_name=saved_name,
-            )
+            Returns:
+            --------
+                 steps (list) : list of dict
+                 (eg. {"index": 0, "field_name": "temp", "function_name": "StandardScaler",
+                       "function_pk": 8, "transformer": <StandardScaler>})
+                 (DropColumns 는 transformer 가 None,
+                  같은 요청의 필드마다 따로 fit 하므로 transformer 는 필드별 복사본)
+        """
+        steps = []
+        for request_dict in request_data:
+            """
+            {'preprocess_functions_sequence_pk': 8, 'field_name': 'temp'}
+            {'preprocess_functions_sequence_pk': 10, 'field_name': 'season'}
+            {'preprocess_functions_sequence_pk': 14, 'field_name': 'datetime'}
+            """
+            pfunc_pk = request_dict["preprocess_functions_sequence_pk"]
+            self.func_query = preprocess_function_registry.row(pfunc_pk)
+            func_name = self.func_query["PREPROCESS_FUNCTIONS_NAME"]
+            transformer = None
+            if func_name != "DropColumns":
+                transformer = self._build_transformer(request_dict)
+
+            field_name = request_dict["field_name"]
+            if len(field_name.split(",")) != 1:
+                field_name_list = list(map(lambda x:x.strip(), field_name.split(",")))
+            else:
+                field_name_list = [field_name]
+            for single_field_name in field_name_list:
+                steps.append(dict(
+                    index=len(steps),
+                    field_name=single_field_name,
+                    function_name=func_name,
+                    function_pk=pfunc_pk,
+                    transformer=None if transformer is None else clone(transformer),
+                ))
+        return steps
 
-            info_dict = dict(
-                field_name=single_field_name,
-                function_name=pfunc_name,
-                function_pk=pfunc_pk,
-                file_name=saved_name,
-                original_classes=None,
-                encoded_classes=None,
-            )
-            if "origin_class" in encode_info.keys():
-                info_dict["original_classes"] = encode_info["origin_class"]
-                info_dict["encoded_classes"] = encode_info["encode_class"]
-            self.real_final_list.append(info_dict)
+    @staticmethod
+    def _step_chains(steps):
+        """
+        Return dependency graph of 'steps' as field name => steps on the field
+        (요청할 수 있는 필드는 원본 데이터의 컬럼이므로 같은 필드의 단계끼리만 의존관계가 있음)
+        """
+        chains = OrderedDict()
+        for step in steps:
+            chains.setdefault(step["field_name"], []).append(step)
+        return chains
+
+    def _run_chain(self, data, field_name, chain):
+        """
+        Run steps of single field in order and Return index => result
+        (필드 하나만 가진 ColumnBlockBuilder 에서 수행하므로 다른 필드와 동시에 실행 가능)
+        """
+        field_data = data.subset([field_name])
+        results = dict()
+        for step in chain:
+            try:
+                with self.telemetry.measure(step["index"]):
+                    if step["transformer"] is None:
+                        field_data.drop(field_name)
+                        results[step["index"]] = None
+                    else:
+                        results[step["index"]] = self._cached_data_transformer(
+                            data=field_data, field_name=field_name,
+                            processor=step["transformer"], pfunc_pk=step["function_pk"]
+                        )
+            except Exception as e:
+                # 같은 필드의 이후 단계는 실행하지 않고 task_result 에서 전처리 실패 처리
+                self.telemetry.fail(step["index"], e)
+                raise
+            if results[step["index"]] is None:
+                self.telemetry.set_shape(step["index"], rows=len(field_data.index), columns=0)
+            else:
+                changed_field = results[step["index"]][0]
+                self.telemetry.set_shape(
+                    step["index"], rows=changed_field.shape[0],
+                    columns=changed_field.shape[1] if changed_field.ndim == 2 else 1)
+            self.telemetry.done(step["index"])
+        return results
+
+    def _run_steps(self, data, steps):
+        """
+        Run independent field chains concurrently (thread pool)
+        and Return index => result of every step
+        """
+        chains = self._step_chains(steps)
+        n_jobs = DATA_CONFIG.PREPROCESS_N_JOBS or os.cpu_count() or 1
+        n_jobs = min(n_jobs, len(chains))
+        results = dict()
+        if n_jobs <= 1:
+            for field_name, chain in chains.items():
+                results.update(self._run_chain(data, field_name, chain))
+            return results
+        logger.info(f"{len(chains)}개 필드의 전처리를 {n_jobs}개 스레드로 수행합니다")
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(self._run_chain, data, field_name, chain)
+                       for field_name, chain in chains.items()]
+            for future in futures:
+                results.update(future.result())
+        return results
+
+    def _task_drop_columns(self, data, step):
+        """
+        Drop Column of 'step' and Return Data without the column
+
+            Parameters:
+            -----------
+                 data (ColumnBlockBuilder) :
+                 preprocessed data in progress
+                 step (dict) :
+                 single field step from `_plan_steps`
+
+            Returns:
+            --------
+                 data (ColumnBlockBuilder):
+                 preprocessed data without 'field_name'
+                 (append new value to self.real_final_list)
+        """
+        single_field_name = step["field_name"]
+        logger.info("{} 필드를 데이터에서 제외시킵니다".format(single_field_name))
+        data.drop(single_field_name)
+        self.column_lineage.pop(single_field_name, None)
+        self.pipeline.add_drop(field_name=single_field_name)
+        single_result = dict(
+            field_name=single_field_name,
+            function_name="DropColumns",
+            function_pk=step["function_pk"],
+            file_name=None,
+            original_classes=None,
+            encoded_classes=None,
+        )
+        self.real_final_list.append(single_result)
+        return data
+
+    def _task_result(self, data, step, result, save_n):
+        """
+        Merging 'result' of `_cached_data_transformer` into 'data'
+        and saving fitted transformer (in request order)
+
+            Parameters:
+            -----------
+                 data (ColumnBlockBuilder) :
+                 preprocessed data in progress
+                 step (dict) :
+                 single field step from `_plan_steps`
+                 result (tuple) :
+                 (changed_field, fitted transformer, encoded_info, routing)
+                 save_n (int) :
+                 incremental Num for naming pickle file of transformer
+
+            Returns:
+            --------
+                 data (ColumnBlockBuilder):
+                 preprocessed data in progress
+                 save_n (int) :
+                 incremental Num for naming pickle file of transformer
+        """
+        single_field_name = step["field_name"]
+        pfunc_name = step["function_name"]
+        changed_field, fitted_transformer, encode_info, routing = result
+
+        self._merge_changed_field(data, single_field_name, changed_field, routing)
+        self.pipeline.add_transformer(
+            field_name=single_field_name, transformer=fitted_transformer, routing=routing
+        )
+
+        save_n += 1
+        saved_name = "T_{}_{}.pickle".format(self.pk, save_n)
+        logger.info(f'save "{saved_name}" <{pfunc_name} | {single_field_name}> ')
+
+        _ = super()._dump_pickle(
+            save_object=fitted_transformer,
+            base_path="PREPROCESS_TRANSFORMER_DIR",
+            file_name=saved_name,
+        )
+
+        info_dict = dict(
+            field_name=single_field_name,
+            function_name=pfunc_name,
+            function_pk=step["function_pk"],
+            file_name=saved_name,
+            original_classes=None,
+            encoded_classes=None,
+        )
+        if "origin_class" in encode_info.keys():
+            info_dict["original_classes"] = encode_info["origin_class"]
+            info_dict["encoded_classes"] = encode_info["encode_class"]
+        self.real_final_list.append(info_dict)
         return data, save_n
 
+    @staticmethod
+    def _summary_info(data_summary):
+        return dict(
+            columns_info=data_summary.columns_info(),
+            amount_info=data_summary.size_info(),
+            sample_data=data_summary.sample_info(),
+            statistics=data_summary.statistics_info(),
+        )
+
     def task_result(self, data_path, request_info):
         """
-        Preparation for calling `_task_drop_columns` and `_task_result`
+        Preparation for calling `_run_steps`, `_task_drop_columns` and `_task_result`
         according to 'request_info' and saving preprocessed Data
 
             Parameters:
@@ -471,48 +690,68 @@ class PreprocessTask(PreprocessorBase):
         """
         original_file_name = os.path.split(data_path)[1]
         original_file_ext = os.path.splitext(original_file_name)[1][1:]
+        if original_file_ext in ("csv", "json"):
+            self.original_file_ext = original_file_ext
+        if DATA_CONFIG.PREPROCESSED_DATA_FORMAT == "npz":
+            original_file_ext = "npz"
         self.file_name = "P_{}.{}".format(self.pk, original_file_ext)
 
         user_request_dict = request_info["request_data"]
-        data = super()._load_data(
-            base_path="ORIGINAL_DATA_DIR", file_name=original_file_name
-        )
+        # 캐시된 원본 데이터를 변경하지 않으므로 복사하지 않고 로드 (ColumnBlockBuilder 참고)
+        with self.telemetry.stage("load"):
+            data = ColumnBlockBuilder(super()._load_data(
+                base_path="ORIGINAL_DATA_DIR", file_name=original_file_name, copy=False
+            ))
+
+        if feature_cache.enabled:
+            # 원본 컬럼의 계보는 원본 파일 내용 해시 + 컬럼명
+            data_hash = original_file_hash(request_info["original_data_sequence_pk"], data_path)
+            self.column_lineage = {name: lineage_key(data_hash, name) for name in data.columns}
 
         save_N = 0
 
         try:
-            for get_request_dict in user_request_dict:
-                """
-                {'preprocess_functions_sequence_pk': 8, 'field_name': 'temp'}
-                {'preprocess_functions_sequence_pk': 10, 'field_name': 'season'}
-                {'preprocess_functions_sequence_pk': 14, 'field_name': 'datetime'}
-                """
-                pfunc_pk = get_request_dict["preprocess_functions_sequence_pk"]
-
-                self.func_query = PreprocessFunctionSerializer(
-                    PreprocessFunction.objects.get(pk=pfunc_pk)
-                ).data
-                func_name = self.func_query["PREPROCESS_FUNCTIONS_NAME"]
-
-                if func_name == "DropColumns":
-                    data = self._task_drop_columns(
-                        data=data, request_dict=get_request_dict
-                    )
+            # 필드별 단계는 동시에 계산하고, 결과는 요청 순서대로 합침 (결과가 항상 같음)
+            steps = self._plan_steps(user_request_dict)
+            self.telemetry.plan(steps)
+            results = self._run_steps(data, steps)
+            with self.telemetry.stage("merge"):
+                for step in steps:
+                    if step["transformer"] is None:
+                        data = self._task_drop_columns(data=data, step=step)
+                    else:
+                        data, save_N = self._task_result(
+                            data=data, step=step, result=results[step["index"]], save_n=save_N
+                        )
+                data = data.to_frame()
+                # 전체 전처리기를 하나의 파이프라인으로 저장 (모델 테스트에서 사용)
+                pipeline_file_name = PIPELINE_FILE_NAME.format(self.pk)
+                _ = super()._dump_pickle(
+                    save_object=self.pipeline,
+                    base_path="PREPROCESS_TRANSFORMER_DIR",
+                    file_name=pipeline_file_name,
+                )
+
+            # 저장한 파일을 다시 읽지 않고 메모리의 전처리 데이터로 요약 정보 계산
+            data_summary = DataSummary(data=data)
+            with self.telemetry.stage("save"):
+                if DATA_CONFIG.SUMMARY_WHILE_SAVING:
+                    # 통계 계산 프로세스를 저장 스레드보다 먼저 fork 함
+                    with data_summary.process_pool(), ThreadPoolExecutor(max_workers=1) as executor:
+                        saving = executor.submit(
+                            self._save_prep_data, prep_data=data, file_name=self.file_name)
+                        summary_info = self._summary_info(data_summary)
+                        saving.result()
                 else:
-                    data, save_N = self._task_result(
-                        data=data, request_dict=get_request_dict, save_n=save_N
-                    )
-            self._save_prep_data(prep_data=data, file_name=self.file_name)
-            data_summary = DataSummary(path=self.file_path)
+                    self._save_prep_data(prep_data=data, file_name=self.file_name)
+                    summary_info = self._summary_info(data_summary)
 
             final_result = dict(
                 file_path=self.file_path,
                 file_name=self.file_name,
                 summary=self.real_final_list,
-                columns_info=data_summary.columns_info(),
-                amount_info=data_summary.size_info(),
-                sample_data=data_summary.sample_info(),
-                statistics=data_summary.statistics_info(),
+                pipeline_file_name=pipeline_file_name,
+                **summary_info
             )
             return final_result
         except Exception as e:
@@ -0,0 +1,121 @@
+# API/ml/services/data_preprocess
+"""
+학습 데이터에 fit 한 전처리기를 하나로 묶은 파이프라인 (T_{pk}_pipeline.pickle)
+
+PreprocessTask 가 전처리를 수행하면서 단계별로 (필드명, 전처리기, 컬럼 처리 방식)을
+기록하고, 모델 테스트(ModelPerformance)에서는 파일 하나만 로드해서
+transform 한 번으로 전체 전처리를 적용함 (단계별 pickle 로드/DataFrame 재생성 없음)
+
+    컬럼 처리 방식 (routing)
+    drop    : 필드 제외 (DropColumns)
+    replace : 변환 결과로 같은 이름의 필드를 덮어씀 (스케일링, LabelEncoder 등)
+    expand  : 변환 결과를 '{필드명}_{i}' 필드로 추가하고 원래 필드는 제외 (OneHotEncoder 등)
+    skip    : 적용하지 않음 (Normalizer)
+"""
+
+from .column_builder import ColumnBlockBuilder
+from ....utils.custom_call import PreprocessUtils
+
+PIPELINE_FILE_NAME = "T_{}_pipeline.pickle"
+
+
+def routing_of(transformer_name, changed_field):
+    """
+    Return routing of transformed field
+    (same rule as `PreprocessTask._train_data_transformer`)
+
+        Parameters:
+        -----------
+             transformer_name (str) : class name of transformer
+             changed_field (numpy.ndarray) : result of 'fit_transform'
+
+        Returns:
+        --------
+             routing (str) : 'replace', 'expand' or 'skip'
+    """
+    if len(changed_field.shape) == 2 and changed_field.shape[1] == 1:
+        return "skip" if transformer_name == "Normalizer" else "replace"
+    elif len(changed_field.shape) == 1:
+        return "replace"
+    return "expand"
+
+
+class PreprocessPipeline:
+    """
+    Fitted preprocessing steps applied in request order
+
+        Attributes:
+        -----------
+            steps (list) : list of dict
+                (eg. {"field_name": "season", "function_name": "OneHotEncoder",
+                      "routing": "expand", "transformer": <fitted OneHotEncoder>})
+    """
+
+    def __init__(self):
+        self.steps = []
+
+    def add_drop(self, field_name):
+        self.steps.append(dict(field_name=field_name, function_name="DropColumns",
+                               routing="drop", transformer=None))
+
+    def add_transformer(self, field_name, transformer, routing):
+        # 'transformer' 는 필드별로 따로 fit 된 객체이므로 (_plan_steps 참고) 복사하지 않고 보관
+        self.steps.append(dict(field_name=field_name, function_name=type(transformer).__name__,
+                               routing=routing, transformer=transformer))
+
+    def find_transformer(self, field_name):
+        """
+        Return last fitted transformer applied to 'field_name' (None if not exists)
+        """
+        for step in reversed(self.steps):
+            if step["field_name"] == field_name and step["transformer"] is not None:
+                return step["transformer"]
+        return None
+
+    def transform(self, data):
+        """
+        Apply all steps to 'data' and Return new pd.DataFrame
+
+            Parameters:
+            -----------
+                 data (pandas.DataFrame) : data with same columns as train data
+
+            Returns:
+            --------
+                 (pandas.DataFrame) : preprocessed data
+
+            Raises:
+            -------
+                 KeyError : if field of step is not in data
+        """
+        columns = ColumnBlockBuilder(data)
+        for step in self.steps:
+            self.apply_step(columns, step)
+        return columns.to_frame()
+
+    @staticmethod
+    def apply_step(columns, step):
+        """
+        Apply single fitted 'step' to 'columns' (ColumnBlockBuilder) in place
+
+            Raises:
+            -------
+                 KeyError : if field of step is not in columns
+        """
+        field_name, routing = step["field_name"], step["routing"]
+        if field_name not in columns:
+            raise KeyError(field_name)
+        if routing == "drop":
+            columns.drop(field_name)
+        elif routing != "skip":
+            try:
+                field_values = columns.values_of(field_name).astype(float)
+            except ValueError:
+                field_values = columns.values_of(field_name)
+            changed_field = PreprocessUtils._to_array(
+                step["transformer"].transform(field_values.reshape(-1, 1)), keep_sparse=True)
+            if routing == "replace":
+                columns[field_name] = changed_field
+            else:
+                columns.expand(field_name, PreprocessUtils._new_columns(field_name, changed_field),
+                               changed_field)
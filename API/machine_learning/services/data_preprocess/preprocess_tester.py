@@ -2,18 +2,22 @@ import sys
 import logging
 import warnings
 import numpy as np
+import pandas as pd
 from django.http import Http404
-from scipy.sparse import csr_matrix
+from scipy.sparse import issparse
 from pandas.core.common import flatten
 
 from .preprocess_base import PreprocessorBase
+from ....config.data_config import DATA_CONFIG
 from ....utils.custom_decorator import where_exception
-from ....common.models.preprocess_function import PreprocessFunction
-from ....common.serializers.serializers import PreprocessFunctionSerializer
+from ....utils.class_registry import preprocess_function_registry
 
 warnings.filterwarnings("ignore")
 logger = logging.getLogger("collect_log_helper")
 
+PREVIEW_ROWS = 5  # 전처리 테스트 결과로 반환하는 행 수
+PREVIEW_MODES = ("stratified", "sample", "exact")
+
 
 def _error_return_dict(error_type, error_msg):
     """
@@ -31,6 +35,30 @@ def _error_return_dict(error_type, error_msg):
     return dict(error_type=error_type, error_msg=error_msg)
 
 
+def _stratified_sample(codes, size, random_state):
+    """
+    Return 'size' positions of 'codes' sampled without replacement,
+    in proportion to count of each code with at least one position per code
+    (None if number of codes is larger than 'size')
+    """
+    counts = np.bincount(codes)
+    present = counts > 0
+    if present.sum() > size:
+        return None
+    # 범주별 한 행 + 나머지 행을 (범주 행 수 - 1) 비율로 배분 (소수점 이하가 큰 범주부터 1행 추가)
+    extra = (counts - present) * (size - present.sum()) / (len(codes) - present.sum())
+    quota = present + np.floor(extra).astype(int)
+    remainder = size - quota.sum()
+    if remainder > 0:
+        quota[np.argsort(np.floor(extra) - extra, kind="stable")[:remainder]] += 1
+    # 무작위 순서에서 범주별로 앞쪽 quota 개 선택
+    order = random_state.permutation(len(codes))
+    by_code = order[np.argsort(codes[order], kind="stable")]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(codes)) - np.repeat(starts, counts)
+    return by_code[rank < np.repeat(quota, counts)]
+
+
 class TestPreprocessor(PreprocessorBase):
     """
     For processing test result of Preprocessor from original Data
@@ -44,17 +72,35 @@ class TestPreprocessor(PreprocessorBase):
             test_total_result (list) :
             final return value of user's requested
             about Preprocessor Testing
+            file_name (str) :
+            file name of original Data (eg. 'O_1.csv')
             test_data (pandas.DataFrame) :
             user requested Data for Preprocessor Testing
+            (only requested columns, loaded in `test_result`)
+            preview_mode (str) :
+            'stratified', 'sample' (fit with at most DATA_CONFIG.PREVIEW_SAMPLE_ROWS rows)
+            or 'exact' (fit with all rows)
     """
 
     def __init__(self, file_name, pk):
         self.func_query = None
         self.original_data_pk = pk
+        self.file_name = file_name
         self.test_total_result = []
-        self.test_data = super()._load_data(
-            base_path="ORIGINAL_DATA_DIR", file_name=file_name
-        )
+        self.test_data = None
+        self.preview_mode = DATA_CONFIG.PREVIEW_MODE
+
+    @staticmethod
+    def _requested_columns(request_list):
+        """
+        Return list of field names used by request (duplicates removed)
+        """
+        requested = []
+        for request_dict in request_list:
+            for field_name in request_dict["field_name"].split(","):
+                if field_name.strip() not in requested:
+                    requested.append(field_name.strip())
+        return requested
 
     @staticmethod
     def _mandatory_key_exists_original_patch(element):
@@ -105,7 +151,7 @@ class TestPreprocessor(PreprocessorBase):
                  list of flatten array which element
                 is converted to string
         """
-        NUM = 5
+        NUM = PREVIEW_ROWS
         changed_field = []
 
         if isinstance(after_[1], np.ndarray) and data_shape[1] == 1:
@@ -121,11 +167,12 @@ class TestPreprocessor(PreprocessorBase):
             # LabelEncoder
             # print('type 2', function_name)
             changed_field = list(map(lambda x: str(x), list(flatten(after_[:NUM]))))
-        elif isinstance(after_[1], csr_matrix):
+        elif issparse(after_):
             # KBinsDiscretizer, OneHotEncoder(sparse=True)
             # print('type 3', function_name)
-            changed_field = after_.toarray()
-            changed_field = list(list(i) for i in changed_field[:NUM])
+            # 반환할 행만 dense 로 변환
+            changed_field = after_[:NUM].toarray()
+            changed_field = list(list(i) for i in changed_field)
             changed_field = list(map(lambda x: str(x), changed_field))
         elif isinstance(after_[1], np.ndarray) and data_shape[1] != 1:
             # LabelBinarizer, MultiLabelBinarizer, OneHotEncoder(sparse=False)
@@ -134,10 +181,45 @@ class TestPreprocessor(PreprocessorBase):
             changed_field = list(map(lambda x: str(x), changed_field))
         return changed_field
 
+    def _fit_positions(self, field):
+        """
+        Return row positions used for fitting (None => all rows)
+
+        항상 반환할 앞 PREVIEW_ROWS 행과 나머지 행에서 중복 없이 추출한 행으로
+        모두 PREVIEW_SAMPLE_ROWS 행을 사용함
+        stratified 는 숫자가 아닌 필드의 범주별 행 수 비율대로 추출하고 모든 범주를 한 행 이상 포함함
+        (OneHotEncoder 등의 결과 컬럼 수가 전체 데이터로 fit 한 경우와 같음,
+         범주 수가 추출할 행 수보다 많으면 sample 과 같음)
+
+            Parameters:
+            -----------
+                 field (pandas.Series) :
+                 specific data values selected by field name
+
+            Returns:
+            --------
+                 positions (numpy.ndarray) : sorted row positions
+                 or None (if exact mode or data is small enough)
+        """
+        n_rows = len(field)
+        n_sample = DATA_CONFIG.PREVIEW_SAMPLE_ROWS
+        if self.preview_mode == "exact" or n_rows <= n_sample:
+            return None
+        random_state = np.random.RandomState(2019)
+        size = n_sample - PREVIEW_ROWS
+        sampled = None
+        if self.preview_mode == "stratified" and field.dtype.kind not in "biufc":
+            # 결측값(-1)도 하나의 범주로 추출
+            codes = pd.factorize(field)[0][PREVIEW_ROWS:] + 1
+            sampled = _stratified_sample(codes, size, random_state)
+        if sampled is None:
+            sampled = random_state.choice(n_rows - PREVIEW_ROWS, size=size, replace=False)
+        return np.concatenate([np.arange(PREVIEW_ROWS), np.sort(sampled) + PREVIEW_ROWS])
+
     def _test_transformer(self, field, field_name, transformer):
         """
-        Perform fit_transform with specific field
-        with requested transformer
+        Perform fit with specific field (or its sample by self.preview_mode)
+        with requested transformer and transform only returned rows
 
             Parameters:
             -----------
@@ -153,6 +235,8 @@ class TestPreprocessor(PreprocessorBase):
                  show_changed_field (dict) :
                  converted value of changed_field
                  by '_convert_to_return_shape' function
+                 fit_rows (int) :
+                 number of rows used for fitting
                  or
                  return_error (dict) :
                  specific error info to induce custom error
@@ -160,7 +244,15 @@ class TestPreprocessor(PreprocessorBase):
         transformer_name = type(transformer).__name__
 
         try:
-            changed_field = transformer.fit_transform(field.values.reshape(-1, 1))
+            field_values = field.values.reshape(-1, 1)
+            positions = self._fit_positions(field)
+            if positions is None:
+                transformer.fit(field_values)
+                fit_rows = len(field_values)
+            else:
+                transformer.fit(field_values[positions])
+                fit_rows = len(positions)
+            changed_field = transformer.transform(field_values[:PREVIEW_ROWS])
 
             # 결과를 반환하기 위해 결과 형태 변환
             show_changed_field = self._convert_to_return_shape(
@@ -170,7 +262,7 @@ class TestPreprocessor(PreprocessorBase):
             show_changed_field = dict(
                 zip(range(0, len(show_changed_field)), show_changed_field)
             )
-            return show_changed_field
+            return show_changed_field, fit_rows
         except Exception as e:
             where_exception(error_msg=e)
             logger.error(f"{transformer_name} 전처리 기능 fit&transform 도중 에러가 발생했습니다")
@@ -202,7 +294,7 @@ class TestPreprocessor(PreprocessorBase):
             self.test_data = super()._drop_columns(
                 data=self.test_data, columns=single_field_name
             )
-            fake_drop_columns = [" "] * 5
+            fake_drop_columns = [" "] * PREVIEW_ROWS
             fake_drop_columns = dict(
                 zip(range(0, len(fake_drop_columns)), fake_drop_columns)
             )
@@ -233,7 +325,8 @@ class TestPreprocessor(PreprocessorBase):
                  _error_return_dict() (dict) :
                  specific error info to induce custom error
         """
-        transformer = super()._get_base_object(params=self.func_query)
+        transformer = preprocess_function_registry.new_instance(
+            self.func_query["PREPROCESS_FUNCTIONS_SEQUENCE_PK"])
         base_param = transformer.get_params()
 
         if "condition" in request_detail.keys():  # 파라미터 수정을 요청한 경우
@@ -270,7 +363,8 @@ class TestPreprocessor(PreprocessorBase):
             try:
                 field_column = self.test_data[single_field_name].astype(float)
             except ValueError:
-                field_column = self.test_data[single_field_name]
+                # test_data 는 캐시와 공유하므로 (copy=False) 전처리기가 값을 바꾸지 않도록 복사
+                field_column = self.test_data[single_field_name].copy()
             except Exception as e:
                 where_exception(error_msg=e)
             after_changed = self._test_transformer(
@@ -279,7 +373,7 @@ class TestPreprocessor(PreprocessorBase):
                 transformer=transformer,
             )
 
-            before_changed = field_column.values.reshape(-1, 1)[:5]
+            before_changed = field_column.values.reshape(-1, 1)[:PREVIEW_ROWS]
             before_changed = list(flatten(before_changed))
             before_changed = dict(zip(range(0, len(before_changed)), before_changed))
 
@@ -287,12 +381,15 @@ class TestPreprocessor(PreprocessorBase):
             if isinstance(after_changed, dict) and "error_name" in after_changed.keys():
                 return _error_return_dict("4104", after_changed["error_detail"])
             else:
+                after_changed, fit_rows = after_changed
                 single_result = {
                     "field_name": single_field_name,
                     "function_name": func_name,
                     "function_parameter": request_condition,
                     # 'original': before_changed,
                     "test_result": after_changed,
+                    "preview_mode": self.preview_mode if fit_rows < len(field_column) else "exact",
+                    "fit_rows": fit_rows,
                 }
                 self.test_total_result.append(single_result)
 
@@ -318,15 +415,20 @@ class TestPreprocessor(PreprocessorBase):
         is_keys = self._mandatory_key_exists_original_patch(element=request_info)
         if isinstance(is_keys, str):  # mandatory key name (str)
             return _error_return_dict("4101", is_keys)
+        # 전처리 테스트 방식 검사 (4102)
+        if "preview_mode" in request_info.keys():
+            if request_info["preview_mode"] not in PREVIEW_MODES:
+                return _error_return_dict("4102", "preview_mode")
+            self.preview_mode = request_info["preview_mode"]
         request_info_list = request_info["request_test"]
+        # 데이터를 로드하지 않고 헤더(컬럼명)만 확인
+        data_columns = super()._load_columns(
+            base_path="ORIGINAL_DATA_DIR", file_name=self.file_name
+        )
         for request_info_dict in request_info_list:
             # 요청한 전처리 기능이 있는지 검사 (Http404)
             pfunc_id = request_info_dict["preprocess_functions_sequence_pk"]
-            if not int(pfunc_id) in list(
-                PreprocessFunction.objects.all().values_list(
-                    "PREPROCESS_FUNCTIONS_SEQUENCE_PK", flat=True
-                )
-            ):
+            if pfunc_id not in preprocess_function_registry:
                 raise Http404
             # 요청한 필드명이 원본 데이터에 있는지 검사 (4102)
             field_name = request_info_dict["field_name"]
@@ -337,7 +439,7 @@ class TestPreprocessor(PreprocessorBase):
                 field_name_list = [field_name]
 
             for field_name_ in field_name_list:
-                if field_name_ not in list(self.test_data.columns):
+                if field_name_ not in data_columns:
                     return _error_return_dict("4102", field_name_)
         return True
 
@@ -362,14 +464,19 @@ class TestPreprocessor(PreprocessorBase):
         """
         logger.info(f"[전처리 테스트] 요청 ID [{self.original_data_pk}]의 테스트 결과 생성 중...")
         user_request_dict = request_info["request_test"]
+        # 요청한 필드만 로드
+        self.test_data = super()._load_data(
+            base_path="ORIGINAL_DATA_DIR",
+            file_name=self.file_name,
+            copy=False,
+            columns=self._requested_columns(user_request_dict),
+        )
 
         for get_request_dict in user_request_dict:
             field_name = get_request_dict["field_name"]  # 전처리 요청한 컬럼명
-            self.func_query = PreprocessFunctionSerializer(
-                PreprocessFunction.objects.get(
-                    pk=get_request_dict["preprocess_functions_sequence_pk"]
-                )
-            ).data
+            self.func_query = preprocess_function_registry.row(
+                get_request_dict["preprocess_functions_sequence_pk"]
+            )
             func_name = self.func_query["PREPROCESS_FUNCTIONS_NAME"]
 
             if func_name == "DropColumns":  # self.test_total_result is changed
@@ -0,0 +1,143 @@
+# API/ml/services/data_preprocess
+"""
+전처리 결과 재사용 (같은 원본 데이터 + 같은 전처리 요청이면 celery 작업 없이 기존 결과 사용)
+
+    key (REQUEST_FINGERPRINT) : sha256(원본 파일 내용 해시(OriginalData.FILE_HASH) + 정규화한 request_data)
+    hit : PROGRESS_STATE 가 success 이고 DELETE_FLAG 가 False 이며 P_* 파일이 남아있는 행
+          => 새 PreprocessedData 행이 기존 P_* 파일/전처리기(T_*)/파이프라인을 그대로 가리킴
+    delete : 다른 (삭제되지 않은) 행이 같은 파일을 가리키면 파일은 지우지 않고 DELETE_FLAG 만 변경
+"""
+import os
+import glob
+import json
+import hashlib
+import logging
+from ast import literal_eval
+
+from ...models.original_data import OriginalData
+from ...models.preprocessed_data import PreprocessedData
+from ...serializers.serializers import PreprocessedDataSerializer
+from ....config.result_path_config import PATH_CONFIG
+
+logger = logging.getLogger("collect_log_helper")
+
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def file_hash(file_path):
+    """
+    Return sha256 hex digest of file contents (read by blocks)
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stored_file_hash(original_data_pk):
+    """
+    Return FILE_HASH of OriginalData without computing it (None if not saved)
+    (웹 요청에서 사용, 파일 전체를 읽는 계산은 celery 작업의 `original_file_hash` 에서 수행)
+    """
+    return OriginalData.objects.get(pk=original_data_pk).FILE_HASH or None
+
+
+def original_file_hash(original_data_pk, file_path):
+    """
+    Return FILE_HASH of OriginalData
+    (이전에 등록되어 FILE_HASH 가 없는 데이터는 계산해서 저장)
+    """
+    original_data = OriginalData.objects.get(pk=original_data_pk)
+    if not original_data.FILE_HASH:
+        original_data.FILE_HASH = file_hash(file_path)
+        original_data.save(update_fields=["FILE_HASH"])
+    return original_data.FILE_HASH
+
+
+def _normalize_step(request_dict):
+    # field_name 은 쉼표로 구분된 문자열, condition 값은 `_change_transformer_params` 와 같이 소문자 문자열로 비교
+    field_name = request_dict["field_name"]
+    if not isinstance(field_name, str):
+        field_name = ",".join(field_name)
+    condition = request_dict.get("condition") or {}
+    return dict(
+        preprocess_functions_sequence_pk=int(request_dict["preprocess_functions_sequence_pk"]),
+        field_name=[name.strip() for name in field_name.split(",")],
+        condition={str(k): str(v).lower() for k, v in condition.items()},
+    )
+
+
+def request_fingerprint(data_hash, request_data):
+    """
+    Return fingerprint of preprocessing request
+
+        Parameters:
+        -----------
+             data_hash (str) : FILE_HASH of original data
+             request_data (list) : 'request_data' of user's request body
+                                   (순서가 결과에 영향을 주므로 순서는 유지)
+
+        Returns:
+        --------
+             (str) : sha256 hex digest
+    """
+    normalized = json.dumps(
+        dict(data=data_hash, request_data=[_normalize_step(i) for i in request_data]),
+        sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def find_cached_result(fingerprint):
+    """
+    Return serialized PreprocessedData having same fingerprint (None if not exists)
+    """
+    if not fingerprint:  # 원본 데이터의 FILE_HASH 가 아직 없는 경우
+        return None
+    queryset = PreprocessedData.objects.filter(
+        REQUEST_FINGERPRINT=fingerprint, PROGRESS_STATE="success", DELETE_FLAG=False
+    ).order_by("-PREPROCESSED_DATA_SEQUENCE_PK")
+    for preprocessed_data in queryset:
+        if os.path.isfile(preprocessed_data.FILEPATH):
+            return PreprocessedDataSerializer(preprocessed_data).data
+    return None
+
+
+def cached_result_info(cached, original_data_pk):
+    """
+    Return values of new PreprocessedData pointing at files of 'cached'
+    """
+    keys = ["FILEPATH", "FILENAME", "SUMMARY", "PIPELINE_FILENAME",
+            "COLUMNS", "STATISTICS", "SAMPLE_DATA", "AMOUNT", "REQUEST_FINGERPRINT"]
+    info = {key: cached[key] for key in keys}
+    info["ORIGINAL_DATA_SEQUENCE_FK1"] = original_data_pk
+    return info
+
+
+def transformer_files(preprocessed_data):
+    """
+    Return saved transformer(T_*.pickle) paths used by serialized PreprocessedData
+    (SUMMARY 의 file_name 과 PIPELINE_FILENAME, 없으면 T_{pk}_*.pickle)
+    (DropColumns 등 전처리기를 저장하지 않은 단계는 file_name 이 None)
+    """
+    trans_dir = PATH_CONFIG.RESULT_ML_PREPROCESS_TRANS_DIR
+    try:
+        file_names = [i["file_name"] for i in literal_eval(preprocessed_data["SUMMARY"]) if i["file_name"]]
+    except (ValueError, SyntaxError, TypeError, KeyError):
+        file_names = []
+    if preprocessed_data["PIPELINE_FILENAME"]:
+        file_names.append(preprocessed_data["PIPELINE_FILENAME"])
+    if not file_names:
+        return glob.glob(os.path.join(
+            trans_dir, "T_{}_*.pickle".format(preprocessed_data["PREPROCESSED_DATA_SEQUENCE_PK"])))
+    file_paths = [os.path.join(trans_dir, name) for name in file_names]
+    return [path for path in file_paths if os.path.isfile(path)]
+
+
+def is_shared(preprocessed_data):
+    """
+    Return True if other PreprocessedData (not deleted) uses same data file
+    """
+    return PreprocessedData.objects.filter(
+        FILEPATH=preprocessed_data["FILEPATH"], DELETE_FLAG=False
+    ).exclude(pk=preprocessed_data["PREPROCESSED_DATA_SEQUENCE_PK"]).exists()
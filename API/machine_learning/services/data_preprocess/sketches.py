@@ -0,0 +1,310 @@
+# API/ml/services/data_preprocess
+"""
+청크 단위(스트리밍) 통계 계산에 사용하는 병합 가능한 요약 구조
+
+    QuantileSketch : 분위수 스케치 (KLL 방식, 메모리 O(k log n))
+    StreamingHistogram : 범위를 2배씩 넓혀가는 적응형 히스토그램
+    HyperLogLog : 고유값 수 추정 (메모리 2**p byte)
+    MisraGries : 빈도 상위 범주(heavy hitters) 추정 (메모리 O(capacity))
+
+from_error(error) 로 생성하면 허용 오차에 맞게 크기를 정함
+"""
+import numpy as np
+import pandas as pd
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch (KLL style compactors)
+
+    level h 의 원소는 가중치 2**h 를 가지며, 버퍼가 용량을 넘으면
+    정렬 후 한 칸 건너 하나씩 상위 level 로 올림 (rank 오차 약 1/k)
+
+        Attributes:
+        -----------
+            k (int) : capacity of top compactor (accuracy parameter)
+            compactors (list) : list of numpy.ndarray per level
+            count (int) : number of values seen
+    """
+
+    def __init__(self, k=200, seed=2019):
+        self.k = k
+        self.compactors = [np.empty(0)]
+        self.count = 0
+        self._random = np.random.RandomState(seed)
+
+    @classmethod
+    def from_error(cls, error):
+        """
+        Return sketch whose rank error is about 'error' (eg. 0.01 => k=200)
+        """
+        return cls(k=max(8, int(np.ceil(2.0 / error))))
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.compactors):
+            buffer = self.compactors[level]
+            if len(buffer) > self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                buffer = np.sort(buffer)
+                # 홀수 개인 경우 하나는 현재 level 에 남김
+                keep = buffer[-1:] if len(buffer) % 2 else buffer[:0]
+                buffer = buffer[: len(buffer) - len(keep)]
+                promoted = buffer[self._random.randint(2)::2]
+                self.compactors[level] = keep
+                self.compactors[level + 1] = np.concatenate(
+                    [self.compactors[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.count += values.size
+        self._compress()
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, buffer in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], buffer])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def weighted_items(self):
+        """
+        Return (items, weights) sorted by items
+        """
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate(
+            [np.full(len(buffer), 2.0 ** level) for level, buffer in enumerate(self.compactors)])
+        order = np.argsort(items, kind="mergesort")
+        return items[order], weights[order]
+
+    def quantiles(self, qs):
+        """
+        Return approximate quantiles
+
+            Parameters:
+            -----------
+                 qs (list) : quantiles between 0 and 1 (eg. [0.25, 0.5, 0.75])
+
+            Returns:
+            --------
+                 (numpy.ndarray) : approximate value of each quantile
+        """
+        items, weights = self.weighted_items()
+        if items.size == 0:
+            return np.full(len(qs), np.nan)
+        cumulative = np.cumsum(weights)
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        index = np.searchsorted(cumulative, targets, side="left")
+        return items[np.clip(index, 0, items.size - 1)]
+
+    def histogram(self, bins, value_range):
+        """
+        Return approximate histogram frequency scaled to number of values seen
+        """
+        items, weights = self.weighted_items()
+        freq, edges = np.histogram(items, bins=bins, range=value_range, weights=weights)
+        if weights.sum() > 0:
+            freq = freq * (self.count / weights.sum())
+        return np.round(freq), edges
+
+
+class StreamingHistogram:
+    """
+    Mergeable histogram with adaptive bins
+
+    처음 청크의 [min, max] 를 n_bins 로 나누어 시작하고, 범위를 벗어난 값이
+    들어오면 인접한 두 bin 을 합치면서 범위를 2배로 넓힘
+
+        Attributes:
+        -----------
+            n_bins (int) : number of fine bins (even number)
+            low (float) : left edge of first bin
+            width (float) : width of single bin
+            counts (numpy.ndarray) : frequency of each bin
+    """
+
+    def __init__(self, n_bins=1024):
+        self.n_bins = n_bins
+        self.low = None
+        self.width = None
+        self.counts = np.zeros(n_bins)
+
+    def _cover(self, vmin, vmax):
+        if self.low is None:
+            span = vmax - vmin
+            self.low = vmin
+            self.width = span / self.n_bins if span > 0 else max(abs(vmin), 1.0) / self.n_bins
+            return
+        while vmin < self.low or vmax > self.low + self.width * self.n_bins:
+            half = self.counts.reshape(-1, 2).sum(axis=1)
+            empty = np.zeros(self.n_bins // 2)
+            if vmin < self.low:  # 왼쪽으로 확장
+                self.counts = np.concatenate([empty, half])
+                self.low = self.low - self.width * self.n_bins
+            else:  # 오른쪽으로 확장
+                self.counts = np.concatenate([half, empty])
+            self.width *= 2
+
+    def update(self, values, weights=None):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self._cover(values.min(), values.max())
+        index = np.clip(((values - self.low) / self.width).astype(np.int64), 0, self.n_bins - 1)
+        self.counts += np.bincount(index, weights=weights, minlength=self.n_bins)
+
+    def centers(self):
+        return self.low + (np.arange(self.n_bins) + 0.5) * self.width
+
+    def merge(self, other):
+        if other.low is not None:
+            occupied = other.counts > 0
+            self.update(other.centers()[occupied], weights=other.counts[occupied])
+        return self
+
+    def histogram(self, bins, value_range):
+        """
+        Return histogram re-binned to 'bins' equal bins over 'value_range'
+        """
+        if self.low is None:
+            return np.histogram(np.empty(0), bins=bins, range=value_range)
+        centers = np.clip(self.centers(), value_range[0], value_range[1])
+        return np.histogram(centers, bins=bins, range=value_range, weights=self.counts)
+
+
+def _bit_length(values):
+    """
+    Return bit length of each uint64 value (0 => 0)
+    """
+    values = values.copy()
+    length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        over = values >= (np.uint64(1) << np.uint64(shift))
+        length[over] += shift
+        values[over] >>= np.uint64(shift)
+    return length + (values > 0)
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct count estimator (HyperLogLog)
+
+    값을 64bit 해시(pd.util.hash_pandas_object)로 바꾼 뒤 상위 p bit 로 레지스터를 고르고,
+    나머지 bit 의 (선행 0 개수 + 1) 최댓값을 레지스터에 저장함
+    (표준오차 약 1.04 / sqrt(2**p), 결측값은 제외)
+
+        Attributes:
+        -----------
+            p (int) : number of index bits
+            registers (numpy.ndarray) : uint8 array of size 2**p
+    """
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    @classmethod
+    def from_error(cls, error):
+        """
+        Return estimator whose standard error is at most half of 'error'
+        (eg. 0.01 => p=16)
+        """
+        p = int(np.ceil(np.log2((1.04 / (error / 2.0)) ** 2)))
+        return cls(p=min(18, max(4, p)))
+
+    def update(self, values):
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return
+        hashed = pd.util.hash_pandas_object(values, index=False).values.astype(np.uint64)
+        index = (hashed >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashed & np.uint64((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - _bit_length(rest) + 1
+        best = pd.Series(rank).groupby(index).max()
+        position = best.index.values
+        self.registers[position] = np.maximum(self.registers[position],
+                                              best.values.astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """
+        Return estimated number of distinct values
+        """
+        m = float(self.registers.size)
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[int(m)]
+        raw = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # 작은 범위는 linear counting 으로 보정
+            return m * np.log(m / zeros)
+        return raw
+
+
+class MisraGries:
+    """
+    Mergeable heavy hitters summary (Misra-Gries)
+
+    최대 capacity 개의 (값, 빈도) 만 유지하고, 넘치면 (capacity + 1) 번째 빈도만큼
+    모두 차감함. 유지하는 빈도는 실제 빈도보다 최대 count / (capacity + 1) 만큼 작음
+
+        Attributes:
+        -----------
+            capacity (int) : max number of kept values
+            counts (pandas.Series) : estimated frequency of kept values
+            count (int) : number of values seen (nan excluded)
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = pd.Series([], dtype=np.int64)
+        self.count = 0
+
+    @classmethod
+    def from_error(cls, error, min_capacity=1):
+        """
+        Return summary whose frequency error is at most 'error' * count
+        """
+        return cls(capacity=max(min_capacity, int(np.ceil(1.0 / error))))
+
+    def _add(self, counts, count):
+        self.count += count
+        self.counts = self.counts.add(counts, fill_value=0).astype(np.int64)
+        if len(self.counts) > self.capacity:
+            threshold = np.sort(self.counts.values)[::-1][self.capacity]
+            self.counts = self.counts[self.counts > threshold] - threshold
+
+    def update(self, values):
+        self.add_counts(pd.Series(values).value_counts(dropna=True))
+
+    def add_counts(self, counts):
+        """
+        Add frequency table 'counts' (pandas.Series of value => frequency)
+        """
+        self._add(counts, int(counts.sum()))
+
+    def merge(self, other):
+        self._add(other.counts, other.count)
+        return self
+
+    def top(self, k):
+        """
+        Return 'k' most frequent values as pandas.Series sorted by frequency
+        """
+        return self.counts.sort_values(ascending=False, kind="mergesort")[:k]
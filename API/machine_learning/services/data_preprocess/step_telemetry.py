@@ -0,0 +1,209 @@
+# API/ml/services/data_preprocess
+"""
+전처리 단계별 실행 기록 (PreprocessTask 에서 사용)
+
+request_data 의 단계(필드 하나 x 전처리 기능 하나)마다 아래 값을 기록하고,
+celery task meta(update_state, state='PROGRESS')로 진행 상황을 알린 뒤
+작업이 끝나면 PreprocessedData.TELEMETRY 에 저장함
+
+    wall_seconds : 경과 시간
+    cpu_seconds : 단계를 실행한 스레드의 CPU 시간 (필드별 단계는 스레드로 동시에 실행되므로 스레드 기준)
+    peak_rss_delta : 단계 시작 시점의 RSS 대비 단계 실행 중 최대 RSS 증가량(byte)
+                     RSS 는 프로세스 단위 값이므로 다른 단계와 겹치지 않고 실행된 단계만 기록하고
+                     동시에 실행된 단계는 None (`_peak_rss_delta` 참고)
+    output_shape : 단계 출력의 (행 수, 컬럼 수) (DropColumns 는 컬럼 수 0)
+
+청크 단위 처리(StreamingPreprocessTask)는 같은 단계의 청크별 값을 더함 (peak_rss_delta 는 최댓값)
+그 외 데이터 로드/저장 등 단계가 아닌 구간은 'stages' 에 경과 시간만 기록하고,
+프로세스 최대 RSS 는 단계와 별도로 'process' 에 기록
+"""
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+import psutil
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("collect_log_helper")
+
+# 스레드 CPU 시간 (python 3.7 미만은 프로세스 CPU 시간)
+_thread_time = getattr(time, "thread_time", time.process_time)
+
+# update_state 호출 최소 간격(초), 청크마다 호출하지 않도록 제한
+PUBLISH_INTERVAL_SECONDS = 1.0
+
+
+def rss_bytes():
+    """
+    Return current resident set size of current process (byte)
+    """
+    return psutil.Process().memory_info().rss
+
+
+def peak_rss_bytes():
+    """
+    Return peak resident set size of current process (byte)
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # linux 는 KB 단위
+    memory_info = psutil.Process().memory_info()
+    return getattr(memory_info, "peak_wset", memory_info.rss)
+
+
+class StepTelemetry:
+    """
+    Per step wall time, CPU time, peak RSS delta and output shape of preprocessing
+
+        Attributes:
+        -----------
+            records (dict) : step index => record dict
+            stages (dict) : stage name (eg. 'load', 'save') => wall seconds
+            publish (function) : called with progress meta dict (None => not published)
+                                 (eg. lambda meta: task.update_state(state="PROGRESS", meta=meta))
+    """
+
+    def __init__(self, publish=None):
+        self.records = dict()
+        self.stages = dict()
+        self.publish = publish
+        self._active = set()  # 측정 중인 단계 index
+        self._start_peak = peak_rss_bytes()
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()  # 여러 스레드가 동시에 update_state 를 호출하지 않도록
+        self._published_at = 0.0
+
+    def plan(self, steps):
+        """
+        Register steps of `PreprocessTask._plan_steps` (state 'pending')
+        """
+        for step in steps:
+            self.records[step["index"]] = dict(
+                index=step["index"],
+                field_name=step["field_name"],
+                function_name=step["function_name"],
+                state="pending",
+                wall_seconds=0.0,
+                cpu_seconds=0.0,
+                peak_rss_delta=0,
+                output_shape=None,
+            )
+        self._publish(force=True)
+
+    @staticmethod
+    def _peak_rss_delta(start_rss, start_peak):
+        """
+        Return increase of max RSS during block from RSS at start of block
+
+        프로세스 최대 RSS(ru_maxrss)가 블록 실행 중 늘었다면 블록 안의 최대 RSS 는 늘어난 최대 RSS 이고,
+        늘지 않았다면 블록 안의 최대 RSS 를 알 수 없으므로 시작/종료 시점 RSS 중 큰 값을 사용 (하한값)
+        (블록 시작 이후 다른 단계가 실행되지 않은 경우에만 단계의 값)
+        """
+        end_rss, end_peak = rss_bytes(), peak_rss_bytes()
+        peak = end_peak if end_peak > start_peak else max(start_rss, end_rss)
+        return max(peak - start_rss, 0)
+
+    @contextmanager
+    def measure(self, index):
+        """
+        Measure block of step 'index' and Add the values to its record
+        """
+        record = self.records[index]
+        with self._lock:
+            if record["state"] == "pending":
+                record["state"] = "running"
+            if self._active:
+                # 동시에 실행되는 단계가 있으면 RSS 를 단계별로 나눌 수 없음
+                for active in self._active | {index}:
+                    self.records[active]["overlapped"] = True
+            self._active.add(index)
+        start_wall, start_cpu = time.perf_counter(), _thread_time()
+        start_rss, start_peak = rss_bytes(), peak_rss_bytes()
+        try:
+            yield record
+        finally:
+            wall, cpu = time.perf_counter() - start_wall, _thread_time() - start_cpu
+            peak_delta = self._peak_rss_delta(start_rss, start_peak)
+            with self._lock:
+                self._active.discard(index)
+                record["wall_seconds"] += wall
+                record["cpu_seconds"] += cpu
+                record["peak_rss_delta"] = max(record["peak_rss_delta"], peak_delta)
+            self._publish()
+
+    def set_shape(self, index, rows, columns, accumulate=False):
+        """
+        Set output shape of step 'index' (accumulate => add rows of chunk)
+        """
+        with self._lock:
+            record = self.records[index]
+            if accumulate and record["output_shape"] is not None:
+                rows += record["output_shape"][0]
+            record["output_shape"] = [int(rows), int(columns)]
+
+    def done(self, index):
+        with self._lock:
+            self.records[index]["state"] = "done"
+        self._publish()
+
+    def fail(self, index, error):
+        """
+        Mark step 'index' as failed with 'error' message
+        """
+        with self._lock:
+            self.records[index]["state"] = "failed"
+            self.records[index]["error"] = str(error)
+        self._publish(force=True)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measure wall seconds of non step block (eg. 'load', 'merge', 'save')
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            self._publish(force=True)
+
+    def result(self):
+        """
+        Return dict(steps=records in request order, stages=stage seconds,
+                    process=peak RSS of process and its increase during preprocessing)
+        """
+        with self._lock:
+            steps = [dict(self.records[index]) for index in sorted(self.records)]
+            for record in steps:
+                record["wall_seconds"] = round(record["wall_seconds"], 4)
+                record["cpu_seconds"] = round(record["cpu_seconds"], 4)
+                if record.pop("overlapped", False):
+                    record["peak_rss_delta"] = None
+            stages = {name: round(seconds, 4) for name, seconds in self.stages.items()}
+        peak = peak_rss_bytes()
+        process = dict(peak_rss=peak, peak_rss_delta=max(peak - self._start_peak, 0))
+        return dict(steps=steps, stages=stages, process=process)
+
+    def _publish(self, force=False):
+        if self.publish is None:
+            return
+        with self._publish_lock:
+            now = time.perf_counter()
+            if not force and now - self._published_at < PUBLISH_INTERVAL_SECONDS:
+                return
+            self._published_at = now
+            meta = self.result()
+            meta["steps_done"] = sum(1 for record in meta["steps"] if record["state"] == "done")
+            meta["steps_total"] = len(meta["steps"])
+            try:
+                self.publish(meta)
+            except Exception as e:
+                # 진행 상황 전달에 실패해도 전처리는 계속 진행
+                logger.warning(f"전처리 진행 상황을 전달하지 못했습니다 ({e})")
@@ -0,0 +1,396 @@
+# API/ml/services/data_preprocess
+"""
+메모리보다 큰 원본 데이터의 청크 단위 전처리 (StreamingPreprocessTask)
+
+원본 파일 크기가 DATA_CONFIG.STREAMING_PREPROCESS_MIN_BYTES 보다 크면
+전체 데이터를 메모리에 올리지 않고 DATA_CONFIG.DATA_CHUNK_ROWS 행씩 읽으면서 처리함
+
+    pass 1 (fit) : 청크를 읽으면서 단계별 전처리기를 fit
+        partial_fit  : StandardScaler, MinMaxScaler, MaxAbsScaler
+        범주 수집    : OneHotEncoder, OrdinalEncoder, LabelEncoder, LabelBinarizer, Binarizer
+                      (청크별 고유값을 합친 뒤 고유값으로 fit => 전체 데이터로 fit 한 결과와 같음)
+        통계 수집    : SimpleImputer (mean, most_frequent, constant 는 전체 데이터와 같음,
+                      median 은 분위수 스케치 근사값)
+                      KBinsDiscretizer (uniform 은 최소/최대값, quantile 은 분위수 스케치 근사값)
+                      RobustScaler (분위수 스케치 근사값)
+        같은 필드에 여러 단계를 요청한 경우 앞 단계가 fit 되어야 다음 단계를 fit 할 수 있으므로
+        단계가 이어지는 만큼 fit pass 를 반복 (보통 1번)
+    pass 2 (transform) : fit 된 파이프라인으로 청크를 변환해서 바로 저장(npz 또는 csv)하고
+                         요약 정보(StreamingDataSummary)도 같은 청크로 누적
+
+지원하지 않는 전처리기(eg. kmeans KBinsDiscretizer, MultiLabelBinarizer)가 있으면
+기존 방식(PreprocessTask.task_result)으로 처리함
+"""
+import os
+import logging
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .sketches import QuantileSketch
+from .data_summary import StreamingDataSummary
+from .column_builder import ColumnBlockBuilder
+from .preprocess_helper import PreprocessTask, PREPROCESSED_DATA_DIR
+from .preprocess_pipeline import PreprocessPipeline, PIPELINE_FILE_NAME, routing_of
+from ....config.data_config import DATA_CONFIG
+from ....utils.columnar_storage import ColumnarWriter
+from ....utils.custom_call import iter_data_chunks
+from ....utils.custom_decorator import where_exception
+
+logger = logging.getLogger("collect_log_helper")
+
+
+class StepFitter:
+    """
+    Fit single transformer from chunks (stateless transformer)
+
+        Attributes:
+        -----------
+            transformer (object) : preprocessor from scikit-learn library
+            sample (numpy.ndarray) : values for routing and encoded info (first chunk)
+    """
+
+    def __init__(self, transformer):
+        self.transformer = transformer
+        self.sample = None
+
+    def update(self, values):
+        if self.sample is None:
+            self.sample = values
+
+    def finish(self):
+        return self.transformer.fit(self.sample)
+
+
+class PartialFitFitter(StepFitter):
+    def update(self, values):
+        super().update(values)
+        self.transformer.partial_fit(values)
+
+    def finish(self):
+        return self.transformer
+
+
+class CategoryFitter(StepFitter):
+    # 고유값만 모아서 fit (sample 은 고유값 => Binarizer 의 encoded info 에도 사용)
+    def update(self, values):
+        uniques = np.unique(values)
+        self.sample = uniques if self.sample is None else np.union1d(self.sample, uniques)
+
+    def finish(self):
+        self.sample = self.sample.reshape(-1, 1)
+        return self.transformer.fit(self.sample)
+
+
+class _SketchMixin:
+    def _init_sketch(self):
+        self.sketch = QuantileSketch.from_error(DATA_CONFIG.APPROX_SUMMARY_ERROR)
+        self.v_min = np.inf
+        self.v_max = -np.inf
+
+    def _update_sketch(self, values):
+        values = values.astype(np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.sketch.update(values)
+            self.v_min = min(self.v_min, values.min())
+            self.v_max = max(self.v_max, values.max())
+
+
+class ImputerFitter(StepFitter, _SketchMixin):
+    def __init__(self, transformer):
+        super().__init__(transformer)
+        self.strategy = transformer.strategy
+        self.total, self.count = 0.0, 0
+        self.counts = Counter()
+        self._init_sketch()
+
+    def _observed(self, values):
+        missing = pd.isna(values.ravel()) if pd.isna(self.transformer.missing_values) \
+            else values.ravel() == self.transformer.missing_values
+        return values.ravel()[~missing]
+
+    def update(self, values):
+        super().update(values)
+        observed = self._observed(values)
+        if self.strategy == "mean":
+            self.total += observed.astype(np.float64).sum()
+            self.count += observed.size
+        elif self.strategy == "most_frequent":
+            self.counts.update(pd.Series(observed).value_counts().to_dict())
+        elif self.strategy == "median":
+            self._update_sketch(observed)
+
+    def finish(self):
+        transformer = self.transformer.fit(self.sample)
+        if self.strategy == "mean" and self.count:
+            transformer.statistics_ = np.asarray([self.total / self.count])
+        elif self.strategy == "most_frequent" and self.counts:
+            # 빈도가 같으면 가장 작은 값 (scikit-learn 과 같은 규칙)
+            top = max(self.counts.values())
+            transformer.statistics_ = np.asarray(
+                [min(k for k, v in self.counts.items() if v == top)],
+                dtype=transformer.statistics_.dtype)
+        elif self.strategy == "median" and self.sketch.count:
+            transformer.statistics_ = np.asarray([self.sketch.quantiles([0.5])[0]])
+        return transformer
+
+
+class DiscretizerFitter(StepFitter, _SketchMixin):
+    def __init__(self, transformer):
+        super().__init__(transformer)
+        self._init_sketch()
+
+    def update(self, values):
+        super().update(values)
+        self._update_sketch(values)
+
+    def finish(self):
+        transformer = self.transformer.fit(self.sample)
+        n_bins = int(transformer.n_bins_[0])
+        if transformer.strategy == "uniform":
+            edges = np.linspace(self.v_min, self.v_max, n_bins + 1)
+        else:  # quantile
+            edges = self.sketch.quantiles(np.linspace(0, 1, n_bins + 1))
+            edges[0], edges[-1] = self.v_min, self.v_max
+        transformer.bin_edges_ = np.empty(1, dtype=object)
+        transformer.bin_edges_[0] = edges
+        return transformer
+
+
+class RobustScalerFitter(StepFitter, _SketchMixin):
+    def __init__(self, transformer):
+        super().__init__(transformer)
+        self._init_sketch()
+
+    def update(self, values):
+        super().update(values)
+        self._update_sketch(values)
+
+    def finish(self):
+        transformer = self.transformer.fit(self.sample)
+        q_min, q_max = transformer.quantile_range
+        low, median, high = self.sketch.quantiles([q_min / 100.0, 0.5, q_max / 100.0])
+        if transformer.with_centering:
+            transformer.center_ = np.asarray([median])
+        if transformer.with_scaling:
+            transformer.scale_ = np.asarray([(high - low) if high > low else 1.0])
+        return transformer
+
+
+def streaming_fitter(transformer):
+    """
+    Return StepFitter of 'transformer' (None if chunk fitting is not supported)
+    """
+    name = type(transformer).__name__
+    if name in ("StandardScaler", "MinMaxScaler", "MaxAbsScaler"):
+        return PartialFitFitter(transformer)
+    elif name in ("OneHotEncoder", "OrdinalEncoder", "LabelEncoder", "LabelBinarizer", "Binarizer"):
+        if getattr(transformer, "categories", "auto") != "auto":
+            return StepFitter(transformer)  # 범주를 지정한 경우 데이터와 무관
+        return CategoryFitter(transformer)
+    elif name == "SimpleImputer" and transformer.strategy in ("mean", "median", "most_frequent", "constant"):
+        return ImputerFitter(transformer)
+    elif name == "KBinsDiscretizer" and transformer.strategy in ("uniform", "quantile"):
+        return DiscretizerFitter(transformer)
+    elif name == "RobustScaler":
+        return RobustScalerFitter(transformer)
+    elif name == "Normalizer":
+        return StepFitter(transformer)
+    return None
+
+
+def _field_values(columns, field_name):
+    # PreprocessTask._train_data_transformer 와 같이 숫자로 변환 가능하면 float 사용
+    try:
+        return columns.values_of(field_name).astype(float).reshape(-1, 1)
+    except ValueError:
+        return columns.values_of(field_name).reshape(-1, 1)
+
+
+class StreamingPreprocessTask(PreprocessTask):
+    """
+    PreprocessTask reading original data chunk by chunk (two pass)
+
+        Attributes:
+        -----------
+            chunksize (int) : number of rows per chunk
+            steps (list) : list of dict per field
+                (`PreprocessTask._plan_steps` 의 단계에
+                 "fitter": <PartialFitFitter>, "fitted": False, "pipeline_step": None 추가)
+    """
+
+    def __init__(self, pk, chunksize=DATA_CONFIG.DATA_CHUNK_ROWS):
+        super().__init__(pk=pk)
+        self.chunksize = chunksize
+        self.steps = []
+
+    def _request_steps(self, request_info):
+        """
+        Return True if all steps of 'request_info' are supported (self.steps is made)
+        """
+        self.steps = []
+        for step in self._plan_steps(request_info["request_data"]):
+            step.update(fitter=None, fitted=False, pipeline_step=None)
+            if step["transformer"] is None:
+                step["fitted"] = True
+                step["pipeline_step"] = dict(field_name=step["field_name"],
+                                             function_name=step["function_name"],
+                                             routing="drop", transformer=None)
+            else:
+                step["fitter"] = streaming_fitter(step["transformer"])
+                if step["fitter"] is None:
+                    logger.info(f"{step['function_name']} 은(는) 청크 단위 fit 을 지원하지 않습니다")
+                    return False
+            self.steps.append(step)
+        return True
+
+    def _fit_pass(self, data_path):
+        """
+        Read data once and fit steps whose input is ready, Return number of fitted steps
+        """
+        fed = []  # 이번 pass 에서 fit 하는 단계의 index
+        for chunk in iter_data_chunks(data_path, chunksize=self.chunksize):
+            columns = ColumnBlockBuilder(chunk)
+            blocked = set()  # 아직 fit 되지 않은 단계가 있어 이후 단계를 진행할 수 없는 필드
+            for n, step in enumerate(self.steps):
+                field_name = step["field_name"]
+                if field_name in blocked or field_name not in columns:
+                    blocked.add(field_name)
+                elif step["fitted"]:
+                    with self.telemetry.measure(step["index"]):
+                        PreprocessPipeline.apply_step(columns, step["pipeline_step"])
+                else:
+                    with self.telemetry.measure(step["index"]):
+                        step["fitter"].update(_field_values(columns, field_name))
+                    blocked.add(field_name)
+                    if n not in fed:
+                        fed.append(n)
+        for n in fed:
+            step = self.steps[n]
+            fitter = step["fitter"]
+            with self.telemetry.measure(step["index"]):
+                transformer = fitter.finish()
+                changed_field = self._to_array(transformer.transform(fitter.sample), keep_sparse=True)
+                step["encoded_info"] = self._encoded_info(transformer, fitter.sample, changed_field)
+            step["pipeline_step"] = dict(
+                field_name=step["field_name"], function_name=step["function_name"],
+                routing=routing_of(type(transformer).__name__, changed_field), transformer=transformer)
+            step["fitted"] = True
+        return len(fed)
+
+    def _record_steps(self):
+        """
+        Save fitted transformers (T_{pk}_{n}.pickle, pipeline) and SUMMARY info
+        (same as `_task_result` and `_task_drop_columns`)
+        """
+        save_n = 0
+        for step in self.steps:
+            pipeline_step = step["pipeline_step"]
+            info_dict = dict(field_name=step["field_name"], function_name=step["function_name"],
+                             function_pk=step["function_pk"], file_name=None,
+                             original_classes=None, encoded_classes=None)
+            if pipeline_step["routing"] == "drop":
+                self.pipeline.add_drop(field_name=step["field_name"])
+            else:
+                self.pipeline.add_transformer(field_name=step["field_name"],
+                                              transformer=pipeline_step["transformer"],
+                                              routing=pipeline_step["routing"])
+                save_n += 1
+                info_dict["file_name"] = "T_{}_{}.pickle".format(self.pk, save_n)
+                super()._dump_pickle(save_object=pipeline_step["transformer"],
+                                     base_path="PREPROCESS_TRANSFORMER_DIR",
+                                     file_name=info_dict["file_name"])
+                encode_info = step["encoded_info"]
+                if "origin_class" in encode_info.keys():
+                    info_dict["original_classes"] = encode_info["origin_class"]
+                    info_dict["encoded_classes"] = encode_info["encode_class"]
+            self.real_final_list.append(info_dict)
+        pipeline_file_name = PIPELINE_FILE_NAME.format(self.pk)
+        super()._dump_pickle(save_object=self.pipeline, base_path="PREPROCESS_TRANSFORMER_DIR",
+                             file_name=pipeline_file_name)
+        return pipeline_file_name
+
+    def _transform_pass(self, data_path):
+        """
+        Transform data chunk by chunk, write it to self.file_path and Return its summary
+        """
+        data_summary = StreamingDataSummary()
+        writer = ColumnarWriter(self.file_path) if self.file_path.endswith(".npz") else None
+        header = True
+        for chunk in iter_data_chunks(data_path, chunksize=self.chunksize):
+            # self.pipeline.transform(chunk) 와 같지만 단계별로 기록
+            columns = ColumnBlockBuilder(chunk)
+            for step, pipeline_step in zip(self.steps, self.pipeline.steps):
+                n_columns = len(columns.blocks)
+                with self.telemetry.measure(step["index"]):
+                    PreprocessPipeline.apply_step(columns, pipeline_step)
+                self.telemetry.set_shape(step["index"], rows=len(chunk),
+                                         columns=len(columns.blocks) - n_columns + 1, accumulate=True)
+            prep_chunk = columns.to_frame()
+            if writer is not None:
+                writer.append(prep_chunk)
+            else:
+                prep_chunk.to_csv(self.file_path, sep=',', header=header, index=False,
+                                  encoding='utf-8', mode="w" if header else "a")
+                header = False
+            data_summary.update(prep_chunk.reset_index(drop=True))
+        if writer is not None:
+            writer.close()
+        for step in self.steps:
+            self.telemetry.done(step["index"])
+        return data_summary
+
+    def task_result(self, data_path, request_info):
+        """
+        Same as `PreprocessTask.task_result` with bounded memory
+        (지원하지 않는 전처리기가 있으면 PreprocessTask.task_result 로 처리)
+        """
+        if not self._request_steps(request_info):
+            return super().task_result(data_path=data_path, request_info=request_info)
+        original_file_ext = os.path.splitext(data_path)[1][1:]
+        if DATA_CONFIG.PREPROCESSED_DATA_FORMAT == "npz" or original_file_ext != "csv":
+            # json(orient='index')은 청크 단위로 이어서 저장할 수 없으므로 npz 로 저장
+            original_file_ext = "npz"
+        self.file_name = "P_{}.{}".format(self.pk, original_file_ext)
+        self.file_path = os.path.join(PREPROCESSED_DATA_DIR, self.file_name)
+
+        try:
+            self.telemetry.plan(self.steps)
+            n_pass = 0
+            while not all(step["fitted"] for step in self.steps):
+                n_pass += 1
+                with self.telemetry.stage("fit"):
+                    if not self._fit_pass(data_path):
+                        raise ValueError("fit 할 수 있는 전처리 단계가 없습니다")
+                logger.info(f"요청 ID [{self.pk}] 청크 단위 fit pass {n_pass} 완료")
+            with self.telemetry.stage("merge"):
+                pipeline_file_name = self._record_steps()
+            with self.telemetry.stage("transform"):
+                data_summary = self._transform_pass(data_path)
+            with self.telemetry.stage("summary"):
+                summary_info = self._summary_info(data_summary)
+            logger.info(f"요청 ID [{self.pk}] 청크 단위 전처리 데이터를 저장했습니다")
+            return dict(
+                file_path=self.file_path,
+                file_name=self.file_name,
+                summary=self.real_final_list,
+                pipeline_file_name=pipeline_file_name,
+                **summary_info
+            )
+        except Exception as e:
+            logger.error("전처리 데이터 생성에 실패했습니다")
+            where_exception(e)
+            return False
+
+
+def preprocess_task(pk, data_path):
+    """
+    Return StreamingPreprocessTask if original data is larger than
+    DATA_CONFIG.STREAMING_PREPROCESS_MIN_BYTES, otherwise PreprocessTask
+    """
+    if os.path.getsize(data_path) > DATA_CONFIG.STREAMING_PREPROCESS_MIN_BYTES:
+        logger.info(f"{data_path} 파일을 청크 단위로 전처리합니다")
+        return StreamingPreprocessTask(pk=pk)
+    return PreprocessTask(pk=pk)
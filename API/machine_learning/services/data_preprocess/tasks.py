@@ -1,6 +1,7 @@
 """
 celery 로 처리할 작업을 정의
-스마트시티 분석 모듈에서는 전처리된 데이터를 생성하는 작업을 처리할 때 사용
+스마트시티 분석 모듈에서는 원본 데이터를 등록(복사/요약)하는 작업과
+전처리된 데이터를 생성하는 작업을 처리할 때 사용
 @shared_task 데코레이터 = 해당 함수에 대한 요청이 들어오며 작업을 할당
 """
 from __future__ import absolute_import
@@ -11,14 +12,22 @@ try:
 except AttributeError:
     current_process()._config = {"semprefix": "/mp"}
 
+import json
+import shutil
 import logging
 import datetime
 from celery import shared_task
 from dasolution.celery import app
 
-from .preprocess_helper import PreprocessTask
+from .streaming_preprocess import preprocess_task
+from .data_summary import load_data_summary
+from .result_cache import file_hash, original_file_hash, request_fingerprint
+from .cost_estimator import calibrate_cost_coefficients
+from ...models.original_data import OriginalData
 from ...models.preprocessed_data import PreprocessedData
-from ...serializers.serializers import PreprocessedDataSerializer
+from ...serializers.serializers import OriginalDataSerializer, PreprocessedDataSerializer
+from ....config.data_config import DATA_CONFIG
+from ....utils.custom_call import CallMixin
 from ....utils.custom_decorator import where_exception
 
 logger = logging.getLogger("collect_log_task")
@@ -29,13 +38,17 @@ def transformer_fit(self, data_saved_path=None, pfunction_info=None, pk=None):
     logger.info(f"요청 ID [{pk}]의 전처리 작업이 진행중입니다")
 
     try:
-        get_result = PreprocessTask(pk=pk)
+        get_result = preprocess_task(pk=pk, data_path=data_saved_path)
+        # 단계별 진행 상황/실행 시간/메모리를 task meta 로 전달 (AsyncResult(task_id).info 로 조회)
+        get_result.telemetry.publish = lambda meta: self.update_state(state="PROGRESS", meta=meta)
         back_job = get_result.task_result(
             data_path=data_saved_path, request_info=pfunction_info
         )
 
         Pdata_info = PreprocessedData.objects.get(pk=pk)
         fit_information = {}
+        # 실패한 경우에도 어느 단계까지 진행했는지 남김
+        fit_information["TELEMETRY"] = json.dumps(get_result.telemetry.result())
 
         if not back_job:
             fit_information["PROGRESS_STATE"] = "fail"
@@ -48,10 +61,16 @@ def transformer_fit(self, data_saved_path=None, pfunction_info=None, pk=None):
             fit_information["FILEPATH"] = str(back_job["file_path"])  # 생성된 데이터의 위치
             fit_information["FILENAME"] = str(back_job["file_name"])  # 생성된 데이터의 파일명
             fit_information["SUMMARY"] = str(back_job["summary"])  # 전처리를 수행한 것에 대한 정보 모음
+            fit_information["PIPELINE_FILENAME"] = back_job["pipeline_file_name"]  # 전체 전처리기 파이프라인
             fit_information["COLUMNS"] = back_job["columns_info"]
             fit_information["AMOUNT"] = back_job["amount_info"]
             fit_information["SAMPLE_DATA"] = back_job["sample_data"]
             fit_information["STATISTICS"] = back_job["statistics"]
+            if not Pdata_info.REQUEST_FINGERPRINT:
+                # 요청 시점에 원본 데이터의 FILE_HASH 가 없었던 경우 여기서 계산해서 이후 같은 요청에 재사용
+                data_hash = original_file_hash(pfunction_info["original_data_sequence_pk"], data_saved_path)
+                fit_information["REQUEST_FINGERPRINT"] = request_fingerprint(
+                    data_hash=data_hash, request_data=pfunction_info["request_data"])
             fit_information["PROGRESS_STATE"] = "success"
             fit_information["PROGRESS_END_DATETIME"] = datetime.datetime.now()
             logger.info(f"요청 ID [{pk}]의 전처리 작업이 완료되었습니다")
@@ -67,3 +86,87 @@ def transformer_fit(self, data_saved_path=None, pfunction_info=None, pk=None):
     except Exception as e:
         where_exception(error_msg=e)
         return False
+
+
+def original_data_ingest_result(request_data_path, save_file_name):
+    """
+    Copy requested file to original data directory and Return its summary
+
+        Parameters:
+        -----------
+             request_data_path (str) : file path requested by user
+             save_file_name (str) : saved path (result/ml_result/original_data/O_{pk}.ext)
+
+        Returns:
+        --------
+             ingest_information (dict) : values to update OriginalData
+             or
+             False (bool) : if copy or summary failed
+    """
+    try:
+        save_file_name = shutil.copy(request_data_path, save_file_name)
+        if DATA_CONFIG.ORIGINAL_DATA_COLUMNAR_COPY:
+            # 이후 전처리/학습/테스트 단계에서 재파싱하지 않도록 컬럼 단위 사본 저장
+            CallMixin._save_columnar_copy(file_path=save_file_name)
+        data_summary = load_data_summary(save_file_name)
+        return dict(
+            COLUMNS=data_summary.columns_info(),
+            STATISTICS=data_summary.statistics_info(),
+            SAMPLE_DATA=data_summary.sample_info(),
+            AMOUNT=data_summary.size_info(),
+            FILE_HASH=file_hash(save_file_name),
+        )
+    except Exception as e:
+        where_exception(error_msg=e)
+        return False
+
+
+@shared_task(name="preprocess_tasks.original_data_ingest", bind=True, ignore_result=False, track_started=True)
+def original_data_ingest(self, request_data_path=None, save_file_name=None, pk=None):
+    logger.info(f"요청 ID [{pk}]의 원본 데이터 등록 작업이 진행중입니다")
+
+    try:
+        back_job = original_data_ingest_result(
+            request_data_path=request_data_path, save_file_name=save_file_name
+        )
+
+        Odata_info = OriginalData.objects.get(pk=pk)
+        ingest_information = {}
+
+        if not back_job:
+            ingest_information["PROGRESS_STATE"] = "fail"
+            ingest_information["PROGRESS_END_DATETIME"] = datetime.datetime.now()
+            logger.error(f"요청 ID [{pk}]의 원본 데이터 등록 작업이 실패했습니다")
+        else:
+            ingest_information.update(back_job)
+            ingest_information["PROGRESS_STATE"] = "success"
+            ingest_information["PROGRESS_END_DATETIME"] = datetime.datetime.now()
+            logger.info(f"요청 ID [{pk}]의 원본 데이터 등록 작업이 완료되었습니다")
+        serializer = OriginalDataSerializer(
+            Odata_info, data=ingest_information, partial=True
+        )
+        if serializer.is_valid():
+            serializer.save()
+            return "async_task_finished"
+        else:
+            logger.error(f"요청 ID [{pk}]의 원본 데이터 정보 저장이 실패했습니다")
+            return "save_failed"
+    except Exception as e:
+        where_exception(error_msg=e)
+        return False
+
+
+@shared_task(name="preprocess_tasks.calibrate_cost", bind=True, ignore_result=False, track_started=True)
+def calibrate_cost(self, rows=None):
+    """
+    Benchmark preprocess functions and Save cost coefficients used by PreprocessCostEstimator
+    (worker 서버를 바꾸거나 전처리 기능을 추가한 뒤 한 번 실행)
+    """
+    logger.info("전처리 비용 계수 측정 작업이 진행중입니다")
+    try:
+        if rows is None:
+            return calibrate_cost_coefficients()
+        return calibrate_cost_coefficients(rows=int(rows))
+    except Exception as e:
+        where_exception(error_msg=e)
+        return False
@@ -1,6 +1,7 @@
 #데이터 적용 테스트에서 필요한 함수 (train_model_view.py)
 #모델이 전처리된 데이터로 학습된경우, SUMMARY 정보를 받아와서 동일하게 테스트 데이터도 전처리를 수행하는 함수
 
+import os
 import logging
 import numbers
 import numpy as np
@@ -11,7 +12,10 @@ from django.shortcuts import get_object_or_404
 from ...services.data_preprocess.preprocess_base import PreprocessorBase
 from ...models.preprocessed_data import PreprocessedData
 from ...serializers.serializers import PreprocessedDataSerializer
+from ....config.result_path_config import PATH_CONFIG
 from ....utils.custom_decorator import where_exception
+from ....utils.custom_call import to_csr_matrix
+from ....utils.custom_call import to_dense_frame
 
 logger = logging.getLogger("collect_log_helper")
 
@@ -102,7 +106,33 @@ class ModelPerformance(PreprocessorBase):
                         data_set = data_set.drop(field_name, axis=1)
         return data_set
 
+    # 전처리 파이프라인(T_{pk}_pipeline.pickle) 하나로 Test Data에 전처리를 수행하는 함수
+    def _test_data_pipeline(self, data_set, pipeline_file_name):
+        pipeline = super()._load_pickle(
+            base_path="PREPROCESS_TRANSFORMER_DIR", file_name=pipeline_file_name
+        )
+        self.y_data_transformer = pipeline.find_transformer(self.y_data)
+        try:
+            return pipeline.transform(data_set)
+        except KeyError as e:
+            logger.error(f"[모델 테스트] {e} 필드가 테스트 데이터에 없습니다")
+            return False
+
     # 예측값 또는 스코어를 출력하는 함수
+    @staticmethod
+    def _score_and_predict(model, x_data, y_data):
+        """
+        Return (score, predict) of 'model'
+        (희소 컬럼이 있으면 csr_matrix 로 먼저 시도하고, 지원하지 않는 모델이면 dense 로 수행)
+        """
+        x_sparse = to_csr_matrix(x_data)
+        if x_sparse is not None:
+            try:
+                return model.score(X=x_sparse, y=y_data), model.predict(X=x_sparse)
+            except (TypeError, ValueError):
+                x_data = to_dense_frame(x_data)
+        return model.score(X=x_data, y=y_data), model.predict(X=x_data)
+
     def get_test_result(self):
         try:
             pk = self.model_info["MODEL_SEQUENCE_PK"]
@@ -118,9 +148,16 @@ class ModelPerformance(PreprocessorBase):
                 PreprocessedData, pk=self.model_info["PREPROCESSED_DATA_SEQUENCE_FK2"]
             )
             pdata_serial = PreprocessedDataSerializer(pdata_info).data
-            pdata_test = self._test_data_transformer(
-                data_set=test_data, pdata_summary=pdata_serial["SUMMARY"]
-            )
+            pipeline_file_name = pdata_serial["PIPELINE_FILENAME"]
+            if pipeline_file_name and os.path.isfile(os.path.join(
+                    PATH_CONFIG.RESULT_ML_PREPROCESS_TRANS_DIR, pipeline_file_name)):
+                pdata_test = self._test_data_pipeline(
+                    data_set=test_data, pipeline_file_name=pipeline_file_name
+                )
+            else:  # 파이프라인이 없는 이전 전처리 데이터
+                pdata_test = self._test_data_transformer(
+                    data_set=test_data, pdata_summary=pdata_serial["SUMMARY"]
+                )
 
             if isinstance(pdata_test, bool): # 오류 발생시 False 반환
                 logger.error(f"[모델 테스트] Model ID [{pk}] Check Columns Name")
@@ -136,8 +173,7 @@ class ModelPerformance(PreprocessorBase):
             model_load = super()._load_pickle(
                 base_path="MODEL_DIR", file_name=self.model_info["FILENAME"]
             )
-            score_ = model_load.score(X=X_, y=y_)
-            predict_ = model_load.predict(X=X_)
+            score_, predict_ = self._score_and_predict(model_load, X_, y_)
 
             if self.y_data_transformer != None:
                 try:
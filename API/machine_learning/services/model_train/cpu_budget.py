@@ -0,0 +1,90 @@
+# API/ml/services/model_train
+"""
+학습 작업별 CPU 예산 (MachineLearningTask 에서 사용)
+
+같은 서버의 celery worker 가 학습 작업을 여러 개 동시에 실행하므로,
+작업 하나가 사용할 코어 수(budget)를 정하고 그 안에서 아래와 같이 나눠 사용함
+
+    교차검증 : fold 병렬 수(fold_jobs) x 모델 내부 스레드 수(estimator_jobs) <= budget
+               (fold 는 joblib threading backend 로 실행, celery prefork 작업 프로세스는
+                daemon 이므로 loky(프로세스) backend 는 n_jobs=1 로 실행됨)
+    홀드아웃 / 최종 학습 : 모델 내부 스레드 수 = budget
+
+n_jobs 파라미터가 없는 모델은 fold 병렬만 사용하고, 사용자가 요청한 n_jobs 는 budget 이하인 경우에만 유지함
+"""
+import os
+import logging
+from contextlib import contextmanager
+
+from joblib import parallel_backend
+from sklearn import base
+
+from ....config.train_config import TRAIN_CONFIG
+
+logger = logging.getLogger("collect_log_helper")
+
+
+def train_cpu_budget(concurrency=None):
+    """
+    Return number of CPU cores for single training task
+
+        Parameters:
+        -----------
+             concurrency (int) : concurrency of celery worker (eg. CELERYD_CONCURRENCY),
+                                 used if TRAIN_CONFIG.TRAIN_WORKER_CONCURRENCY is 0
+
+        Returns:
+        --------
+             budget (int) : TRAIN_CONFIG.TRAIN_CPU_BUDGET or cpu_count // concurrency (at least 1)
+    """
+    if TRAIN_CONFIG.TRAIN_CPU_BUDGET > 0:
+        return TRAIN_CONFIG.TRAIN_CPU_BUDGET
+    cores = os.cpu_count() or 1
+    concurrency = TRAIN_CONFIG.TRAIN_WORKER_CONCURRENCY or concurrency or cores
+    return max(1, cores // concurrency)
+
+
+def _supports_n_jobs(estimator):
+    return "n_jobs" in estimator.get_params()
+
+
+def estimator_jobs(estimator, budget):
+    """
+    Return n_jobs of 'estimator' within 'budget' (None if estimator has no n_jobs parameter)
+    (None/-1 또는 budget 보다 큰 값 => budget, 그 외 요청 값 유지)
+    """
+    if not _supports_n_jobs(estimator):
+        return None
+    requested = estimator.get_params()["n_jobs"]
+    if isinstance(requested, int) and 0 < requested <= budget:
+        return requested
+    return budget
+
+
+def split_cpu_budget(estimator, budget, n_folds):
+    """
+    Return (fold_jobs, estimator_jobs) of cross validation within 'budget'
+    (fold 병렬을 우선하고 남은 코어를 모델 내부 스레드에 할당)
+    """
+    fold_jobs = max(1, min(budget, n_folds))
+    n_jobs = estimator_jobs(estimator, max(1, budget // fold_jobs))
+    return fold_jobs, n_jobs
+
+
+def with_n_jobs(estimator, n_jobs):
+    """
+    Return copy (sklearn.base.clone) of 'estimator' with n_jobs if it has n_jobs parameter
+    ('estimator' 는 변경하지 않으므로 사용자가 요청한 파라미터 기록에 그대로 사용, fit 전에만 사용)
+    """
+    if n_jobs is not None and _supports_n_jobs(estimator):
+        return base.clone(estimator).set_params(n_jobs=n_jobs)
+    return estimator
+
+
+@contextmanager
+def fold_parallel(fold_jobs):
+    """
+    Run joblib parallel loops (eg. cross_validate) in block with 'fold_jobs' threads
+    """
+    with parallel_backend("threading", n_jobs=fold_jobs):
+        yield
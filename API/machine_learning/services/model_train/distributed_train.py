@@ -0,0 +1,140 @@
+# API/ml/services/model_train
+"""
+분산 학습 (execution_mode = 'distributed')
+
+train_tasks.model_train 이 검증 전략을 정한 뒤 검증 fit 과 최종 fit 을 하위 작업(train_tasks.train_subtask)으로
+나눠 celery chord 로 실행하고, 모든 하위 작업이 끝나면 callback(train_tasks.train_aggregate)이
+검증 점수(cv_score, holdout_score)를 모아 TrainInfo 를 갱신함
+
+    fold (K개) : KFold 분할 하나로 fit 한 검증 점수 (로컬 교차검증과 같은 분할/점수)
+    holdout : 홀드아웃 fit 의 검증 점수 (cv_holdout, holdout_only)
+    final : 전체 데이터로 fit 한 최종 모델 (M_{pk}.pickle 저장)
+
+하위 작업은 공유 스토리지의 같은 학습 데이터 파일(data_path)을 각자 읽고 (worker 간에 데이터를 전달하지 않음),
+실행된 worker 의 CPU 예산 전체를 모델 내부 스레드로 사용함
+LightGBM 은 홀드아웃 early stopping 으로 한 번만 학습하므로 나누지 않음 (model_train 에서 로컬 학습)
+"""
+import time
+import logging
+from sklearn import base
+
+from .train_helper import MachineLearningTask
+from .cpu_budget import estimator_jobs, with_n_jobs
+from .validation_strategy import resolve_validation_strategy, count_probe_fits
+from .validation_strategy import validation_fits, validation_score, validation_result
+from ....config.train_config import TRAIN_CONFIG
+
+logger = logging.getLogger("collect_log_helper")
+
+
+class DistributedTrainTask(MachineLearningTask):
+    """
+    Split sklearn model training of request 'pk' into validation/final fit subtasks
+
+        Attributes:
+        -----------
+            spec (dict) : algo_pk, data_path, model_param, train_param, pk
+                          (arguments of `model_task_result`, passed to every subtask as json)
+    """
+
+    def __init__(self, algo_pk, data_path, model_param, train_param, pk):
+        self.spec = dict(algo_pk=algo_pk, data_path=data_path, model_param=model_param,
+                         train_param=train_param, pk=pk)
+
+    def _prepare(self, cpu_budget):
+        # clf => 요청한 파라미터 (TRAIN_SUMMARY 에 기록), estimator => CPU 예산을 적용한 복사본 (fit)
+        data = self._load_train_data(self.spec["data_path"], self.spec["train_param"])
+        algo, clf = self._load_estimator(self.spec["algo_pk"], self.spec["model_param"])
+        estimator = with_n_jobs(clf, estimator_jobs(clf, cpu_budget))
+        x_data, y_data, train_columns = self._train_xy(
+            estimator, data, self.spec["train_param"]["X"], self.spec["train_param"]["y"])
+        return algo, clf, estimator, x_data, y_data, train_columns
+
+    def plan(self, validation_strategy=None):
+        """
+        Return (strategy, strategy_info, subtasks) of request
+        (None if estimator is not split, eg. LightGBM)
+
+            Returns:
+            --------
+                 strategy (str) : validation strategy except 'adaptive'
+                 strategy_info (dict) : decision info of `resolve_validation_strategy`
+                 subtasks (list) : dict(kind='fold'|'holdout'|'final', index=int)
+        """
+        _, clf = self._load_estimator(self.spec["algo_pk"], self.spec["model_param"])
+        if "LGBM" in type(clf).__name__ or not (base.is_regressor(clf) or base.is_classifier(clf)):
+            return None
+
+        strategy = validation_strategy or TRAIN_CONFIG.VALIDATION_STRATEGY
+        x_data, y_data = None, None
+        if strategy == "adaptive":  # 예상 fit 시간을 계산할 때만 데이터를 읽음
+            _, _, clf, x_data, y_data, _ = self._prepare(cpu_budget=1)
+        # 모든 fold 가 서로 다른 worker 에서 동시에 실행되는 것으로 추정
+        strategy, strategy_info = resolve_validation_strategy(
+            strategy, clf, x_data, y_data, cpu_budget=TRAIN_CONFIG.CV_N_SPLITS)
+        subtasks = [dict(kind=kind, index=index) for kind, index in validation_fits(strategy)]
+        subtasks.append(dict(kind="final", index=0))
+        logger.info(f"요청 ID [{self.spec['pk']}]의 학습을 하위 작업 {len(subtasks)}개로 나눕니다 "
+                    f"(검증 전략 [{strategy}])")
+        return strategy, strategy_info, subtasks
+
+    def run_subtask(self, kind, index, cpu_budget=1):
+        """
+        Run single subtask of `plan` and Return its result (json)
+
+            Returns:
+            --------
+                 result (dict) : kind, index, cpu_budget, seconds and
+                                 score (fold, holdout) or file_path, file_name, model_info (final)
+        """
+        start = time.perf_counter()
+        algo, clf, estimator, x_data, y_data, train_columns = self._prepare(cpu_budget)
+        result = dict(kind=kind, index=index, cpu_budget=cpu_budget)
+        if kind == "final":
+            pk = self.spec["pk"]
+            final_model = estimator.fit(X=x_data, y=y_data)
+            saved_name = "M_{}.pickle".format(pk)
+            file_path = super()._dump_pickle(
+                save_object=final_model, base_path="MODEL_DIR", file_name=saved_name
+            )
+            logger.info(f"요청 ID [{pk}]의 학습된 모델 저장 => M_{pk}.pickle")
+            model_info = dict(
+                model_name=algo["ALGORITHM_NAME"],
+                model_param=clf.get_params(),
+                model_train_columns=train_columns,
+            )
+            # 모델 파라미터에 json 으로 변환할 수 없는 값이 있으므로 TRAIN_SUMMARY 에 저장할 문자열로 전달
+            result.update(file_path=file_path, file_name=saved_name, model_info=str(model_info))
+        else:
+            result["score"] = validation_score(kind, index, estimator, x_data, y_data)
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    @staticmethod
+    def aggregate(strategy, strategy_info, results):
+        """
+        Return result of `model_task_result` format from subtask results
+        (None if any subtask failed)
+        """
+        failed = [result for result in results if not result or result.get("error")]
+        if failed:
+            logger.error(f"실패한 학습 하위 작업이 있습니다 {failed}")
+            return None
+        scores = {(result["kind"], result["index"]): result["score"]
+                  for result in results if result["kind"] != "final"}
+        final = [result for result in results if result["kind"] == "final"][0]
+
+        validation_info = validation_result(strategy, scores)
+        count_probe_fits(validation_info, strategy_info)
+        validation_info.update(
+            execution_mode="distributed",
+            cpu_budget=final["cpu_budget"],
+            subtasks=[{key: result.get(key) for key in ("kind", "index", "worker", "cpu_budget", "seconds")}
+                      for result in results],
+        )
+        return dict(
+            file_path=final["file_path"],
+            file_name=final["file_name"],
+            model_info=final["model_info"],
+            validation_info=validation_info,
+        )
@@ -0,0 +1,290 @@
+# API/ml/services/model_train
+"""
+하이퍼파라미터 탐색 (학습 요청의 'search', MachineLearningTask.model_task_result 에서 사용)
+
+    "search": {
+        "method": "grid" | "random" | "halving" | "hyperband",
+        "parameters": {                                                  # 탐색할 모델 파라미터
+            "max_depth": [3, 5, 10, null],                               # 후보 값 목록
+            "min_samples_leaf": {"low": 1, "high": 20, "type": "int"},   # 범위 (grid 제외)
+            "learning_rate": {"low": 0.001, "high": 0.3, "log": true}    # 로그 스케일 범위 (grid 제외)
+        },
+        "n_candidates": 27,     # random/halving 후보 수 (hyperband 는 가장 공격적인 bracket 의 후보 수)
+        "resource": "rows",     # halving/hyperband 에서 단계마다 늘리는 자원 ('rows' 또는 'n_estimators')
+        "factor": 3,            # 단계마다 남기는 비율(1/factor)과 자원 증가 배수
+        "min_resource": 1000,   # 첫 단계 자원 (생략 => 마지막 단계에 후보가 factor 개 이하로 남도록 계산)
+        "max_resource": 100000  # 마지막 단계 자원 (생략 => 전체 학습 행 수 또는 모델의 n_estimators)
+    }
+
+    grid : 후보 값 목록의 모든 조합을 전체 자원으로 평가
+    random : 후보를 n_candidates 개 추출해서 전체 자원으로 평가
+    halving : 후보 전체를 적은 자원으로 평가하고 점수 상위 1/factor 만 factor 배 자원으로 다시 평가하는 것을
+              max_resource 까지 반복 (점수가 낮은 후보는 적은 비용으로 먼저 제외)
+    hyperband : 후보 수와 첫 단계 자원이 다른 halving(bracket)을 여러 번 실행
+                (적은 자원에서는 점수가 낮지만 자원이 늘면 좋아지는 후보도 보수적인 bracket 에서 평가됨)
+
+모든 trial 은 같은 홀드아웃 분할(TRAIN_CONFIG.HOLDOUT_*)의 검증 점수로 비교하고,
+같은 단계의 trial 은 학습 작업의 CPU 예산 안에서 스레드로 동시에 실행함 (cpu_budget.py 참고)
+탐색이 끝나면 최고 점수 파라미터로 기존과 같이 검증/최종 학습(M_{pk}.pickle)을 수행하고,
+trial 순위표(leaderboard)는 TrainInfo.SEARCH_SUMMARY 에 저장함
+"""
+import math
+import time
+import logging
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn import base
+from sklearn.model_selection import ParameterGrid
+from sklearn.model_selection import train_test_split
+
+from .cpu_budget import split_cpu_budget, with_n_jobs
+from ....config.train_config import TRAIN_CONFIG
+
+logger = logging.getLogger("collect_log_helper")
+
+
+def _take_first_rows(data, rows):
+    # pd.DataFrame/pd.Series 또는 csr_matrix 의 앞쪽 'rows' 행 (train_test_split 으로 이미 섞인 데이터)
+    return data.iloc[:rows] if hasattr(data, "iloc") else data[:rows]
+
+
+class HyperparameterSearch:
+    """
+    Search model parameters of request 'search' with holdout validation score
+
+        Attributes:
+        -----------
+            method (str) : one of TRAIN_CONFIG.SEARCH_METHODS
+            parameters (dict) : parameter name => list of values or range dict(low, high, type, log)
+            resource (str) : 'rows' or 'n_estimators' (halving/hyperband)
+            trials (list) : dict(trial, bracket, params, rung, resource, score, n_fits, seconds, error)
+
+        Raises:
+        -------
+            ValueError : if 'search' is not valid for 'estimator' (message is invalid key or parameter name)
+    """
+
+    def __init__(self, search, estimator):
+        if not isinstance(search, dict):
+            raise ValueError("search")
+        self.method = search.get("method")
+        if self.method not in TRAIN_CONFIG.SEARCH_METHODS:
+            raise ValueError(str(self.method))
+        self.parameters = search.get("parameters")
+        if not isinstance(self.parameters, dict) or not self.parameters:
+            raise ValueError("parameters")
+        model_params = estimator.get_params()
+        for name, space in self.parameters.items():
+            if name not in model_params or not self._valid_space(space):
+                raise ValueError(name)
+
+        self.n_candidates = self._positive_int(search, "n_candidates", TRAIN_CONFIG.SEARCH_N_CANDIDATES)
+        self.factor = self._positive_int(search, "factor", TRAIN_CONFIG.SEARCH_FACTOR)
+        if self.factor < 2:
+            raise ValueError("factor")
+        self.min_resource = self._positive_int(search, "min_resource", None)
+        self.max_resource = self._positive_int(search, "max_resource", None)
+        self.resource = search.get("resource", "rows")
+        if self.resource not in TRAIN_CONFIG.SEARCH_RESOURCES:
+            raise ValueError(str(self.resource))
+        if self.resource == "n_estimators" and (
+                "n_estimators" not in model_params or "n_estimators" in self.parameters):
+            raise ValueError("n_estimators")
+
+        if self.method == "grid":
+            n_trials = len(ParameterGrid(self.parameters))
+        elif self.method == "hyperband":
+            n_trials = sum(n for _, n in self._brackets())
+        else:
+            n_trials = self.n_candidates
+        if n_trials > TRAIN_CONFIG.SEARCH_MAX_TRIALS:
+            raise ValueError("parameters" if self.method == "grid" else "n_candidates")
+
+        self.trials = []
+        self.n_fits = 0
+        self._data = None
+
+    def _valid_space(self, space):
+        if isinstance(space, list):
+            return len(space) > 0
+        if not isinstance(space, dict) or self.method == "grid":
+            return False
+        try:
+            low, high = float(space["low"]), float(space["high"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return low < high and not (space.get("log") and low <= 0)
+
+    @staticmethod
+    def _positive_int(search, key, default):
+        value = search.get(key, default)
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(key)
+        return value
+
+    def _halvings(self, n_candidates):
+        # 후보가 1개 이상 남는 최대 halving 횟수 (factor ** s <= n_candidates)
+        s = 0
+        while self.factor ** (s + 1) <= n_candidates:
+            s += 1
+        return s
+
+    def _brackets(self):
+        # hyperband bracket (halving 횟수 s, 후보 수 n), 공격적인 bracket 부터
+        s_max = self._halvings(self.n_candidates)
+        return [(s, int(math.ceil((s_max + 1) / (s + 1) * self.factor ** s)))
+                for s in range(s_max, -1, -1)]
+
+    def _sample(self, rng):
+        params = dict()
+        for name, space in sorted(self.parameters.items()):
+            if isinstance(space, list):
+                params[name] = space[rng.randint(len(space))]
+                continue
+            low, high = float(space["low"]), float(space["high"])
+            if space.get("log"):
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            else:
+                value = rng.uniform(low, high)
+            params[name] = int(round(value)) if space.get("type") == "int" else float(value)
+        return params
+
+    def _full_resource(self, estimator, x_train):
+        if self.resource == "n_estimators":
+            n_estimators = estimator.get_params()["n_estimators"]
+            default = n_estimators if isinstance(n_estimators, int) else TRAIN_CONFIG.SEARCH_MAX_N_ESTIMATORS
+            return self.max_resource or default
+        # 학습 행 수보다 많은 행은 사용할 수 없음
+        return min(self.max_resource or x_train.shape[0], x_train.shape[0])
+
+    def _first_resource(self, max_resource, halvings, exact_min=False):
+        if exact_min and self.min_resource:  # halving 에서 요청한 첫 단계 자원
+            return min(self.min_resource, max_resource)
+        lower = self.min_resource or (
+            min(TRAIN_CONFIG.SEARCH_MIN_ROWS, max_resource) if self.resource == "rows" else 1)
+        return int(min(max_resource, max(round(max_resource / self.factor ** halvings), lower)))
+
+    def _new_trials(self, candidates, bracket):
+        trials = []
+        for params in candidates:
+            trials.append(dict(trial=len(self.trials), bracket=bracket, params=params, rung=None,
+                               resource=None, score=None, n_fits=0, seconds=0.0, error=None))
+            self.trials.append(trials[-1])
+        return trials
+
+    def _fit_trial(self, estimator, params, resource, n_jobs):
+        x_train, x_valid, y_train, y_valid = self._data
+        start = time.perf_counter()
+        try:
+            clf_ = with_n_jobs(base.clone(estimator).set_params(**params), n_jobs)
+            if self.resource == "n_estimators":
+                clf_.set_params(n_estimators=resource)
+            else:
+                x_train, y_train = _take_first_rows(x_train, resource), _take_first_rows(y_train, resource)
+            clf_.fit(x_train, y_train)
+            score = float(np.around(clf_.score(x_valid, y_valid), 8))
+            if not np.isfinite(score):
+                raise ValueError(f"score is {score}")
+            return score, time.perf_counter() - start, None
+        except Exception as e:
+            return None, time.perf_counter() - start, "{}: {}".format(type(e).__name__, e)
+
+    def _evaluate(self, estimator, trials, resource, rung, cpu_budget):
+        trial_jobs, n_jobs = split_cpu_budget(estimator, cpu_budget, len(trials))
+        logger.info(f"하이퍼파라미터 탐색 [{self.method}] 단계 {rung}: trial {len(trials)}개를 "
+                    f"{self.resource}={resource} 로 평가합니다 (동시 실행 {trial_jobs}개, 모델 n_jobs={n_jobs})")
+        results = Parallel(n_jobs=trial_jobs, backend="threading")(
+            delayed(self._fit_trial)(estimator, trial["params"], resource, n_jobs) for trial in trials)
+        for trial, (score, seconds, error) in zip(trials, results):
+            trial.update(rung=rung, resource=resource, score=score, error=error)
+            trial["seconds"] = round(trial["seconds"] + seconds, 3)
+            trial["n_fits"] += 1
+        self.n_fits += len(trials)
+
+    def _successive_halving(self, estimator, trials, first_resource, max_resource, cpu_budget):
+        resource, rung = first_resource, 0
+        while True:
+            self._evaluate(estimator, trials, resource, rung, cpu_budget)
+            alive = sorted([trial for trial in trials if trial["score"] is not None],
+                           key=lambda trial: trial["score"], reverse=True)
+            if resource >= max_resource or not alive:
+                return
+            trials = alive[:max(1, len(alive) // self.factor)]
+            # 후보가 하나 남으면 중간 단계 없이 max_resource 로 평가
+            resource = max_resource if len(trials) == 1 else min(resource * self.factor, max_resource)
+            rung += 1
+
+    def run(self, estimator, x_data, y_data, cpu_budget=1):
+        """
+        Run search and Return summary saved in TrainInfo.SEARCH_SUMMARY
+
+            Parameters:
+            -----------
+                 estimator (object) : estimator with requested model parameters (before fit)
+                 x_data, y_data : train data
+                 cpu_budget (int) : CPU cores of training task
+
+            Returns:
+            --------
+                 summary (dict) : method, resource, max_resource, n_trials, n_fits, seconds,
+                                  best_params (n_estimators 포함 if resource='n_estimators'),
+                                  best_score, leaderboard (top SEARCH_LEADERBOARD_SIZE trials)
+
+            Raises:
+            -------
+                 RuntimeError : if every trial failed
+        """
+        start = time.perf_counter()
+        self._data = train_test_split(
+            x_data, y_data, test_size=TRAIN_CONFIG.HOLDOUT_TEST_SIZE,
+            random_state=TRAIN_CONFIG.HOLDOUT_RANDOM_STATE
+        )
+        rng = np.random.RandomState(TRAIN_CONFIG.SEARCH_RANDOM_STATE)
+        max_resource = self._full_resource(estimator, self._data[0])
+
+        if self.method == "grid":
+            trials = self._new_trials(list(ParameterGrid(self.parameters)), bracket=0)
+            self._evaluate(estimator, trials, max_resource, 0, cpu_budget)
+        elif self.method == "random":
+            trials = self._new_trials([self._sample(rng) for _ in range(self.n_candidates)], bracket=0)
+            self._evaluate(estimator, trials, max_resource, 0, cpu_budget)
+        elif self.method == "halving":
+            trials = self._new_trials([self._sample(rng) for _ in range(self.n_candidates)], bracket=0)
+            first_resource = self._first_resource(
+                max_resource, self._halvings(self.n_candidates), exact_min=True)
+            self._successive_halving(estimator, trials, first_resource, max_resource, cpu_budget)
+        else:  # hyperband
+            for bracket, (halvings, n_candidates) in enumerate(self._brackets()):
+                trials = self._new_trials([self._sample(rng) for _ in range(n_candidates)], bracket=bracket)
+                first_resource = self._first_resource(max_resource, halvings)
+                self._successive_halving(estimator, trials, first_resource, max_resource, cpu_budget)
+        self._data = None
+
+        # 더 많은 자원으로 평가된 trial 이 앞에 오도록 (자원, 점수) 순으로 정렬
+        finished = sorted([trial for trial in self.trials if trial["score"] is not None],
+                          key=lambda trial: (trial["resource"], trial["score"]), reverse=True)
+        if not finished:
+            raise RuntimeError(f"모든 trial 이 실패했습니다 {[trial['error'] for trial in self.trials][:3]}")
+        best = finished[0]
+        best_params = dict(best["params"])
+        if self.resource == "n_estimators":
+            # trial 은 n_estimators=resource 로 평가했으므로 최종 학습도 같은 n_estimators 로 수행
+            best_params["n_estimators"] = best["resource"]
+        summary = dict(
+            method=self.method,
+            resource=self.resource,
+            max_resource=max_resource,
+            n_trials=len(self.trials),
+            n_failed=len(self.trials) - len(finished),
+            n_fits=self.n_fits,
+            seconds=round(time.perf_counter() - start, 3),
+            best_params=best_params,
+            best_score=best["score"],
+            leaderboard=[dict(trial, rank=rank + 1) for rank, trial
+                         in enumerate(finished[:TRAIN_CONFIG.SEARCH_LEADERBOARD_SIZE])],
+        )
+        logger.info(f"하이퍼파라미터 탐색 [{self.method}] 완료: trial {summary['n_trials']}개, "
+                    f"fit {summary['n_fits']}번, 최고 점수 {best['score']} {best['params']}")
+        return summary
@@ -10,12 +10,18 @@ try:
     current_process()._config
 except AttributeError:
     current_process()._config = {"semprefix": "/mp"}
+import ast
 import logging
 import datetime
-from celery import shared_task
+from celery import shared_task, chord
+from celery.task.control import revoke
+from celery.utils import uuid
 from dasolution.celery import app
 
 from .train_helper import MachineLearningTask
+from .cpu_budget import train_cpu_budget
+from .distributed_train import DistributedTrainTask
+from ....config.train_config import TRAIN_CONFIG
 from ...models.train_info import TrainInfo
 from ...serializers.serializers import TrainModelSerializer
 from ....utils.custom_decorator import where_exception
@@ -28,72 +34,212 @@ def model_train(self, train_info=None, data_saved_path=None, pk=None, mode=None)
     logger.info(f"요청 ID [{pk}]의 모델 학습이 진행중입니다")
 
     try:
+        # 같은 서버의 다른 학습 작업과 나눠 사용할 CPU 코어 수
+        cpu_budget = train_cpu_budget(concurrency=app.conf.CELERYD_CONCURRENCY)
+        logger.info(f"요청 ID [{pk}]의 CPU 예산은 {cpu_budget}개 코어입니다")
+
+        execution_mode = train_info.get("execution_mode") or TRAIN_CONFIG.TRAIN_EXECUTION_MODE
+        if execution_mode == "distributed" and model_train_distribute(
+                train_info=train_info, data_saved_path=data_saved_path, pk=pk, mode=mode,
+                job_id=self.request.id):
+            # TrainInfo 는 하위 작업이 모두 끝난 뒤 train_aggregate 에서 갱신
+            return "distributed_task_dispatched"
+
         back_job = model_train_result(
-            train_info=train_info, data_saved_path=data_saved_path, pk=pk, mode=mode
+            train_info=train_info, data_saved_path=data_saved_path, pk=pk, mode=mode,
+            cpu_budget=cpu_budget
         )
+        return save_train_result(back_job=back_job, pk=pk, cpu_budget=cpu_budget)
+    except Exception as e:
+        where_exception(error_msg=e)
 
-        train_info = TrainInfo.objects.get(pk=pk)
-        train_information = {}
-
-        if not back_job:
-            train_information["PROGRESS_STATE"] = "fail"
-            train_information["PROGRESS_END_DATETIME"] = datetime.datetime.now()
-            logger.error(f"요청 ID [{pk}]의 모델 학습이 실패했습니다")
-            serializer = TrainModelSerializer(
-                train_info, data=train_information, partial=True
-            )
-            if serializer.is_valid():
-                serializer.save()
-                return "task_failed"
-            else:
-                logger.info(f"요청 ID [{pk}]의 모델 학습이 실패했습니다")
-                return "save_failed"
 
-        else:
-            train_information["FILEPATH"] = str(back_job["file_path"])
-            train_information["FILENAME"] = str(back_job["file_name"])
-            train_information["TRAIN_SUMMARY"] = str(back_job["model_info"])
-            train_information["VALIDATION_SUMMARY"] = str(back_job["validation_info"])
-            train_information["PROGRESS_STATE"] = "success"
-            train_information["LOAD_STATE"] = "load_available"
-            train_information["PROGRESS_END_DATETIME"] = datetime.datetime.now()
-            logger.info(f"요청 ID [{pk}]의 모델 학습이 완료되었습니다")
-            serializer = TrainModelSerializer(
-                train_info, data=train_information, partial=True
-            )
+# 분산 학습의 하위 작업 (검증 fit 또는 최종 fit, distributed_train.py 참고)
+@shared_task(name="train_tasks.train_subtask", bind=True, ignore_result=False)
+def train_subtask(self, spec=None, subtask=None):
+    cpu_budget = train_cpu_budget(concurrency=app.conf.CELERYD_CONCURRENCY)
+    try:
+        result = DistributedTrainTask(**spec).run_subtask(
+            kind=subtask["kind"], index=subtask["index"], cpu_budget=cpu_budget)
+    except Exception as e:
+        where_exception(error_msg=e)
+        # 실패해도 chord callback 이 실행되도록 예외 대신 오류를 반환
+        result = dict(subtask, cpu_budget=cpu_budget, error=str(e))
+    result["worker"] = self.request.hostname
+    return result
+
+
+# 분산 학습의 chord callback (하위 작업 결과를 모아 TrainInfo 갱신)
+@shared_task(name="train_tasks.train_aggregate", bind=True, ignore_result=False)
+def train_aggregate(self, results, pk=None, strategy=None, strategy_info=None, job_id=None):
+    try:
+        if not _is_running(pk, job_id):
+            # 제한 시간이 지났거나 중지/재시작된 요청의 결과는 저장하지 않음
+            logger.info(f"요청 ID [{pk}]의 학습이 이미 종료되어 하위 작업 결과를 저장하지 않습니다")
+            return "train_finished"
+        back_job = DistributedTrainTask.aggregate(
+            strategy=strategy, strategy_info=strategy_info, results=results)
+        cpu_budget = back_job["validation_info"]["cpu_budget"] if back_job else None
+        return save_train_result(back_job=back_job, pk=pk, cpu_budget=cpu_budget)
+    except Exception as e:
+        where_exception(error_msg=e)
+
+
+# 분산 학습의 제한 시간 확인 (chord 를 실행할 때 TRAIN_CONFIG.DISTRIBUTED_TRAIN_TIMEOUT 초 뒤로 예약)
+@shared_task(name="train_tasks.train_timeout", bind=True, ignore_result=False)
+def train_timeout(self, pk=None, job_id=None):
+    try:
+        if not _is_running(pk, job_id):
+            return "train_finished"
+        logger.error(f"요청 ID [{pk}]의 분산 학습이 제한 시간"
+                     f"({TRAIN_CONFIG.DISTRIBUTED_TRAIN_TIMEOUT}초) 안에 끝나지 않았습니다")
+        revoke_subtasks(TrainInfo.objects.get(pk=pk).SUBTASK_IDS)
+        return save_train_result(back_job=None, pk=pk)
+    except Exception as e:
+        where_exception(error_msg=e)
+
+
+def _is_running(pk, job_id):
+    # job_id 의 학습이 아직 진행중인지 여부 (재시작하면 JOB_ID 가 바뀜)
+    train_info = TrainInfo.objects.get(pk=pk)
+    return train_info.PROGRESS_STATE == "ongoing" and (job_id is None or train_info.JOB_ID == job_id)
+
+
+def revoke_subtasks(subtask_ids):
+    """
+    Revoke distributed training subtasks and chord callback of TrainInfo.SUBTASK_IDS
+    """
+    subtask_ids = ast.literal_eval(subtask_ids) if subtask_ids else []
+    if subtask_ids:
+        revoke(subtask_ids, terminate=True)
+        logger.info(f"학습 하위 작업 {len(subtask_ids)}개를 중지합니다")
+
+
+def save_train_result(back_job=None, pk=None, cpu_budget=None):
+    train_info = TrainInfo.objects.get(pk=pk)
+    train_information = {"CPU_BUDGET": cpu_budget}
+
+    if not back_job:
+        train_information["PROGRESS_STATE"] = "fail"
+        train_information["PROGRESS_END_DATETIME"] = datetime.datetime.now()
+        logger.error(f"요청 ID [{pk}]의 모델 학습이 실패했습니다")
+        serializer = TrainModelSerializer(
+            train_info, data=train_information, partial=True
+        )
         if serializer.is_valid():
             serializer.save()
-            return "async_task_finished"
+            return "task_failed"
         else:
-            logger.info(f"요청 ID [{pk}]의 모델 저장이 실패했습니다 [모델 학습 정보] = {train_information}")
+            logger.info(f"요청 ID [{pk}]의 모델 학습이 실패했습니다")
             return "save_failed"
+
+    else:
+        train_information["FILEPATH"] = str(back_job["file_path"])
+        train_information["FILENAME"] = str(back_job["file_name"])
+        train_information["TRAIN_SUMMARY"] = str(back_job["model_info"])
+        train_information["VALIDATION_SUMMARY"] = str(back_job["validation_info"])
+        if back_job.get("search_info") is not None:
+            train_information["SEARCH_SUMMARY"] = str(back_job["search_info"])
+        train_information["PROGRESS_STATE"] = "success"
+        train_information["LOAD_STATE"] = "load_available"
+        train_information["PROGRESS_END_DATETIME"] = datetime.datetime.now()
+        logger.info(f"요청 ID [{pk}]의 모델 학습이 완료되었습니다")
+        serializer = TrainModelSerializer(
+            train_info, data=train_information, partial=True
+        )
+    if serializer.is_valid():
+        serializer.save()
+        return "async_task_finished"
+    else:
+        logger.info(f"요청 ID [{pk}]의 모델 저장이 실패했습니다 [모델 학습 정보] = {train_information}")
+        return "save_failed"
+
+
+def _train_parameters(sk_asyn_task, train_info, mode):
+    model_param = (
+        train_info["model_parameters"]
+        if "model_parameters" in train_info.keys()
+        else None
+    )
+    train_param = train_info["train_parameters"]
+
+    if mode == "restart":
+        model_param = sk_asyn_task.check_params(params_dict=model_param)
+        train_param = sk_asyn_task.check_params(params_dict=train_param)
+    return model_param, train_param
+
+
+def model_train_distribute(train_info=None, data_saved_path=None, pk=None, mode=None, job_id=None):
+    """
+    Dispatch validation/final fit subtasks of request 'pk' as celery chord
+    (False if training is not split, eg. LightGBM => model_train 에서 로컬 학습)
+
+    하위 작업과 callback 의 task id 는 TrainInfo.SUBTASK_IDS 에 저장해서 STOP 요청/제한 시간 초과 시 중지하고,
+    TRAIN_CONFIG.DISTRIBUTED_TRAIN_TIMEOUT 초 안에 끝나지 않으면 train_timeout 이 학습을 실패로 저장함
+    """
+    if train_info.get("search") is not None:
+        # 하이퍼파라미터 탐색은 trial 을 worker 하나에서 CPU 예산 안에서 병렬로 실행
+        logger.info(f"요청 ID [{pk}]는 하이퍼파라미터 탐색을 요청했으므로 나눠 학습하지 않습니다")
+        return False
+    try:
+        model_param, train_param = _train_parameters(MachineLearningTask(), train_info, mode)
+        distributed_task = DistributedTrainTask(
+            algo_pk=train_info["algorithms_sequence_pk"],
+            data_path=data_saved_path,
+            model_param=model_param,
+            train_param=train_param,
+            pk=pk,
+        )
+        plan = distributed_task.plan(validation_strategy=train_info.get("validation_strategy"))
+        if plan is None:
+            logger.info(f"요청 ID [{pk}]의 알고리즘은 나눠 학습하지 않습니다")
+            return False
+        strategy, strategy_info, subtasks = plan
+        timeout = TRAIN_CONFIG.DISTRIBUTED_TRAIN_TIMEOUT
+        subtask_ids = [uuid() for _ in range(len(subtasks) + 1)]
+        header = [train_subtask.s(spec=distributed_task.spec, subtask=subtask).set(
+                      task_id=task_id, expires=timeout)
+                  for subtask, task_id in zip(subtasks, subtask_ids)]
+        callback = train_aggregate.s(
+            pk=pk, strategy=strategy, strategy_info=strategy_info, job_id=job_id
+        ).set(task_id=subtask_ids[-1])
+        _save_subtask_ids(pk, subtask_ids)
+        chord(header)(callback)
+        train_timeout.apply_async(kwargs=dict(pk=pk, job_id=job_id), countdown=timeout)
+        logger.info(f"요청 ID [{pk}]의 학습 하위 작업 {len(subtasks)}개를 실행합니다")
+        return True
     except Exception as e:
         where_exception(error_msg=e)
+        return False
+
+
+def _save_subtask_ids(pk, subtask_ids):
+    serializer = TrainModelSerializer(
+        TrainInfo.objects.get(pk=pk), data={"SUBTASK_IDS": str(subtask_ids)}, partial=True
+    )
+    if serializer.is_valid():
+        serializer.save()
+    else:
+        logger.warning(f"요청 ID [{pk}]의 학습 하위 작업 ID 를 저장하지 못했습니다 {serializer.errors}")
 
 
-def model_train_result(train_info=None, data_saved_path=None, pk=None, mode=None):
+def model_train_result(train_info=None, data_saved_path=None, pk=None, mode=None, cpu_budget=1):
     sk_asyn_task = MachineLearningTask()
 
     try:
         # time.sleep(15)
         logger.info(f"요청 ID [{pk}]의 모델 학습 모드는 [{mode}] 입니다")
 
-        model_param = (
-            train_info["model_parameters"]
-            if "model_parameters" in train_info.keys()
-            else None
-        )
-        train_param = train_info["train_parameters"]
-
-        if mode == "restart":
-            model_param = sk_asyn_task.check_params(params_dict=model_param)
-            train_param = sk_asyn_task.check_params(params_dict=train_param)
+        model_param, train_param = _train_parameters(sk_asyn_task, train_info, mode)
         get_result = sk_asyn_task.model_task_result(
             algo_pk=train_info["algorithms_sequence_pk"],
             data_path=data_saved_path,
             model_param=model_param,
             train_param=train_param,
             pk=pk,
+            validation_strategy=train_info.get("validation_strategy"),
+            cpu_budget=cpu_budget,
+            search=train_info.get("search"),
         )
 
         return get_result
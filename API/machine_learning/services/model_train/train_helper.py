@@ -1,5 +1,4 @@
 import os
-import copy
 import inspect
 import logging
 import warnings
@@ -9,20 +8,23 @@ from distutils import util
 from ast import literal_eval
 from django.http import Http404
 from sklearn import base
-from sklearn.model_selection import KFold
-from sklearn.model_selection import cross_val_score
 from sklearn.model_selection import train_test_split
 from sklearn.utils.estimator_checks import check_estimators_dtypes
 from lightgbm.basic import LightGBMError
 
+from .validation_strategy import resolve_validation_strategy, run_validation, count_probe_fits
+from .cpu_budget import estimator_jobs, with_n_jobs
+from .hyperparameter_search import HyperparameterSearch
 from ...models.original_data import OriginalData
 from ...models.preprocessed_data import PreprocessedData
 from ...serializers.serializers import OriginalDataSerializer
 from ...serializers.serializers import PreprocessedDataSerializer
 from ....utils.custom_decorator import where_exception
 from ....utils.custom_call import CallMixin
-from ....common.models.algorithm import Algorithm
-from ....common.serializers.serializers import ALGOSerializer
+from ....utils.custom_call import to_csr_matrix
+from ....utils.custom_call import to_dense_frame
+from ....utils.class_registry import algorithm_registry
+from ....config.train_config import TRAIN_CONFIG
 
 
 warnings.filterwarnings("ignore")
@@ -104,6 +106,9 @@ class InspectUserRequest(PrepareModelTrain):
         self.req_info_train_data_type = None
         self.req_info_model_param = None
         self.req_info_train_param = None
+        self.req_info_validation_strategy = None
+        self.req_info_execution_mode = None
+        self.req_info_search = None
 
         self.clf = None
         self.library_name = None
@@ -167,20 +172,17 @@ class InspectUserRequest(PrepareModelTrain):
         @param data_type: data type (Original or Preprocessed)
         @return: True (if all params are valid)
                  False (if algo_id or data_id is not valid)
-                 self._error_return_dict ; dict (if data_path from data_id not valid)
+                 self._error_return_dict ; dict (if data_path from data_id not valid
+                                                 or original data is not ready)
         """
-        if not int(algo_id) in list(
-            Algorithm.objects.all().values_list("ALGORITHM_SEQUENCE_PK", flat=True)
-        ):
+        if algo_id not in algorithm_registry:
             return False
         else:
             # USAGE 확인(regression, classification)
-            user_request_algorithm = ALGOSerializer(
-                Algorithm.objects.get(pk=algo_id)
-            ).data
+            user_request_algorithm = algorithm_registry.row(algo_id)
             self.library_name = user_request_algorithm["LIBRARY_NAME"]
             self.function_usage = user_request_algorithm["LIBRARY_FUNCTION_USAGE"]
-            self.clf = super()._get_base_object(params=user_request_algorithm)
+            self.clf = algorithm_registry.new_instance(algo_id)
 
         if data_type == "original_data_sequence_pk":
             self.train_data_type = "original"
@@ -195,6 +197,11 @@ class InspectUserRequest(PrepareModelTrain):
                     OriginalData.objects.get(pk=data_id)
                 ).data
                 data_path = self.train_data_dict["FILEPATH"]
+                # 원본 데이터 등록 작업이 끝나지 않은 경우 (4009)
+                if self.train_data_dict["PROGRESS_STATE"] != "success":
+                    logger.error(f"원본 데이터 {data_id}의 등록 작업이 완료되지 않았습니다")
+                    return self._error_return_dict(
+                        "4009", self.train_data_dict["PROGRESS_STATE"])
                 if not os.path.isfile(data_path):
                     logger.error(f"{data_path} 경로가 존재하지 않습니다")
                     return self._error_return_dict("4004", data_path)
@@ -270,6 +277,28 @@ class InspectUserRequest(PrepareModelTrain):
                 self.model_param[k] = str(v)
         return True
 
+    # search 검사 (4101/4102)
+    # 예) {"method": "halving", "parameters": {"max_depth": [3, 5, null]}, "resource": "rows"}
+    def _check_search(self, search_dict):
+        """
+        check search_dict is valid for self.clf (hyperparameter_search.py)
+
+        @type search_dict: dict
+        @param search_dict: user request 'search' (request_info['search'])
+        @return: True (if search_dict is valid)
+                 self._error_return_dict ; dict (if not)
+        """
+        if isinstance(search_dict, dict):
+            for key in ["method", "parameters"]:
+                if key not in search_dict.keys():
+                    return self._error_return_dict("4101", key)
+        try:
+            HyperparameterSearch(search=search_dict, estimator=self.clf)
+        except ValueError as e:
+            logger.error(f"{e}는 요청 가능한 하이퍼파라미터 탐색 조건이 아닙니다")
+            return self._error_return_dict("4102", str(e))
+        return True
+
     # train_parameters 검사 (4101, 4102)
     # 예)  "y": "target"
     def _check_train_parameters(self, train_param_dict):
@@ -339,6 +368,18 @@ class InspectUserRequest(PrepareModelTrain):
             else False
         )
         self.req_info_train_param = request_info["train_parameters"]
+        self.req_info_validation_strategy = request_info.get("validation_strategy")
+        # 검증 전략 검사 (4102)
+        if self.req_info_validation_strategy is not None and \
+                self.req_info_validation_strategy not in TRAIN_CONFIG.VALIDATION_STRATEGIES:
+            logger.error(f"{self.req_info_validation_strategy}는 요청 가능한 검증 전략이 아닙니다")
+            return self._error_return_dict("4102", str(self.req_info_validation_strategy))
+        self.req_info_execution_mode = request_info.get("execution_mode")
+        # 학습 실행 방식 검사 (4102)
+        if self.req_info_execution_mode is not None and \
+                self.req_info_execution_mode not in TRAIN_CONFIG.TRAIN_EXECUTION_MODES:
+            logger.error(f"{self.req_info_execution_mode}는 요청 가능한 학습 실행 방식이 아닙니다")
+            return self._error_return_dict("4102", str(self.req_info_execution_mode))
 
         # 요청한 알고리즘 ID와 데이터 ID가 있는지 검사 (Http404/4004)
         is_valid = self._check_request_pk(
@@ -347,11 +388,11 @@ class InspectUserRequest(PrepareModelTrain):
             data_type=self.req_info_train_data_type,
         )
         if isinstance(is_valid, dict):
-            if is_valid["error_type"] == "4004":
+            if is_valid["error_type"] in ["4004", "4009"]:
                 return self._error_return_dict(
                     is_valid["error_type"], is_valid["error_msg"]
                 )
-                # file_not_found
+                # file_not_found / original data not ready
         elif not is_valid:
             raise Http404
             # algorithm 또는 data ID가 없는 경우 -- resource_not_found
@@ -363,6 +404,14 @@ class InspectUserRequest(PrepareModelTrain):
             return self._error_return_dict(
                 is_valid["error_type"], is_valid["error_msg"]
             )
+        # 하이퍼파라미터 탐색 검사 (4101/4102)
+        self.req_info_search = request_info.get("search")
+        if self.req_info_search is not None:
+            is_valid = self._check_search(search_dict=self.req_info_search)
+            if isinstance(is_valid, dict):
+                return self._error_return_dict(
+                    is_valid["error_type"], is_valid["error_msg"]
+                )
         # train_parameters 검사 (4101/4102)
         is_valid = self._check_train_parameters(
             train_param_dict=self.req_info_train_param
@@ -408,33 +457,53 @@ class MachineLearningTask(PrepareModelTrain):
     """
 
     @staticmethod
-    def _train_sklearn_model(estimator, data_set, train_columns, target_column):
+    def _model_input(estimator, x_data):
+        """
+        Return X for training: csr_matrix if data has sparse columns
+        (OneHotEncoder, KBinsDiscretizer 등의 결과) and estimator is in TRAIN_CONFIG.SPARSE_ESTIMATORS,
+        otherwise dense pd.DataFrame
+        """
+        x_sparse = to_csr_matrix(x_data)
+        if x_sparse is None:
+            return x_data
+        if type(estimator).__name__ in TRAIN_CONFIG.SPARSE_ESTIMATORS:
+            logger.info(f"희소 행렬로 학습합니다 (shape={x_sparse.shape}, nnz={x_sparse.nnz})")
+            return x_sparse
+        return to_dense_frame(x_data)
+
+    def _train_xy(self, estimator, data_set, train_columns, target_column):
+        """
+        Return (x_data, y_data, train column names) of sklearn estimator
+        """
         x_data = data_set[train_columns]
         y_data = data_set[target_column]
         train_columns = list(x_data.columns.values)
-        clf = copy.deepcopy(estimator)
-
-        # 교차검증
-        kfold = KFold(n_splits=5, shuffle=True, random_state=2019)
-        cv_scores = cross_val_score(clf, X=x_data, y=y_data, cv=kfold)
-        cv_scores = np.around(cv_scores, 8).tolist()
-
-        # 홀드아웃 검증
-        x_train, x_valid, y_train, y_valid = train_test_split(
-            x_data, y_data, test_size=0.3, random_state=2019
-        )
-        clf_ = clf.fit(X=x_train, y=y_train)
-        holdout_score = np.around(clf_.score(x_valid, y_valid), 8)
+        return self._model_input(estimator, x_data), y_data, train_columns
+
+    def _train_sklearn_model(self, estimator, data_set, train_columns, target_column,
+                             validation_strategy=None, cpu_budget=1):
+        x_data, y_data, train_columns = self._train_xy(
+            estimator, data_set, train_columns, target_column)
+        # 홀드아웃/최종 학습은 CPU 예산 전체를 모델 내부 스레드로 사용 (cpu_budget.py 참고)
+        estimator = with_n_jobs(estimator, estimator_jobs(estimator, cpu_budget))
+
+        # 검증 (교차검증/홀드아웃, validation_strategy.py 참고)
+        strategy, strategy_info = resolve_validation_strategy(
+            validation_strategy, estimator, x_data, y_data, cpu_budget=cpu_budget)
+        validation_info = run_validation(strategy, estimator, x_data, y_data, cpu_budget=cpu_budget)
+        count_probe_fits(validation_info, strategy_info)
+        validation_info["cpu_budget"] = cpu_budget
 
         # Final Model
         final_model = estimator.fit(X=x_data, y=y_data)
-        return final_model, train_columns, cv_scores, holdout_score
+        return final_model, train_columns, validation_info
 
-    @staticmethod
-    def _train_lightgbm_model(estimator, data_set, train_columns, target_column):
+    def _train_lightgbm_model(self, estimator, data_set, train_columns, target_column, cpu_budget=1):
         x_data = data_set[train_columns]
         y_data = data_set[target_column]
         train_columns = list(x_data.columns.values)
+        estimator = with_n_jobs(estimator, estimator_jobs(estimator, cpu_budget))
+        x_data = self._model_input(estimator, x_data)
         # 홀드아웃 검증 + Final Model
         x_train, x_valid, y_train, y_valid = train_test_split(
             x_data, y_data, test_size=0.3, random_state=2020
@@ -463,34 +532,74 @@ class MachineLearningTask(PrepareModelTrain):
             valid_params[param_key] = param_value
         return valid_params
 
-    def model_task_result(self, algo_pk, data_path, model_param, train_param, pk):
-        final_result = dict()
-
+    @staticmethod
+    def _train_data_columns(train_param):
+        """
+        Return columns used for training (X + y), None if X is not requested
+        """
+        if "X" not in train_param:
+            return None
+        x_columns = train_param["X"] if isinstance(train_param["X"], list) else [train_param["X"]]
+        return x_columns + [c for c in [train_param["y"]] if c not in x_columns]
+
+    def _load_train_data(self, data_path, train_param):
+        # 학습에 사용하는 컬럼(X, y)만 로드
+        train_data_columns = self._train_data_columns(train_param)
         if "preprocessed_data" in data_path:
             data = super()._load_data(
-                base_path="PREPROCESSED_DATA_DIR", file_name=os.path.split(data_path)[1]
+                base_path="PREPROCESSED_DATA_DIR", file_name=os.path.split(data_path)[1],
+                copy=False, columns=train_data_columns
             )
         elif "original_data" in data_path:
             data = super()._load_data(
-                base_path="ORIGINAL_DATA_DIR", file_name=os.path.split(data_path)[1]
+                base_path="ORIGINAL_DATA_DIR", file_name=os.path.split(data_path)[1],
+                copy=False, columns=train_data_columns
             )
         logger.info(f"[{data_path}] 경로에서 학습 데이터를 로드했습니다")
+        return data
 
+    def _load_estimator(self, algo_pk, model_param):
+        """
+        Return (serialized Algorithm row, estimator with requested model parameters)
+        """
         # 학습에 사용될 알고리즘 불러오기
-        algo = ALGOSerializer(Algorithm.objects.get(pk=algo_pk)).data
-        clf = super()._get_base_object(params=algo)
-        model_name = type(clf).__name__
+        algo = algorithm_registry.row(algo_pk)
+        clf = algorithm_registry.new_instance(algo_pk)
 
         # 사용자 요청에 따라 모델 파라미터 변경
         if model_param is not None:
             clf = super()._change_params(model=clf, param=model_param)
+        return algo, clf
+
+    def _search_parameters(self, estimator, data_set, train_param, search, cpu_budget):
+        """
+        Run hyperparameter search of 'search' and Return its summary (best_params, leaderboard, ...)
+        """
+        x_data, y_data, _ = self._train_xy(estimator, data_set, train_param["X"], train_param["y"])
+        return HyperparameterSearch(search=search, estimator=estimator).run(
+            estimator, x_data, y_data, cpu_budget=cpu_budget)
+
+    def model_task_result(self, algo_pk, data_path, model_param, train_param, pk,
+                          validation_strategy=None, cpu_budget=1, search=None):
+        final_result = dict()
+
+        data = self._load_train_data(data_path, train_param)
+        algo, clf = self._load_estimator(algo_pk, model_param)
+        model_name = type(clf).__name__
+
+        # 하이퍼파라미터 탐색 후 최고 점수 파라미터로 학습 (hyperparameter_search.py 참고)
+        search_info = None
+        if search is not None:
+            search_info = self._search_parameters(clf, data, train_param, search, cpu_budget)
+            clf.set_params(**search_info["best_params"])
         if "LGBM" in model_name:  # LightGBM 알고리즘
             final_model, train_columns, holdout_score = \
                 self._train_lightgbm_model(
                     estimator=clf, 
                     data_set=data, 
                     train_columns=train_param["X"],
-                    target_column=train_param["y"]
+                    target_column=train_param["y"],
+                    cpu_budget=cpu_budget
             )
 
             saved_name = "M_{}.pickle".format(pk)
@@ -513,16 +622,19 @@ class MachineLearningTask(PrepareModelTrain):
                     model_train_columns=train_columns,
                     train_param=lgbm_train_param,
                 ),
-                validation_info=dict(holdout_score=holdout_score),
+                validation_info=dict(strategy="holdout_early_stopping",
+                                     holdout_score=holdout_score, n_fits=1, cpu_budget=cpu_budget),
             )
         else:  # 사이킷런 알고리즘
             if base.is_regressor(clf) == True or base.is_classifier(clf) == True:
-                final_model, train_columns, cv_score, holdout_score = \
+                final_model, train_columns, validation_info = \
                     self._train_sklearn_model(
                         estimator=clf, 
                         data_set=data, 
                         train_columns= train_param["X"],
-                        target_column=train_param["y"]
+                        target_column=train_param["y"],
+                        validation_strategy=validation_strategy,
+                        cpu_budget=cpu_budget
                     )
 
                 saved_name = "M_{}.pickle".format(pk)
@@ -539,8 +651,8 @@ class MachineLearningTask(PrepareModelTrain):
                         model_param=clf.get_params(),
                         model_train_columns=train_columns,
                     ),
-                    validation_info=dict(
-                        cv_score=cv_score, holdout_score=holdout_score
-                    ),
+                    validation_info=validation_info,
                 )
+        if final_result and search_info is not None:
+            final_result["search_info"] = search_info
         return final_result
@@ -0,0 +1,214 @@
+# API/ml/services/model_train
+"""
+모델 검증 전략 (MachineLearningTask._train_sklearn_model 에서 사용)
+
+    전략             | 검증 fit                          | 최종 fit | 전체 fit 수
+    cv_holdout      | K fold 교차검증 + 홀드아웃 1번       | 1번      | K + 2 (기존 방식)
+    cv_fold_holdout | K fold 교차검증 (fold 하나의 점수를 홀드아웃 점수로 사용) | 1번 | K + 1
+    cv_only         | K fold 교차검증 (홀드아웃 점수 없음)  | 1번      | K + 1
+    holdout_only    | 홀드아웃 1번 (교차검증 점수 없음)      | 1번      | 2
+    adaptive        | 행 수와 예상 fit 시간으로 cv_fold_holdout 또는 holdout_only 선택
+                    | (fit 시간 추정용 fit 1번 추가, probe_fits)
+
+기본 전략은 cv_holdout 이고 나머지는 요청('validation_strategy') 또는 설정으로 선택함
+선택된 전략과 선택 이유, fit 수(추정용 fit 포함)는 TrainInfo.VALIDATION_SUMMARY 에 함께 저장됨
+교차검증 fold 는 학습 작업의 CPU 예산 안에서 병렬로 실행함 (cpu_budget.py 참고)
+"""
+import math
+import time
+import logging
+import numpy as np
+from sklearn import base
+from sklearn.model_selection import KFold
+from sklearn.model_selection import cross_validate
+from sklearn.model_selection import train_test_split
+
+from .cpu_budget import split_cpu_budget, with_n_jobs, fold_parallel
+from ....config.train_config import TRAIN_CONFIG
+
+logger = logging.getLogger("collect_log_helper")
+
+
+def _take_rows(data, index):
+    # pd.DataFrame/pd.Series 또는 csr_matrix 의 행 선택
+    return data.iloc[index] if hasattr(data, "iloc") else data[index]
+
+
+def _estimated_fit_seconds(estimator, x_data, y_data):
+    """
+    Return estimated seconds of single fit on all rows
+    (TRAIN_CONFIG.ADAPTIVE_PROBE_ROWS 행으로 fit 한 시간을 행 수에 비례해서 추정, 실패하면 None)
+    """
+    rows = x_data.shape[0]
+    probe_rows = min(rows, TRAIN_CONFIG.ADAPTIVE_PROBE_ROWS)
+    index = np.sort(np.random.RandomState(TRAIN_CONFIG.CV_RANDOM_STATE).choice(
+        rows, probe_rows, replace=False))
+    try:
+        start = time.perf_counter()
+        base.clone(estimator).fit(_take_rows(x_data, index), _take_rows(y_data, index))
+        return (time.perf_counter() - start) * rows / probe_rows
+    except Exception as e:
+        logger.warning(f"fit 시간을 추정하지 못했습니다 ({e})")
+        return None
+
+
+def resolve_validation_strategy(strategy, estimator, x_data, y_data, cpu_budget=1):
+    """
+    Return (strategy to run, decision info) of requested 'strategy'
+
+        Parameters:
+        -----------
+             strategy (str) : one of TRAIN_CONFIG.VALIDATION_STRATEGIES
+                              (None => TRAIN_CONFIG.VALIDATION_STRATEGY)
+             estimator (object) : estimator before fit
+             x_data, y_data : train data
+             cpu_budget (int) : CPU cores of training task (number of folds run in parallel)
+
+        Returns:
+        --------
+             (str, dict) : strategy except 'adaptive', info saved in VALIDATION_SUMMARY
+                           (probe_fits => fit 시간 추정에 사용한 fit 수, `count_probe_fits` 참고)
+    """
+    strategy = strategy or TRAIN_CONFIG.VALIDATION_STRATEGY
+    info = dict(requested_strategy=strategy)
+    if strategy != "adaptive":
+        return strategy, info
+
+    rows = x_data.shape[0]
+    if rows > TRAIN_CONFIG.ADAPTIVE_CV_MAX_ROWS:
+        info["reason"] = f"rows({rows}) > {TRAIN_CONFIG.ADAPTIVE_CV_MAX_ROWS}"
+        return "holdout_only", info
+
+    fit_seconds = _estimated_fit_seconds(estimator, x_data, y_data)
+    info["probe_fits"] = 1
+    if fit_seconds is None:
+        info["reason"] = "fit time is not estimated"
+        return "cv_fold_holdout", info
+    n_splits = TRAIN_CONFIG.CV_N_SPLITS
+    fold_jobs, _ = split_cpu_budget(estimator, cpu_budget, n_splits)
+    # fold 마다 (K-1)/K 행으로 fit, fold_jobs 개씩 동시에 실행
+    cv_seconds = fit_seconds * (n_splits - 1) / n_splits * math.ceil(n_splits / fold_jobs)
+    info["estimated_fit_seconds"] = round(fit_seconds, 3)
+    if cv_seconds > TRAIN_CONFIG.ADAPTIVE_CV_MAX_SECONDS:
+        info["reason"] = f"estimated cv seconds({cv_seconds:.1f}) > {TRAIN_CONFIG.ADAPTIVE_CV_MAX_SECONDS}"
+        return "holdout_only", info
+    info["reason"] = f"estimated cv seconds({cv_seconds:.1f}) <= {TRAIN_CONFIG.ADAPTIVE_CV_MAX_SECONDS}"
+    return "cv_fold_holdout", info
+
+
+def count_probe_fits(validation_info, strategy_info):
+    """
+    Merge 'strategy_info' of `resolve_validation_strategy` into 'validation_info'
+    and Add its probe fits to n_fits
+    """
+    validation_info.update(strategy_info)
+    validation_info["n_fits"] += strategy_info.get("probe_fits", 0)
+    return validation_info
+
+
+def _kfold():
+    return KFold(n_splits=TRAIN_CONFIG.CV_N_SPLITS, shuffle=True,
+                 random_state=TRAIN_CONFIG.CV_RANDOM_STATE)
+
+
+def _cross_validation(estimator, x_data, y_data, cpu_budget):
+    kfold = _kfold()
+    fold_jobs, n_jobs = split_cpu_budget(estimator, cpu_budget, TRAIN_CONFIG.CV_N_SPLITS)
+    logger.info(f"교차검증 fold {fold_jobs}개를 동시에 실행합니다 (모델 n_jobs={n_jobs}, CPU 예산 {cpu_budget})")
+    with fold_parallel(fold_jobs):
+        cv_result = cross_validate(with_n_jobs(estimator, n_jobs), X=x_data, y=y_data,
+                                   cv=kfold, n_jobs=fold_jobs)
+    return cv_result, dict(fold_jobs=fold_jobs, estimator_jobs=n_jobs)
+
+
+def _holdout_score(estimator, x_data, y_data):
+    x_train, x_valid, y_train, y_valid = train_test_split(
+        x_data, y_data, test_size=TRAIN_CONFIG.HOLDOUT_TEST_SIZE,
+        random_state=TRAIN_CONFIG.HOLDOUT_RANDOM_STATE
+    )
+    clf_ = base.clone(estimator).fit(X=x_train, y=y_train)
+    return float(np.around(clf_.score(x_valid, y_valid), 8))
+
+
+def _fold_score(estimator, x_data, y_data, fold):
+    # cross_validate 와 같은 분할/점수 (fold 번째 KFold 분할)
+    train_index, valid_index = list(_kfold().split(x_data))[fold]
+    clf_ = base.clone(estimator).fit(_take_rows(x_data, train_index), _take_rows(y_data, train_index))
+    return float(np.around(clf_.score(_take_rows(x_data, valid_index), _take_rows(y_data, valid_index)), 8))
+
+
+def validation_fits(strategy):
+    """
+    Return validation fits of 'strategy' as list of (kind, index)
+    (kind => 'fold' (index = KFold 분할 번호) 또는 'holdout' (index = 0), 최종 fit 제외)
+    """
+    fits = []
+    if strategy in ("cv_holdout", "cv_fold_holdout", "cv_only"):
+        fits += [("fold", fold) for fold in range(TRAIN_CONFIG.CV_N_SPLITS)]
+    if strategy in ("cv_holdout", "holdout_only"):
+        fits.append(("holdout", 0))
+    return fits
+
+
+def validation_score(kind, index, estimator, x_data, y_data):
+    """
+    Run single validation fit of `validation_fits` and Return its score
+    (run_validation 의 fit 을 하나씩 나눠 실행할 때 사용, 같은 데이터에서 같은 점수)
+    """
+    if kind == "fold":
+        return _fold_score(estimator, x_data, y_data, index)
+    return _holdout_score(estimator, x_data, y_data)
+
+
+def validation_result(strategy, scores):
+    """
+    Return validation_info of `run_validation` from scores of `validation_fits`
+
+        Parameters:
+        -----------
+             strategy (str) : strategy of scores
+             scores (dict) : (kind, index) => score
+    """
+    cv_score, holdout_score = None, None
+    folds = sorted(index for kind, index in scores if kind == "fold")
+    if folds:
+        cv_score = [scores[("fold", fold)] for fold in folds]
+    if strategy == "cv_fold_holdout":
+        holdout_score = cv_score[TRAIN_CONFIG.CV_HOLDOUT_FOLD]
+    elif ("holdout", 0) in scores:
+        holdout_score = scores[("holdout", 0)]
+    return dict(strategy=strategy, cv_score=cv_score, holdout_score=holdout_score,
+                n_fits=len(scores) + 1, cv_jobs=None)
+
+
+def run_validation(strategy, estimator, x_data, y_data, cpu_budget=1):
+    """
+    Run validation fits of 'strategy' (final fit is not included)
+
+        Parameters:
+        -----------
+             strategy (str) : 'cv_holdout', 'cv_fold_holdout', 'cv_only' or 'holdout_only'
+             estimator (object) : estimator before fit (cloned for every fit)
+             x_data, y_data : train data
+             cpu_budget (int) : CPU cores of training task
+
+        Returns:
+        --------
+             validation_info (dict) : strategy, cv_score (list or None),
+                                      holdout_score (float or None), n_fits (including final fit),
+                                      cv_jobs (dict(fold_jobs, estimator_jobs) or None)
+    """
+    cv_score, holdout_score, n_fits, cv_jobs = None, None, 1, None
+    if strategy in ("cv_holdout", "cv_fold_holdout", "cv_only"):
+        cv_result, cv_jobs = _cross_validation(estimator, x_data, y_data, cpu_budget)
+        cv_score = np.around(cv_result["test_score"], 8).tolist()
+        n_fits += len(cv_score)
+        if strategy == "cv_fold_holdout":
+            # 해당 fold 모델의 검증 fold 점수를 홀드아웃 점수로 사용 (추가 fit 없음)
+            holdout_score = cv_score[TRAIN_CONFIG.CV_HOLDOUT_FOLD]
+    if strategy in ("cv_holdout", "holdout_only"):
+        holdout_score = _holdout_score(estimator, x_data, y_data)
+        n_fits += 1
+    logger.info(f"검증 전략 [{strategy}] => 최종 모델 포함 {n_fits}번 fit")
+    return dict(strategy=strategy, cv_score=cv_score, holdout_score=holdout_score, n_fits=n_fits,
+                cv_jobs=cv_jobs)
@@ -3,7 +3,7 @@ from django.urls import path
 from django.conf import settings
 
 from .views.original_data_view import OriginalDataView, OriginalDataDetailView, original_data_download
-from .views.preprocessed_data_view import PreprocessedDataView, PreprocessedDataDetailView, preprocessed_download
+from .views.preprocessed_data_view import PreprocessedDataView, PreprocessedDataDetailView, preprocessed_download, preprocessed_estimate
 from .views.train_model_view import TrainModelView, TrainModelDetailView, model_download
 
 urlpatterns = [
@@ -14,6 +14,7 @@ urlpatterns = [
     path('originalData/<pk>/download', original_data_download),
     #####################[전처리 데이터 관리]####################
     path('preprocessedData', PreprocessedDataView.as_view()),
+    path('preprocessedData/estimate', preprocessed_estimate),
     path('preprocessedData/<pk>', PreprocessedDataDetailView.as_view()),
     path('preprocessedData/<pk>/download', preprocessed_download),
     #########################[모델 생성]#######################
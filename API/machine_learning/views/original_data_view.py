@@ -1,8 +1,8 @@
 # API/ml/views
 import os
 import zipfile
-import shutil
 import logging
+import datetime
 from django.conf import settings
 from rest_framework import status
 from rest_framework.views import APIView
@@ -13,9 +13,10 @@ from django.shortcuts import get_object_or_404
 
 from ..models.original_data import OriginalData
 from ..serializers.serializers import OriginalDataSerializer
+from ..services.data_preprocess import tasks
 from ..services.data_preprocess.preprocess_tester import TestPreprocessor
-from ..services.data_preprocess.data_summary import DataSummary
 from ...config.result_path_config import PATH_CONFIG
+from ...utils.columnar_storage import columnar_path
 from ...utils.custom_response import CustomErrorCode
 
 logger = logging.getLogger("collect_log_view")
@@ -48,24 +49,28 @@ class OriginalDataView(APIView):
 
         save_file_name = os.path.join(
             data_save_path, "O_{}.{}".format(get_pk_new, file_ext))
-        save_file_name = shutil.copy(request_data_path, save_file_name)
-        data_summary = DataSummary(save_file_name)
 
+        # 파일 복사/컬럼 단위 사본 저장/요약 통계 계산은 celery 작업으로 처리
+        logger.info(f"요청 ID [{get_pk_new}]의 원본 데이터 등록 작업을 시작합니다")
         data_info = dict(
             NAME=os.path.splitext(file_name)[0],
             FILEPATH=save_file_name,
             FILENAME=os.path.splitext(os.path.split(save_file_name)[1])[0],
             EXTENSION=file_ext,
-            COLUMNS=data_summary.columns_info(),
-            STATISTICS=data_summary.statistics_info(),
-            SAMPLE_DATA=data_summary.sample_info(),
-            AMOUNT=data_summary.size_info(),
+            COLUMNS="N/A",
+            STATISTICS="N/A",
+            SAMPLE_DATA="N/A",
+            AMOUNT=0,
+            PROGRESS_STATE="ongoing",
+            PROGRESS_START_DATETIME=datetime.datetime.now(),
         )
 
         serializer = OriginalDataSerializer(data=data_info)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            tasks.original_data_ingest.apply_async(
+                args=[request_data_path, save_file_name, serializer.data["ORIGINAL_DATA_SEQUENCE_PK"]])
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -88,6 +93,11 @@ class OriginalDataDetailView(APIView):
         serializer = OriginalDataSerializer(origin_data).data
         data_path = serializer["FILEPATH"]
 
+        if serializer["PROGRESS_STATE"] != "success":
+            logger.error(f"요청 ID [{pk}]의 원본 데이터 등록 작업이 완료되지 않았습니다")
+            return Response(
+                error_code.CONFLICT_4009(mode="INGEST", error_msg=serializer["PROGRESS_STATE"]),
+                status=status.HTTP_409_CONFLICT)
         if not os.path.isfile(data_path):
             logger.error(f"{data_path} 경로가 존재하지 않습니다")
             return Response(error_code.FILE_NOT_FOUND_4004(path_info=data_path))
@@ -139,6 +149,8 @@ class OriginalDataDetailView(APIView):
         else:
             if os.path.isfile(serializer.data["FILEPATH"]):
                 os.remove(serializer.data["FILEPATH"])
+                if os.path.isfile(columnar_path(serializer.data["FILEPATH"])):
+                    os.remove(columnar_path(serializer.data["FILEPATH"]))
                 serializer = OriginalDataSerializer(
                     origin_data, data=dict(DELETE_FLAG=True), partial=True)
                 if serializer.is_valid():
@@ -1,6 +1,5 @@
 # API/ml/views.py
 import os
-import glob
 import zipfile
 import logging
 import datetime
@@ -15,6 +14,8 @@ from ..models.preprocessed_data import PreprocessedData
 from ..serializers.serializers import PreprocessedDataSerializer
 from ..services.data_preprocess import tasks
 from ..services.data_preprocess.preprocess_helper import InspectUserRequest
+from ..services.data_preprocess import result_cache
+from ..services.data_preprocess.cost_estimator import estimate_preprocess_cost
 from ..services.data_preprocess.preprocess_download import PreprocessedDownload
 from ..services.data_preprocess.preprocess_download import DeletedInstanceError, InvalidParameterError, FileNotExistedError
 from ...utils.custom_response import CustomErrorCode
@@ -23,6 +24,35 @@ logger = logging.getLogger("collect_log_view")
 error_code = CustomErrorCode()
 
 
+def _check_error_response(check_result):
+    """
+    Return error Response of `InspectUserRequest.check_post_mode` result
+    """
+    error_type = check_result["error_type"]
+    error_msg = check_result["error_msg"]
+    if error_type == "4004":
+        return Response(error_code.FILE_NOT_FOUND_4004(path_info=error_msg),
+                        status=status.HTTP_404_NOT_FOUND)
+    elif error_type == "4009":
+        return Response(error_code.CONFLICT_4009(mode="INGEST", error_msg=error_msg),
+                        status=status.HTTP_409_CONFLICT)
+    elif error_type == "4101":
+        return Response(error_code.MANDATORY_PARAMETER_MISSING_4101(error_msg),
+                        status=status.HTTP_400_BAD_REQUEST)
+    elif error_type == "4102":
+        return Response(error_code.INVALID_PARAMETER_TYPE_4102(error_msg),
+                        status=status.HTTP_400_BAD_REQUEST)
+
+
+def _request_fingerprint(get_inspect_result, user_request):
+    # FILE_HASH 가 없는 원본 데이터는 캐시 miss 로 처리 (해시는 전처리 작업에서 계산해서 저장)
+    data_hash = result_cache.stored_file_hash(get_inspect_result.original_data_id)
+    if data_hash is None:
+        return None
+    return result_cache.request_fingerprint(
+        data_hash=data_hash, request_data=user_request["request_data"])
+
+
 class PreprocessedDataView(APIView):
     def post(self, request):
         user_request = request.data
@@ -30,17 +60,28 @@ class PreprocessedDataView(APIView):
 
         check_result = get_inspect_result.check_post_mode(request_info=user_request)
         if isinstance(check_result, dict):
-            error_type = check_result["error_type"]
-            error_msg = check_result["error_msg"]
-            if error_type == "4004":
-                return Response(error_code.FILE_NOT_FOUND_4004(path_info=error_msg),
-                                status=status.HTTP_404_NOT_FOUND)
-            elif error_type == "4101":
-                return Response(error_code.MANDATORY_PARAMETER_MISSING_4101(error_msg),
-                                status=status.HTTP_400_BAD_REQUEST)
-            elif error_type == "4102":
-                return Response(error_code.INVALID_PARAMETER_TYPE_4102(error_msg),
-                                status=status.HTTP_400_BAD_REQUEST)
+            return _check_error_response(check_result)
+
+        # 같은 원본 데이터(파일 내용)에 같은 전처리를 요청한 결과가 있으면 celery 작업 없이 재사용
+        fingerprint = _request_fingerprint(get_inspect_result, user_request)
+        cached = result_cache.find_cached_result(fingerprint)
+        if cached is not None:
+            logger.info(f"요청 ID [{cached['PREPROCESSED_DATA_SEQUENCE_PK']}]의 전처리 결과를 재사용합니다")
+            now = datetime.datetime.now()
+            info_save = dict(
+                COMMAND=str(request.data),
+                PROGRESS_STATE="success",
+                PROGRESS_START_DATETIME=now,
+                PROGRESS_END_DATETIME=now,
+                **result_cache.cached_result_info(
+                    cached=cached, original_data_pk=get_inspect_result.original_data_id)
+            )
+            serializer = PreprocessedDataSerializer(data=info_save)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            else:
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         query = PreprocessedData.objects.all()
         if query.exists():
@@ -48,8 +89,27 @@ class PreprocessedDataView(APIView):
         else:
             get_pk_new = 1
 
+        # 예상 실행 비용으로 작업 허용 여부 판단 (worker 메모리 초과 => 4022, 긴 작업 => 별도 큐)
+        estimate = estimate_preprocess_cost(
+            original_data_pk=get_inspect_result.original_data_id,
+            data_path=get_inspect_result.data_saved_path,
+            request_data=user_request["request_data"])
+        task_options = dict()
+        if estimate is not None:
+            if estimate["admission"] == "reject":
+                logger.error(f"예상 메모리 {estimate['memory_bytes']} byte 가 "
+                             f"worker 메모리 한도 {estimate['worker_memory_bytes']} byte 보다 큽니다")
+                return Response(
+                    error_code.UNPROCESSABLE_ENTITY_4022(
+                        error_msg="Estimated Memory({}) Exceeds Worker Capacity({})".format(
+                            estimate["memory_bytes"], estimate["worker_memory_bytes"])),
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            elif estimate["admission"] == "defer":
+                logger.info(f"예상 실행 시간 {estimate['runtime_seconds']}초, {estimate['queue']} 큐에서 실행합니다")
+                task_options["queue"] = estimate["queue"]
+
         result = tasks.transformer_fit.apply_async(
-            args=[get_inspect_result.data_saved_path, user_request, get_pk_new])
+            args=[get_inspect_result.data_saved_path, user_request, get_pk_new], **task_options)
         logger.info(f"요청 ID [{get_pk_new}]의 전처리 작업을 시작합니다")
         info_save = dict(
             COMMAND=str(request.data),
@@ -59,6 +119,7 @@ class PreprocessedDataView(APIView):
             STATISTICS="N/A",
             SAMPLE_DATA="N/A",
             AMOUNT=0,
+            REQUEST_FINGERPRINT=fingerprint,
             ORIGINAL_DATA_SEQUENCE_FK1=get_inspect_result.original_data_id,
         )
 
@@ -92,15 +153,15 @@ class PreprocessedDataDetailView(APIView):
                 status=status.HTTP_409_CONFLICT)
         else:
             # 데이터 전처리에 사용했던 기능들 저장 경로
-            transformer_list = glob.glob(
-                "result/preprocess_transformer/T_{}_*.pickle".format(pk)
-            )
+            transformer_list = result_cache.transformer_files(serializer.data)
             if os.path.isfile(serializer.data["FILEPATH"]):
-                os.remove(serializer.data["FILEPATH"])
-                # 전처리된 데이터 파일 삭제
-                for transformer_file in transformer_list:
-                    os.remove(transformer_file)
-                    # 전처리에 사용된 전처리기 삭제
+                # 재사용한 결과를 다른 요청 ID 가 사용중이면 파일은 남겨둠
+                if not result_cache.is_shared(serializer.data):
+                    os.remove(serializer.data["FILEPATH"])
+                    # 전처리된 데이터 파일 삭제
+                    for transformer_file in transformer_list:
+                        os.remove(transformer_file)
+                        # 전처리에 사용된 전처리기 삭제
                 serializer = PreprocessedDataSerializer(
                     preprocessed_data, data=dict(DELETE_FLAG=True), partial=True)
                 if serializer.is_valid():
@@ -158,3 +219,26 @@ def preprocessed_download(request, pk):
             status=status.HTTP_422_UNPROCESSABLE_ENTITY)
     return response
 
+
+@api_view(["POST"])
+def preprocessed_estimate(request):
+    # 전처리 데이터 생성과 같은 요청으로 작업을 실행하지 않고 예상 비용만 반환 (dry-run)
+    user_request = request.data
+    get_inspect_result = InspectUserRequest()
+
+    check_result = get_inspect_result.check_post_mode(request_info=user_request)
+    if isinstance(check_result, dict):
+        return _check_error_response(check_result)
+
+    estimate = estimate_preprocess_cost(
+        original_data_pk=get_inspect_result.original_data_id,
+        data_path=get_inspect_result.data_saved_path,
+        request_data=user_request["request_data"])
+    if estimate is None:
+        return Response(
+            error_code.UNPROCESSABLE_ENTITY_4022(error_msg="Preprocess Cost Estimation Failed"),
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    # 같은 요청의 결과가 있으면 생성 요청시 작업 없이 재사용됨
+    cached = result_cache.find_cached_result(_request_fingerprint(get_inspect_result, user_request))
+    estimate["cached_result"] = None if cached is None else cached["PREPROCESSED_DATA_SEQUENCE_PK"]
+    return Response(estimate, status=status.HTTP_200_OK)
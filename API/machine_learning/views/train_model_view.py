@@ -47,6 +47,9 @@ class TrainModelView(APIView):
             if error_type == "4004":
                 return Response(error_code.FILE_NOT_FOUND_4004(path_info=error_msg),
                                 status=status.HTTP_404_NOT_FOUND)
+            elif error_type == "4009":
+                return Response(error_code.CONFLICT_4009(mode="INGEST", error_msg=error_msg),
+                                status=status.HTTP_409_CONFLICT)
             elif error_type == "4101":
                 return Response(error_code.MANDATORY_PARAMETER_MISSING_4101(error_msg),
                                 status=status.HTTP_400_BAD_REQUEST)
@@ -144,6 +147,8 @@ class TrainModelDetailView(APIView):
                 logger.info(f"요청 ID [{pk}]의 모델 학습을 중지합니다")
                 job_id = serializer.data["JOB_ID"]
                 revoke(job_id, terminate=True)
+                # 분산 학습의 하위 작업 (없으면 무시)
+                tasks.revoke_subtasks(serializer.data["SUBTASK_IDS"])
 
                 stop_information = dict(
                     PROGRESS_STATE="standby",
@@ -172,6 +177,7 @@ class TrainModelDetailView(APIView):
                 FILENAME="",
                 TRAIN_SUMMARY="",
                 VALIDATION_SUMMARY="",
+                SUBTASK_IDS="",
                 LOAD_STATE="model_not_found",
                 PROGRESS_STATE="ongoing",
                 JOB_ID=result.id,
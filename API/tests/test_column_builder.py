@@ -0,0 +1,71 @@
+# API/tests
+"""
+전처리 결과 컬럼 조립(column_builder.py) 확인
+
+    ColumnBlockBuilder 결과는 기존 pd.concat/drop 결과와 같고, 변환 결과 배열을 복사하지 않아야 함
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from django.test import SimpleTestCase
+
+from ..machine_learning.services.data_preprocess.column_builder import ColumnBlockBuilder
+from ..utils.custom_call import to_dense_frame
+
+
+class ColumnBlockBuilderTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": ["x", "y", "z"], "c": [4, 5, 6]},
+                                 index=[10, 11, 12])
+
+    def test_same_as_concat_and_drop(self):
+        block = np.arange(6.0).reshape(3, 2)
+        builder = ColumnBlockBuilder(self.data)
+        builder["a"] = np.array([[0.5], [0.6], [0.7]])
+        builder.expand("b", ["b_0", "b_1"], block)
+        builder.drop("c")
+        builder["d"] = np.ones(3)
+
+        expected = self.data.copy()
+        expected["a"] = [0.5, 0.6, 0.7]
+        expected = pd.concat([expected, pd.DataFrame(block, columns=["b_0", "b_1"], index=expected.index)],
+                             axis=1).drop(["b", "c"], axis=1)
+        expected["d"] = 1.0
+        pd.testing.assert_frame_equal(builder.to_frame(), expected)
+
+    def test_no_copy(self):
+        builder = ColumnBlockBuilder(self.data)
+        block = np.arange(6.0).reshape(3, 2)
+        builder.expand("a", ["a_0", "a_1"], block)
+        self.assertTrue(np.shares_memory(builder.blocks["a_0"], block))
+        subset = builder.subset(["c", "a_1", "missing"])
+        self.assertEqual(subset.columns, ["c", "a_1"])
+        self.assertIs(subset.blocks["a_1"], builder.blocks["a_1"])
+
+    def test_sparse_block_is_kept_sparse(self):
+        block = sparse.csr_matrix(np.array([[1.0, 0.0], [0.0, 0.0], [0.0, 2.0]]))
+        builder = ColumnBlockBuilder(self.data)
+        builder.expand("b", ["b_0", "b_1"], block)
+        frame = builder.to_frame()
+        self.assertIsInstance(frame["b_0"].dtype, pd.SparseDtype)
+        np.testing.assert_array_equal(to_dense_frame(frame)[["b_0", "b_1"]].values, block.toarray())
+        # 희소 컬럼이 있는 데이터로 다시 만들어도 희소 배열 유지
+        self.assertIsInstance(ColumnBlockBuilder(frame).blocks["b_1"], pd.arrays.SparseArray)
+
+    def test_sparse_block_is_kept_as_one_matrix(self):
+        block = sparse.random(3, 50, density=0.3, format="csr", random_state=0)
+        names = ["b_{}".format(i) for i in range(50)]
+        builder = ColumnBlockBuilder(self.data)
+        builder.expand("b", names, block)
+        # 열 단위 배열을 만들지 않고 행렬 하나를 공유
+        self.assertEqual(len({id(builder.blocks[name].matrix) for name in names}), 1)
+        np.testing.assert_array_equal(builder.values_of("b_7"), block.toarray()[:, 7])
+        self.assertIsInstance(builder["b_7"].dtype, pd.SparseDtype)
+        builder.drop("b_3")
+        frame = builder.to_frame()
+        self.assertEqual(list(frame.columns), ["a", "c"] + names[:3] + names[4:])
+        expected = np.delete(block.toarray(), 3, axis=1)
+        np.testing.assert_array_equal(to_dense_frame(frame)[names[:3] + names[4:]].values, expected)
+        self.assertTrue(all(frame[name].dtype == pd.SparseDtype(float, 0) for name in names if name != "b_3"))
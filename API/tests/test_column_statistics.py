@@ -0,0 +1,180 @@
+# API/tests
+"""
+컬럼 통계(column_statistics.py)의 전체 데이터 계산과 청크 단위 계산 비교
+
+    정확 모드 : 개수/결측값/평균/표준편차/최솟값/최댓값과 범주 빈도는 같고,
+               사분위수/히스토그램은 스케치 오차 안에서 같아야 함
+               (수치형 고유값 수는 NUMERICAL_COUNTS_LIMIT 까지 같고 넘으면 HyperLogLog 오차 안)
+    근사 모드 : 고유값 수/분위수가 허용 오차(APPROX_SUMMARY_ERROR) 안에 있어야 함
+"""
+import os
+import json
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from unittest import mock
+from django.test import SimpleTestCase
+
+from ..config.data_config import DATA_CONFIG
+from ..machine_learning.services.data_preprocess.column_statistics import profile_column, ColumnAccumulator
+from ..machine_learning.services.data_preprocess.column_statistics import NUMERICAL_COUNTS_LIMIT
+from ..machine_learning.services.data_preprocess.data_summary import DataSummary, StreamingDataSummary
+
+N_ROWS = 20000
+CHUNKSIZE = 1700
+ERROR = 0.01
+
+
+def _columns(n_rows=N_ROWS):
+    rng = np.random.RandomState(2019)
+    # 범주 빈도가 모두 달라야 빈도가 같은 범주의 순서 차이 없이 비교 가능
+    grades = np.repeat(list("abcdefg"), [1 << i for i in range(7)])
+    return pd.DataFrame({
+        "normal": rng.normal(50, 10, n_rows),
+        "with_nan": np.where(rng.rand(n_rows) < 0.1, np.nan, rng.exponential(size=n_rows)),
+        "count": rng.poisson(3, n_rows).astype(np.int64),
+        "binary": rng.randint(0, 2, n_rows).astype(np.int64),
+        "grade": rng.choice(grades, n_rows),
+        "city": pd.Series(rng.choice(["seoul", "busan", None], n_rows, p=[0.6, 0.3, 0.1]), dtype=object),
+        "id": np.arange(n_rows).astype(str),
+    })
+
+
+def assert_distinct(test, expected, actual, msg):
+    expected, actual = int(expected), int(actual)
+    if expected <= NUMERICAL_COUNTS_LIMIT:
+        test.assertEqual(expected, actual, msg)
+    else:
+        test.assertLessEqual(abs(actual / expected - 1), ERROR, msg)
+
+
+def assert_quantiles(test, col_data, quantiles, msg):
+    # 사분위수 추정값의 순위가 요청한 분위수와 스케치 오차(순위 기준) 안에서 같음 (같은 값은 순위 구간)
+    valid = np.sort(col_data.dropna().values)
+    for key, q in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+        low = np.searchsorted(valid, quantiles[key], side="left") / len(valid)
+        high = np.searchsorted(valid, quantiles[key], side="right") / len(valid)
+        test.assertTrue(low - 2 * ERROR <= q <= high + 2 * ERROR, (msg, key))
+
+
+def _accumulate(col_data, approx=False, chunksize=CHUNKSIZE):
+    accumulator = ColumnAccumulator(approx=approx, error=ERROR)
+    for start in range(0, len(col_data), chunksize):
+        accumulator.update(col_data.iloc[start:start + chunksize])
+    return accumulator
+
+
+def _merged(col_data, approx=False, n_parts=5):
+    bounds = np.linspace(0, len(col_data), n_parts + 1).astype(int)
+    parts = [_accumulate(col_data.iloc[start:end], approx) for start, end in zip(bounds[:-1], bounds[1:])]
+    for part in parts[1:]:
+        parts[0].merge(part)
+    return parts[0]
+
+
+class ColumnAccumulatorParityTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = _columns()
+
+    def assertSameNumerical(self, name, expected, actual):
+        self.assertEqual(expected[:2], actual[:2], name)
+        expected_info, actual_info = expected[2]["additional_info"], actual[2]["additional_info"]
+        for key in ("valid", "nan"):
+            self.assertEqual(expected_info[key], actual_info[key], (name, key))
+        assert_distinct(self, expected_info["distinct"], actual_info["distinct"], name)
+        for key in ("mean", "std"):
+            self.assertAlmostEqual(float(expected_info[key]), float(actual_info[key]), places=7, msg=(name, key))
+        for key in ("min", "max"):
+            self.assertEqual(expected_info["quantiles"][key], actual_info["quantiles"][key], (name, key))
+        assert_quantiles(self, self.data[name], actual_info["quantiles"], name)
+        # 히스토그램은 같은 구간(최솟값~최댓값 10등분)의 근사 빈도
+        self.assertEqual(expected[2]["bins_means"], actual[2]["bins_means"], name)
+        expected_freq = np.asarray(expected[2]["frequency"], dtype=float)
+        actual_freq = np.asarray(actual[2]["frequency"], dtype=float)
+        self.assertEqual(expected_freq.sum(), actual_freq.sum(), name)
+        self.assertLessEqual(np.abs(expected_freq - actual_freq).sum() / expected_freq.sum(), 0.02, name)
+
+    def test_exact_mode_matches_full_data(self):
+        for name in self.data.columns:
+            expected = profile_column(self.data[name])
+            for actual in (_accumulate(self.data[name]).result(), _merged(self.data[name]).result()):
+                if expected[0] == "numerical":
+                    self.assertSameNumerical(name, expected, actual)
+                else:  # 범주형(0/1 컬럼 포함)은 같은 결과
+                    self.assertEqual(expected, actual, name)
+
+    def test_string_chunk_after_numeric_chunks(self):
+        # 뒤쪽 청크에 문자열이 있으면 전체를 읽었을 때와 같이 범주형
+        col_data = pd.Series([1.0, 2.0, 2.0, 3.0] * 10 + ["x"], dtype=object)
+        accumulator = ColumnAccumulator()
+        accumulator.update(col_data.iloc[:40].astype(float))
+        accumulator.update(col_data.iloc[40:])
+        self.assertEqual(accumulator.result()[0], "categorical")
+        self.assertEqual(accumulator.result()[2]["elements"], [2.0, 1.0, 3.0, "x"])
+
+    def test_categorical_counts_limit(self):
+        # 고유값 수가 한도를 넘으면 빈도표 대신 HyperLogLog/Misra-Gries 로 전환 (메모리 제한)
+        col_data = pd.Series(np.random.RandomState(2019).randint(0, 5000, N_ROWS).astype(str))
+        col_data[:2000] = "hot"
+        with mock.patch.object(DATA_CONFIG, "SUMMARY_CATEGORICAL_COUNTS_LIMIT", 500):
+            for accumulator in (_accumulate(col_data), _merged(col_data)):
+                self.assertTrue(accumulator.counts_overflow)
+                self.assertIsNone(accumulator.value_counts)
+                data_type, graph_type, compact_data = accumulator.result()
+                self.assertEqual((data_type, graph_type), ("categorical", "bar"))
+                self.assertEqual(compact_data["elements"][0], "hot")
+                self.assertLessEqual(len(compact_data["elements"]), accumulator.top_k)
+                self.assertLessEqual(abs(accumulator.distinct.estimate() / col_data.nunique() - 1), ERROR)
+        # 한도 안이면 빈도표를 유지
+        accumulator = _accumulate(col_data)
+        self.assertFalse(accumulator.counts_overflow)
+        self.assertEqual(accumulator.value_counts.sum(), len(col_data))
+
+    def test_approximate_mode_error(self):
+        for name in ("normal", "with_nan", "count", "id"):
+            col_data = self.data[name]
+            for accumulator in (_accumulate(col_data, approx=True), _merged(col_data, approx=True)):
+                data_type, graph_type, compact_data = accumulator.result()
+                expected = profile_column(col_data)
+                self.assertEqual((data_type, graph_type), expected[:2], name)
+                if data_type != "numerical":
+                    continue
+                info = compact_data["additional_info"]
+                self.assertLessEqual(abs(int(info["distinct"]) / col_data.nunique() - 1), ERROR, name)
+                assert_quantiles(self, col_data, info["quantiles"], name)
+
+
+class StreamingDataSummaryParityTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.data_path = os.path.join(self.work_dir, "P_1.csv")
+        _columns(5000).to_csv(self.data_path, index=False)
+
+    def test_same_summary_as_in_memory(self):
+        expected = DataSummary(self.data_path, approx=False, n_jobs=1)
+        actual = StreamingDataSummary(self.data_path, chunksize=700, approx=False)
+        self.assertEqual(expected.columns_info(), actual.columns_info())
+        self.assertEqual(expected.size_info(), actual.size_info())
+        self.assertEqual(expected.sample_info(), actual.sample_info())
+        for expected_column, actual_column in zip(json.loads(expected.statistics_info()),
+                                                  json.loads(actual.statistics_info())):
+            name = expected_column["name"]
+            self.assertEqual(name, actual_column["name"])
+            self.assertEqual((expected_column["type"], expected_column["graph_type"]),
+                             (actual_column["type"], actual_column["graph_type"]), name)
+            if expected_column["type"] == "categorical":
+                self.assertEqual(expected_column["compact_data"], actual_column["compact_data"], name)
+            else:
+                expected_info = expected_column["compact_data"]["additional_info"]
+                actual_info = actual_column["compact_data"]["additional_info"]
+                for key in ("valid", "nan"):
+                    self.assertEqual(expected_info[key], actual_info[key], (name, key))
+                assert_distinct(self, expected_info["distinct"], actual_info["distinct"], name)
+                self.assertAlmostEqual(float(expected_info["mean"]), float(actual_info["mean"]), places=7)
@@ -0,0 +1,138 @@
+# API/tests
+"""
+컬럼 단위 바이너리(.npz) 저장/로드 결과가 원래 데이터와 같은지 확인
+"""
+import os
+import shutil
+import tempfile
+import decimal
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from .utils import ResultDirMixin
+from ..machine_learning.services.data_preprocess.preprocess_helper import PreprocessTask
+from ..utils.columnar_storage import save_columnar, load_columnar, iter_columnar_chunks
+from ..utils.columnar_storage import read_columnar_columns, ColumnarWriter, ColumnarTypeError
+
+
+class ColumnarRoundTripTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.file_path = os.path.join(self.work_dir, "P_1.npz")
+
+    def _round_trip(self, data):
+        save_columnar(data, self.file_path)
+        return load_columnar(self.file_path)
+
+    def assertSameValues(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for expected_value, actual_value in zip(expected, actual):
+            if expected_value is None or not isinstance(expected_value, (list, dict)) and pd.isna(expected_value):
+                self.assertIs(actual_value, expected_value) if expected_value is None \
+                    else self.assertTrue(pd.isna(actual_value))
+            else:
+                self.assertEqual(type(actual_value), type(expected_value))
+                self.assertEqual(actual_value, expected_value)
+
+    def test_numeric_and_datetime(self):
+        data = pd.DataFrame({
+            "int": np.arange(5, dtype=np.int32),
+            "float": [0.1, np.nan, 1e300, -2.5, 3.0],
+            "bool": [True, False, True, True, False],
+            "date": pd.date_range("2019-01-01", periods=5),
+        })
+        actual = self._round_trip(data)
+        pd.testing.assert_frame_equal(actual, data)
+        self.assertEqual(read_columnar_columns(self.file_path), list(data.columns))
+
+    def test_mixed_object_column_keeps_value_types(self):
+        values = [1, "a", None, np.nan, True, 2.5, "None", "", 0.1 + 0.2, [1, "b"], {"k": None}]
+        data = pd.DataFrame({"mixed": pd.Series(values, dtype=object)})
+        actual = self._round_trip(data)
+        self.assertEqual(actual["mixed"].dtype, object)
+        self.assertSameValues(values, actual["mixed"].tolist())
+
+    def test_string_column_keeps_missing_values(self):
+        values = ["x", None, "y", np.nan, "", "nan"]
+        data = pd.DataFrame({"text": pd.Series(values, dtype=object)})
+        self.assertSameValues(values, self._round_trip(data)["text"].tolist())
+
+    def test_category_column(self):
+        data = pd.DataFrame({
+            "ordered": pd.Categorical(["low", "high", None, "low"], categories=["low", "mid", "high"],
+                                      ordered=True),
+            "number": pd.Categorical([3, 1, 3, 2]),
+        })
+        actual = self._round_trip(data)
+        pd.testing.assert_frame_equal(actual, data)
+        # 사용하지 않은 범주와 순서도 유지
+        self.assertEqual(actual["ordered"].cat.categories.tolist(), ["low", "mid", "high"])
+        self.assertTrue(actual["ordered"].cat.ordered)
+
+    def test_index(self):
+        data = pd.DataFrame({"value": [1.0, 2.0, 3.0]}, index=pd.Index([10, 3, 7], name="id"))
+        pd.testing.assert_frame_equal(self._round_trip(data), data)
+        data = pd.DataFrame({"value": [1.0, 2.0]}, index=["a", "b"])
+        pd.testing.assert_frame_equal(self._round_trip(data), data)
+
+    def test_sparse_column(self):
+        data = pd.DataFrame({"sparse": pd.arrays.SparseArray([0.0, 0.0, 1.5, 0.0, 2.0], fill_value=0.0)})
+        actual = self._round_trip(data)
+        np.testing.assert_array_equal(np.asarray(actual["sparse"]), np.asarray(data["sparse"]))
+
+    def test_writer_chunks(self):
+        chunks = [pd.DataFrame({"x": [1.0, 2.0], "y": pd.Series(["a", 1], dtype=object)}),
+                  pd.DataFrame({"x": [3.0], "y": pd.Series([None], dtype=object)}, index=[2]),
+                  pd.DataFrame({"x": [4.0, 5.0], "y": pd.Series(["b", 2.5], dtype=object)}, index=[3, 4])]
+        writer = ColumnarWriter(self.file_path)
+        for chunk in chunks:
+            writer.append(chunk)
+        writer.close()
+
+        expected = pd.concat(chunks)
+        actual = load_columnar(self.file_path)
+        np.testing.assert_array_equal(actual["x"].values, expected["x"].values)
+        self.assertSameValues(expected["y"].tolist(), actual["y"].tolist())
+        self.assertEqual(actual.index.tolist(), list(range(5)))
+        # 청크 단위로 읽으면 저장한 청크와 같은 행과 인덱스
+        loaded_chunks = list(iter_columnar_chunks(self.file_path, columns=["y"]))
+        self.assertEqual([len(chunk) for chunk in loaded_chunks], [2, 1, 2])
+        self.assertEqual([chunk.index.tolist() for chunk in loaded_chunks],
+                         [chunk.index.tolist() for chunk in chunks])
+
+    def test_unsupported_value(self):
+        data = pd.DataFrame({"amount": pd.Series([decimal.Decimal("1.5")], dtype=object)})
+        with self.assertRaises(ColumnarTypeError):
+            save_columnar(data, self.file_path)
+        # 임시 파일을 남기지 않음
+        self.assertEqual(os.listdir(self.work_dir), [])
+
+    def test_duplicate_or_non_string_column_names(self):
+        duplicated = pd.DataFrame([[1, 2], [3, 4]], columns=["a", "a"])
+        for data in (duplicated, pd.DataFrame({0: [1, 2], "b": [3, 4]})):
+            with self.assertRaises(ColumnarTypeError):
+                save_columnar(data, self.file_path)
+            self.assertEqual(os.listdir(self.work_dir), [])
+        writer = ColumnarWriter(self.file_path)
+        writer.append(pd.DataFrame({"a": [1], "b": [2]}))
+        with self.assertRaises(ColumnarTypeError):
+            writer.append(pd.DataFrame({"b": [2], "a": [1]}))
+        writer.abort()
+
+
+class SavePrepDataTest(ResultDirMixin, SimpleTestCase):
+
+    def test_columnar_fallback(self):
+        # 컬럼 단위 형식으로 저장할 수 없는 데이터는 원본 데이터 형식으로 저장
+        task = PreprocessTask(pk=3)
+        task.original_file_ext = "csv"
+        task.file_name = "P_3.npz"
+        task._save_prep_data(prep_data=pd.DataFrame([[1, 2], [3, 4]], columns=["a", "a"]), file_name=task.file_name)
+        self.assertEqual(task.file_name, "P_3.csv")
+        saved = pd.read_csv(task.file_path)
+        self.assertEqual(saved.values.tolist(), [[1, 2], [3, 4]])
@@ -0,0 +1,128 @@
+# API/tests
+"""
+프로세스 단위 DataFrame 캐시(data_cache.py) 확인
+"""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from unittest import mock
+from django.test import SimpleTestCase
+
+from ..config.data_config import DATA_CONFIG
+from ..utils import data_cache as data_cache_module
+from ..utils.data_cache import DataFrameCache
+
+
+class DataFrameCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.loaded = []
+
+    def _write(self, name, data):
+        file_path = os.path.join(self.work_dir, name)
+        data.to_csv(file_path, index=False)
+        return file_path
+
+    def _loader(self, file_path, columns):
+        self.loaded.append((file_path, columns))
+        return pd.read_csv(file_path, usecols=columns)
+
+    def test_shared_hit_and_copy(self):
+        file_path = self._write("O_1.csv", pd.DataFrame({"a": range(100), "b": range(100)}))
+        cache = DataFrameCache(max_bytes=10 ** 6)
+        first = cache.get(file_path, self._loader)
+        # 기본값은 캐시된 데이터의 배열을 공유 (읽기만 하는 호출자)
+        self.assertTrue(np.shares_memory(cache.get(file_path, self._loader)["a"].values, first["a"].values))
+        copied = cache.get(file_path, self._loader, copy=True)
+        self.assertIsNot(copied, first)
+        copied["a"] = 0
+        self.assertEqual(first["a"].tolist(), list(range(100)))
+        self.assertEqual(len(self.loaded), 1)
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_shared_data_cannot_change_cache(self):
+        file_path = self._write("O_1.csv", pd.DataFrame({"a": [1, 2, 3], "b": [4.0, 5.0, 6.0]}))
+        cache = DataFrameCache(max_bytes=10 ** 6)
+        for data in (cache.get(file_path, self._loader), cache.get(file_path, self._loader)):
+            # 공유하는 배열은 읽기 전용
+            with self.assertRaises(ValueError):
+                data["a"].values[0] = 0
+            try:
+                data.iloc[0, 1] = 0.0
+            except ValueError:
+                pass
+            data["a"] = data["a"] * 10
+            data["c"] = 1
+            data.drop(columns=["b"], inplace=True)
+            data = cache.get(file_path, self._loader)
+            self.assertEqual(list(data.columns), ["a", "b"])
+            self.assertEqual(data["a"].tolist(), [1, 2, 3])
+            self.assertEqual(data["b"].tolist(), [4.0, 5.0, 6.0])
+        self.assertEqual(len(self.loaded), 1)
+
+    def test_columns_from_cached_full_data(self):
+        file_path = self._write("O_1.csv", pd.DataFrame({"a": [1, 2], "b": [3, 4], "c": [5, 6]}))
+        cache = DataFrameCache(max_bytes=10 ** 6)
+        cache.get(file_path, self._loader)
+        subset = cache.get(file_path, self._loader, columns=["c", "a", "missing"])
+        self.assertEqual(list(subset.columns), ["c", "a"])
+        self.assertEqual(len(self.loaded), 1)
+
+    def test_changed_file_is_loaded_again(self):
+        file_path = self._write("O_1.csv", pd.DataFrame({"a": [1, 2]}))
+        cache = DataFrameCache(max_bytes=10 ** 6)
+        cache.get(file_path, self._loader)
+        self._write("O_1.csv", pd.DataFrame({"a": [1, 2, 3]}))
+        os.utime(file_path, ns=(0, 10 ** 18))  # 수정시각이 같은 시간 단위에 있어도 구분되도록
+        self.assertEqual(cache.get(file_path, self._loader)["a"].tolist(), [1, 2, 3])
+        # 이전 버전은 캐시에서 제거
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_lru_eviction_by_bytes(self):
+        frames = {name: pd.DataFrame({"a": range(1000)}) for name in ("O_1.csv", "O_2.csv", "O_3.csv")}
+        paths = {name: self._write(name, data) for name, data in frames.items()}
+        nbytes = int(frames["O_1.csv"].memory_usage(index=True, deep=True).sum())
+        cache = DataFrameCache(max_bytes=2 * nbytes)
+        cache.get(paths["O_1.csv"], self._loader)
+        cache.get(paths["O_2.csv"], self._loader)
+        cache.get(paths["O_1.csv"], self._loader)  # O_2 가 가장 오래 사용하지 않은 데이터
+        cache.get(paths["O_3.csv"], self._loader)
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+        n_loaded = len(self.loaded)
+        cache.get(paths["O_1.csv"], self._loader)
+        self.assertEqual(len(self.loaded), n_loaded)
+        cache.get(paths["O_2.csv"], self._loader)
+        self.assertEqual(len(self.loaded), n_loaded + 1)
+
+    def test_disabled_and_too_large(self):
+        file_path = self._write("O_1.csv", pd.DataFrame({"a": range(1000)}))
+        disabled = DataFrameCache(max_bytes=0)
+        disabled.get(file_path, self._loader)
+        disabled.get(file_path, self._loader)
+        self.assertEqual(len(self.loaded), 2)
+        self.assertEqual(disabled.stats()["entries"], 0)
+        small = DataFrameCache(max_bytes=100)
+        data = small.get(file_path, self._loader, copy=True)
+        self.assertEqual(len(data), 1000)
+        self.assertEqual(small.stats()["entries"], 0)
+
+    def test_resize_and_worker_limit(self):
+        file_path = self._write("O_1.csv", pd.DataFrame({"a": range(1000)}))
+        cache = DataFrameCache(max_bytes=10 ** 6)
+        cache.get(file_path, self._loader)
+        cache.resize(100)
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stats()["bytes"], 0)
+        # celery worker 에서는 DATA_CACHE_WORKER_MAX_BYTES (기본값 0 => 사용하지 않음)
+        with mock.patch.object(data_cache_module, "data_cache", cache), \
+                mock.patch.object(DATA_CONFIG, "DATA_CACHE_WORKER_MAX_BYTES", 0):
+            data_cache_module.use_worker_limit()
+        self.assertEqual(cache.max_bytes, 0)
@@ -0,0 +1,115 @@
+# API/tests
+"""
+컬럼 단위 전처리 결과 캐시(feature_cache.py) 확인
+
+캐시에서 로드한 단계의 결과는 다시 계산한 결과와 같아야 하고,
+앞 단계가 다른 컬럼은 같은 전처리기라도 캐시를 공유하지 않아야 함
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from unittest import mock
+from django.test import SimpleTestCase
+
+from .utils import PreprocessCatalog, ResultDirMixin
+from ..machine_learning.services.data_preprocess import preprocess_helper
+from ..machine_learning.services.data_preprocess.preprocess_helper import PreprocessTask
+from ..utils.columnar_storage import load_columnar
+from ..utils.custom_call import to_dense_frame
+from ..utils.feature_cache import FeatureCache, lineage_key, CACHE_EXT
+
+
+class FeatureCacheTest(ResultDirMixin, SimpleTestCase):
+
+    def test_put_and_get(self):
+        cache = FeatureCache(self.work_dir, max_bytes=10 ** 6)
+        key = lineage_key("hash", "temp", 1)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, dict(changed_field=np.arange(3.0), routing="replace"))
+        cached = cache.get(key)
+        np.testing.assert_array_equal(cached["changed_field"], np.arange(3.0))
+        self.assertEqual(cache.stats(), dict(hits=1, misses=1, max_bytes=10 ** 6))
+
+    def test_lineage_key(self):
+        self.assertEqual(lineage_key("hash", "temp", 1), lineage_key("hash", "temp", 1))
+        self.assertNotEqual(lineage_key("hash", "temp", 1), lineage_key("hash", "temp", 2))
+        # 구분자가 있으므로 값을 이어붙인 결과가 같아도 다른 key
+        self.assertNotEqual(lineage_key("ab", "c"), lineage_key("a", "bc"))
+
+    def test_disabled(self):
+        cache = FeatureCache(self.work_dir, max_bytes=0)
+        cache.put("key", dict(value=1))
+        self.assertIsNone(cache.get("key"))
+        self.assertFalse(FeatureCache(os.path.join(self.work_dir, "missing"), max_bytes=10 ** 6).enabled)
+
+    def test_evicts_least_recently_used(self):
+        value = dict(changed_field=np.zeros(1000))
+        cache = FeatureCache(self.work_dir, max_bytes=10 ** 6)
+        cache.put("old", value)
+        cache.put("new", value)
+        nbytes = os.path.getsize(os.path.join(self.work_dir, "old" + CACHE_EXT))
+        os.utime(os.path.join(self.work_dir, "old" + CACHE_EXT), (0, 0))
+        cache.max_bytes = int(2.5 * nbytes)
+        cache.put("newest", value)
+        self.assertIsNone(cache.get("old"))
+        self.assertIsNotNone(cache.get("new"))
+        self.assertIsNotNone(cache.get("newest"))
+
+    def test_truncated_file_is_miss(self):
+        cache = FeatureCache(self.work_dir, max_bytes=10 ** 6)
+        cache.put("key", dict(changed_field=np.zeros(1000)))
+        file_path = os.path.join(self.work_dir, "key" + CACHE_EXT)
+        with open(file_path, "r+b") as f:
+            f.truncate(os.path.getsize(file_path) // 2)
+        self.assertIsNone(cache.get("key"))
+
+
+class PreprocessFeatureCacheTest(ResultDirMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data_path = self.original_path("O_1.csv")
+        rng = np.random.RandomState(2019)
+        pd.DataFrame({
+            "temp": rng.normal(20, 5, 300),
+            "hum": np.where(rng.rand(300) < 0.1, np.nan, rng.uniform(0, 100, 300)),
+            "season": rng.choice(["spring", "summer", "fall", "winter"], 300),
+        }).to_csv(self.data_path, index=False)
+        self.cache = FeatureCache(os.path.join(self.work_dir, "feature_cache"), max_bytes=10 ** 8)
+        os.makedirs(self.cache.cache_dir)
+        for patcher in (mock.patch.object(preprocess_helper, "preprocess_function_registry", PreprocessCatalog()),
+                        mock.patch.object(preprocess_helper, "feature_cache", self.cache),
+                        mock.patch.object(preprocess_helper, "original_file_hash", return_value="hash")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self, pk, request_data):
+        result = PreprocessTask(pk=pk).task_result(
+            self.data_path, dict(original_data_sequence_pk=1, request_data=request_data))
+        self.assertTrue(result)
+        return to_dense_frame(load_columnar(result["file_path"]))
+
+    def test_cached_steps_give_same_result(self):
+        request_data = [
+            {"preprocess_functions_sequence_pk": 7, "field_name": "hum"},
+            {"preprocess_functions_sequence_pk": 1, "field_name": "temp, hum"},
+            {"preprocess_functions_sequence_pk": 4, "field_name": "season"},
+        ]
+        first = self._run(1, request_data)
+        self.assertEqual(self.cache.hits, 0)
+        second = self._run(2, request_data)
+        self.assertEqual(self.cache.hits, 4)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_different_previous_step_is_not_shared(self):
+        # hum 의 StandardScaler 는 앞 단계(결측값 대체 전략)가 다르면 다른 결과
+        self._run(1, [{"preprocess_functions_sequence_pk": 7, "field_name": "hum"},
+                      {"preprocess_functions_sequence_pk": 1, "field_name": "hum"}])
+        result = self._run(2, [{"preprocess_functions_sequence_pk": 7, "field_name": "hum",
+                                "condition": {"strategy": "median"}},
+                               {"preprocess_functions_sequence_pk": 1, "field_name": "hum"}])
+        self.assertEqual(self.cache.hits, 0)
+        hum = pd.read_csv(self.data_path)["hum"]
+        expected = hum.fillna(hum.median())
+        np.testing.assert_allclose(result["hum"], (expected - expected.mean()) / expected.std(ddof=0))
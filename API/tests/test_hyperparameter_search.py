@@ -0,0 +1,147 @@
+# API/tests
+"""
+하이퍼파라미터 탐색(hyperparameter_search.py) 확인
+
+    halving : 단계마다 후보 수가 1/factor 로 줄고 자원은 factor 배로 늘며, 점수 상위 후보만 다음 단계로 감
+    hyperband : bracket 별 (halving 횟수, 후보 수)
+"""
+import numpy as np
+import pandas as pd
+from unittest import mock
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+from django.test import SimpleTestCase
+
+from ..machine_learning.services.model_train.hyperparameter_search import HyperparameterSearch
+
+
+def _train_data(n_rows=600):
+    rng = np.random.RandomState(2019)
+    x_data = pd.DataFrame(rng.uniform(-3, 3, size=(n_rows, 2)), columns=["a", "b"])
+    y_data = np.sin(x_data["a"]) * 3 + x_data["b"] ** 2 + rng.normal(scale=0.1, size=n_rows)
+    return x_data, y_data
+
+
+def _fake_fit_trial(search, estimator, params, resource, n_jobs):
+    # 점수 = 후보 파라미터 값 (자원과 무관하게 순위가 정해지도록)
+    return params["min_samples_leaf"], 0.0, None
+
+
+class SuccessiveHalvingTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.x_data, self.y_data = _train_data()
+        self.estimator = DecisionTreeRegressor(random_state=0)
+
+    def _run(self, search, fit_trial=_fake_fit_trial):
+        searcher = HyperparameterSearch(search, self.estimator)
+        with mock.patch.object(HyperparameterSearch, "_fit_trial", autospec=True, side_effect=fit_trial):
+            return searcher, searcher.run(self.estimator, self.x_data, self.y_data)
+
+    def test_halving_rungs(self):
+        searcher, summary = self._run(dict(
+            method="halving", parameters={"min_samples_leaf": {"low": 1, "high": 100}},
+            n_candidates=9, factor=3, min_resource=30, max_resource=270))
+        trials = searcher.trials
+        self.assertEqual([len([t for t in trials if t["n_fits"] >= n]) for n in (1, 2, 3)], [9, 3, 1])
+        # 마지막으로 평가한 단계와 자원
+        self.assertEqual(sorted((t["rung"], t["resource"]) for t in trials),
+                         [(0, 30)] * 6 + [(1, 90)] * 2 + [(2, 270)])
+        self.assertEqual(summary["n_fits"], 9 + 3 + 1)
+        self.assertEqual(summary["n_trials"], 9)
+
+        # 각 단계의 생존 후보는 이전 단계 점수 상위 1/factor
+        scores = sorted((t["params"]["min_samples_leaf"] for t in trials), reverse=True)
+        second_rung = sorted((t["params"]["min_samples_leaf"] for t in trials if t["n_fits"] >= 2), reverse=True)
+        self.assertEqual(second_rung, scores[:3])
+        self.assertEqual(summary["best_params"], {"min_samples_leaf": scores[0]})
+        self.assertEqual(summary["best_score"], scores[0])
+        self.assertEqual(summary["leaderboard"][0]["resource"], 270)
+        self.assertEqual([t["rank"] for t in summary["leaderboard"]], list(range(1, 10)))
+
+    def test_failed_trials_are_not_promoted(self):
+        def fit_trial(search, estimator, params, resource, n_jobs):
+            if params["min_samples_leaf"] > 50:
+                return None, 0.0, "ValueError: failed"
+            return _fake_fit_trial(search, estimator, params, resource, n_jobs)
+
+        searcher, summary = self._run(dict(
+            method="halving", parameters={"min_samples_leaf": {"low": 1, "high": 100}},
+            n_candidates=9, factor=3, min_resource=30, max_resource=270), fit_trial)
+        failed = [t for t in searcher.trials if t["score"] is None]
+        self.assertEqual(summary["n_failed"], len(failed))
+        self.assertTrue(all(t["n_fits"] == 1 and t["error"] for t in failed))
+        self.assertLessEqual(summary["best_score"], 50)
+
+        with self.assertRaises(RuntimeError):
+            self._run(dict(method="random", parameters={"min_samples_leaf": [1, 2]}, n_candidates=3),
+                      lambda *args: (None, 0.0, "ValueError: failed"))
+
+    def test_hyperband_brackets(self):
+        searcher = HyperparameterSearch(dict(method="hyperband", parameters={"max_depth": [1, 2]},
+                                             n_candidates=9, factor=3), self.estimator)
+        self.assertEqual(searcher._halvings(9), 2)
+        self.assertEqual(searcher._halvings(8), 1)
+        self.assertEqual(searcher._brackets(), [(2, 9), (1, 5), (0, 3)])
+
+        searcher, summary = self._run(dict(
+            method="hyperband", parameters={"min_samples_leaf": {"low": 1, "high": 100}},
+            n_candidates=9, factor=3, max_resource=270))
+        self.assertEqual(summary["n_trials"], 9 + 5 + 3)
+        self.assertEqual([len([t for t in searcher.trials if t["bracket"] == b]) for b in range(3)], [9, 5, 3])
+        # 모든 bracket 의 마지막 단계는 max_resource
+        for bracket in range(3):
+            self.assertEqual(max(t["resource"] for t in searcher.trials if t["bracket"] == bracket), 270)
+        self.assertEqual(summary["n_fits"], sum(t["n_fits"] for t in searcher.trials))
+
+
+class HyperparameterSearchTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.x_data, self.y_data = _train_data()
+
+    def test_invalid_search(self):
+        estimator = DecisionTreeRegressor()
+        invalid = [
+            ("search", None),
+            ("bayes", dict(method="bayes", parameters={"max_depth": [1]})),
+            ("parameters", dict(method="grid", parameters={})),
+            ("alpha", dict(method="grid", parameters={"alpha": [1]})),
+            ("max_depth", dict(method="grid", parameters={"max_depth": {"low": 1, "high": 5}})),
+            ("max_depth", dict(method="random", parameters={"max_depth": {"low": 0, "high": 5, "log": True}})),
+            ("factor", dict(method="halving", parameters={"max_depth": [1]}, factor=1)),
+            ("n_candidates", dict(method="random", parameters={"max_depth": [1]}, n_candidates=True)),
+            ("n_candidates", dict(method="random", parameters={"max_depth": [1]}, n_candidates=1000)),
+            ("parameters", dict(method="grid", parameters={"max_depth": list(range(20)),
+                                                           "min_samples_leaf": list(range(1, 20))})),
+            ("n_estimators", dict(method="halving", parameters={"max_depth": [1]}, resource="n_estimators")),
+        ]
+        for message, search in invalid:
+            with self.assertRaises(ValueError, msg=message) as context:
+                HyperparameterSearch(search, estimator)
+            self.assertEqual(str(context.exception), message)
+        with self.assertRaises(ValueError):
+            HyperparameterSearch(dict(method="grid", parameters={"fit_intercept": [True]}, resource="n_estimators"),
+                                 LinearRegression())
+
+    def test_grid(self):
+        summary = HyperparameterSearch(dict(method="grid", parameters={"max_depth": [1, 8]}),
+                                       DecisionTreeRegressor(random_state=0)).run(
+            DecisionTreeRegressor(random_state=0), self.x_data, self.y_data)
+        self.assertEqual(summary["n_fits"], 2)
+        self.assertEqual(summary["max_resource"], 420)  # HOLDOUT_TEST_SIZE 를 제외한 학습 행 수
+        self.assertEqual(summary["best_params"], {"max_depth": 8})
+
+    def test_n_estimators_resource(self):
+        estimator = RandomForestRegressor(n_estimators=9, random_state=0)
+        searcher = HyperparameterSearch(dict(method="halving", parameters={"max_depth": [2, 4, 6]},
+                                             n_candidates=3, factor=3, resource="n_estimators"), estimator)
+        summary = searcher.run(estimator, self.x_data, self.y_data, cpu_budget=2)
+        self.assertEqual(summary["max_resource"], 9)
+        self.assertEqual(sorted(t["resource"] for t in searcher.trials), [3, 3, 9])
+        # 최종 학습은 최고 점수 trial 과 같은 n_estimators
+        self.assertEqual(summary["best_params"]["n_estimators"], 9)
+        self.assertEqual(estimator.get_params()["n_estimators"], 9)
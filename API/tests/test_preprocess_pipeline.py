@@ -0,0 +1,114 @@
+# API/tests
+"""
+전처리 파이프라인(T_{pk}_pipeline.pickle)과 단계별 전처리기(T_{pk}_{n}.pickle) 적용 결과 비교
+
+모델 테스트에서 파이프라인 하나로 변환한 결과(ModelPerformance._test_data_pipeline)는
+저장된 전처리 데이터(P_*) 및 단계별 전처리기를 차례대로 적용한 결과(_test_data_transformer)와 같아야 함
+"""
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from unittest import mock
+from django.test import SimpleTestCase
+
+from .utils import PreprocessCatalog, ResultDirMixin
+from ..config.result_path_config import PATH_CONFIG
+from ..machine_learning.services.data_preprocess import preprocess_helper
+from ..machine_learning.services.data_preprocess.preprocess_helper import PreprocessTask
+from ..machine_learning.services.model_test.test_helper import ModelPerformance
+from ..utils.custom_call import CallMixin, to_dense_frame
+from ..utils.feature_cache import FeatureCache
+
+REQUEST_DATA = [
+    {"preprocess_functions_sequence_pk": 7, "field_name": "wind"},
+    {"preprocess_functions_sequence_pk": 1, "field_name": "temp, wind"},
+    {"preprocess_functions_sequence_pk": 2, "field_name": "hum"},
+    {"preprocess_functions_sequence_pk": 4, "field_name": "season"},
+    {"preprocess_functions_sequence_pk": 6, "field_name": "label"},
+    {"preprocess_functions_sequence_pk": 10, "field_name": "memo"},
+]
+
+
+def _data(n_rows, seed):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        "temp": rng.normal(20, 5, n_rows),
+        "hum": rng.uniform(0, 100, n_rows),
+        "wind": np.where(rng.rand(n_rows) < 0.1, np.nan, rng.exponential(size=n_rows)),
+        "season": rng.choice(["spring", "summer", "fall", "winter"], n_rows),
+        "label": rng.choice(["a", "b", "c"], n_rows),
+        "memo": "-",
+    })
+
+
+def assert_same_frame(test, expected, actual):
+    expected, actual = to_dense_frame(expected), to_dense_frame(actual)
+    test.assertEqual(list(expected.columns), list(actual.columns))
+    for name in expected.columns:
+        np.testing.assert_allclose(np.asarray(actual[name], dtype=float), np.asarray(expected[name], dtype=float),
+                                   rtol=1e-12, atol=1e-12, err_msg=name)
+
+
+class PreprocessPipelineEquivalenceTest(ResultDirMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data_path = self.original_path("O_1.csv")
+        _data(500, 2019).to_csv(self.data_path, index=False)
+        for patcher in (mock.patch.object(preprocess_helper, "preprocess_function_registry",
+                                          PreprocessCatalog()),
+                        mock.patch.object(preprocess_helper, "feature_cache", FeatureCache(self.work_dir, 0))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        request_info = dict(original_data_sequence_pk=1, request_data=REQUEST_DATA)
+        self.task = PreprocessTask(pk=1)
+        self.result = self.task.task_result(self.data_path, request_info)
+        self.assertTrue(self.result)
+        self.pipeline = joblib.load(os.path.join(
+            PATH_CONFIG.RESULT_ML_PREPROCESS_TRANS_DIR, self.result["pipeline_file_name"]))
+
+    def _summary(self):
+        # DB 에 저장되는 SUMMARY 문자열 중 단계별 적용에 사용하는 값
+        return str([{key: step[key] for key in ("field_name", "function_name", "file_name")}
+                    for step in self.result["summary"]])
+
+    def _model_performance(self):
+        command = dict(train_parameters=dict(X=["temp", "hum"], y="label"))
+        return ModelPerformance(model_info=dict(COMMAND=str(command)), test_data_path=None)
+
+    def test_pipeline_reproduces_saved_data(self):
+        saved = CallMixin._load_data("PREPROCESSED_DATA_DIR", self.result["file_name"])
+        original = pd.read_csv(self.data_path)
+        assert_same_frame(self, saved, self.pipeline.transform(original))
+        self.assertEqual([step["routing"] for step in self.pipeline.steps],
+                         ["replace", "replace", "replace", "replace", "expand", "replace", "drop"])
+
+    def test_fields_keep_own_transformers(self):
+        # 한 요청의 여러 필드('temp, wind')는 필드별로 fit 한 전처리기를 그대로 보관
+        scalers = {step["field_name"]: step["transformer"] for step in self.task.pipeline.steps
+                   if step["function_name"] == "StandardScaler"}
+        self.assertEqual(set(scalers), {"temp", "wind"})
+        self.assertIsNot(scalers["temp"], scalers["wind"])
+        original = pd.read_csv(self.data_path)
+        self.assertAlmostEqual(scalers["temp"].mean_[0], original["temp"].mean())
+
+    def test_pipeline_matches_per_step_transformers(self):
+        test_data = _data(200, 7)
+        by_pipeline, by_steps = self._model_performance(), self._model_performance()
+        expected = by_steps._test_data_transformer(test_data.copy(), self._summary())
+        actual = by_pipeline._test_data_pipeline(test_data.copy(), self.result["pipeline_file_name"])
+        assert_same_frame(self, expected, actual)
+        # 예측값을 원래 범주로 되돌리는 y 전처리기도 같음
+        self.assertEqual(by_pipeline.y_data_transformer.classes_.tolist(),
+                         by_steps.y_data_transformer.classes_.tolist())
+        # 원본 데이터는 변경하지 않음
+        pd.testing.assert_frame_equal(test_data, _data(200, 7))
+
+    def test_missing_field(self):
+        test_data = _data(20, 7).drop(columns=["season"])
+        self.assertIs(self._model_performance()._test_data_pipeline(
+            test_data, self.result["pipeline_file_name"]), False)
+        self.assertIs(self._model_performance()._test_data_transformer(
+            test_data, self._summary()), False)
@@ -0,0 +1,65 @@
+# API/tests
+"""
+전처리 테스트(원본 데이터 PATCH)의 fit 행 추출 (TestPreprocessor._fit_positions) 확인
+
+    sample/stratified 는 앞 PREVIEW_ROWS 행을 포함해서 중복 없이 PREVIEW_SAMPLE_ROWS 행,
+    stratified 는 범주별 행 수 비율대로 추출하고 모든 범주를 포함
+"""
+import numpy as np
+import pandas as pd
+from unittest import mock
+from django.test import SimpleTestCase
+
+from ..config.data_config import DATA_CONFIG
+from ..machine_learning.services.data_preprocess.preprocess_tester import TestPreprocessor, PREVIEW_ROWS
+
+SAMPLE_ROWS = 200
+
+
+class FitPositionsTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(DATA_CONFIG, "PREVIEW_SAMPLE_ROWS", SAMPLE_ROWS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        rng = np.random.RandomState(7)
+        values = rng.choice(["a", "b", "c"], p=[0.7, 0.25, 0.05], size=5000).astype(object)
+        values[[100, 4000]] = ["rare", None]
+        self.field = pd.Series(values)
+
+    def _positions(self, mode, field=None):
+        tester = TestPreprocessor(file_name="O_1.csv", pk=1)
+        tester.preview_mode = mode
+        return tester._fit_positions(self.field if field is None else field)
+
+    def assertBoundedSample(self, positions, n_rows):
+        self.assertEqual(len(positions), SAMPLE_ROWS)
+        self.assertEqual(len(np.unique(positions)), SAMPLE_ROWS)
+        np.testing.assert_array_equal(positions[:PREVIEW_ROWS], np.arange(PREVIEW_ROWS))
+        self.assertTrue(np.all(np.diff(positions) > 0))
+        self.assertLess(positions[-1], n_rows)
+
+    def test_exact_and_small_data(self):
+        self.assertIsNone(self._positions("exact"))
+        self.assertIsNone(self._positions("stratified", self.field[:SAMPLE_ROWS]))
+
+    def test_sample(self):
+        self.assertBoundedSample(self._positions("sample"), len(self.field))
+        # 숫자 필드는 stratified 도 sample 과 같음
+        numeric = pd.Series(np.arange(5000.0))
+        np.testing.assert_array_equal(self._positions("stratified", numeric), self._positions("sample", numeric))
+
+    def test_stratified(self):
+        positions = self._positions("stratified")
+        self.assertBoundedSample(positions, len(self.field))
+        sampled = self.field[positions[PREVIEW_ROWS:]].fillna("<NA>").value_counts()
+        rest = self.field[PREVIEW_ROWS:].fillna("<NA>").value_counts()
+        self.assertEqual(set(sampled.index), set(rest.index))
+        for name in ("a", "b", "c"):
+            expected = rest[name] / rest.sum() * (SAMPLE_ROWS - PREVIEW_ROWS)
+            self.assertLessEqual(abs(sampled[name] - expected), 2, name)
+
+    def test_stratified_with_many_categories(self):
+        field = pd.Series(["id-{}".format(i) for i in range(5000)])
+        self.assertBoundedSample(self._positions("stratified", field), len(field))
@@ -0,0 +1,93 @@
+# API/tests
+"""
+전처리 결과 재사용(result_cache.py) 확인
+
+    fingerprint : 같은 요청(필드명 공백/조건 대소문자 차이 포함)은 같은 값, 순서/데이터가 다르면 다른 값
+    find_cached_result : 성공한 행 중 P_* 파일이 남아있는 최신 행
+"""
+import os
+import hashlib
+
+from unittest import mock
+from django.test import SimpleTestCase
+
+from .utils import ResultDirMixin
+from ..config.result_path_config import PATH_CONFIG
+from ..machine_learning.services.data_preprocess import result_cache
+
+STEPS = [
+    {"preprocess_functions_sequence_pk": 7, "field_name": "hum", "condition": {"strategy": "Median"}},
+    {"preprocess_functions_sequence_pk": 1, "field_name": "temp, hum"},
+]
+
+
+class RequestFingerprintTest(SimpleTestCase):
+
+    def test_same_request(self):
+        same_steps = [
+            {"preprocess_functions_sequence_pk": "7", "field_name": "hum", "condition": {"strategy": "median"}},
+            {"preprocess_functions_sequence_pk": 1, "field_name": ["temp", " hum"], "condition": {}},
+        ]
+        self.assertEqual(result_cache.request_fingerprint("hash", STEPS),
+                         result_cache.request_fingerprint("hash", same_steps))
+
+    def test_different_request(self):
+        fingerprint = result_cache.request_fingerprint("hash", STEPS)
+        self.assertNotEqual(fingerprint, result_cache.request_fingerprint("other", STEPS))
+        # 단계 순서는 결과에 영향을 주므로 다른 요청
+        self.assertNotEqual(fingerprint, result_cache.request_fingerprint("hash", STEPS[::-1]))
+        self.assertNotEqual(fingerprint, result_cache.request_fingerprint(
+            "hash", [dict(STEPS[0], condition={"strategy": "mean"}), STEPS[1]]))
+
+
+class ResultCacheFileTest(ResultDirMixin, SimpleTestCase):
+
+    def _write(self, file_path, contents=b"data"):
+        with open(file_path, "wb") as f:
+            f.write(contents)
+        return file_path
+
+    def test_file_hash(self):
+        contents = os.urandom(3 * result_cache.HASH_BLOCK_BYTES // 2)
+        file_path = self._write(self.original_path("O_1.csv"), contents)
+        self.assertEqual(result_cache.file_hash(file_path), hashlib.sha256(contents).hexdigest())
+
+    def test_find_cached_result(self):
+        deleted = mock.Mock(FILEPATH=os.path.join(self.work_dir, "P_3.csv"))
+        saved = mock.Mock(FILEPATH=self._write(os.path.join(self.work_dir, "P_2.csv")))
+        preprocessed_data = mock.Mock()
+        preprocessed_data.objects.filter.return_value.order_by.return_value = [deleted, saved]
+        serializer = mock.Mock(side_effect=lambda row: mock.Mock(data=dict(FILEPATH=row.FILEPATH)))
+        with mock.patch.object(result_cache, "PreprocessedData", preprocessed_data), \
+                mock.patch.object(result_cache, "PreprocessedDataSerializer", serializer):
+            self.assertEqual(result_cache.find_cached_result("fingerprint"), dict(FILEPATH=saved.FILEPATH))
+            preprocessed_data.objects.filter.assert_called_once_with(
+                REQUEST_FINGERPRINT="fingerprint", PROGRESS_STATE="success", DELETE_FLAG=False)
+            # FILE_HASH 가 없어 fingerprint 를 만들지 않은 요청은 조회하지 않음
+            self.assertIsNone(result_cache.find_cached_result(None))
+            self.assertEqual(preprocessed_data.objects.filter.call_count, 1)
+
+    def test_cached_result_info(self):
+        cached = dict(FILEPATH="P_2.csv", FILENAME="P_2.csv", SUMMARY="[]", PIPELINE_FILENAME="T_2_pipeline.pickle",
+                      COLUMNS="['a']", STATISTICS="[]", SAMPLE_DATA="{}", AMOUNT=10, REQUEST_FINGERPRINT="f",
+                      PREPROCESSED_DATA_SEQUENCE_PK=2, PROGRESS_STATE="success")
+        info = result_cache.cached_result_info(cached, original_data_pk=5)
+        self.assertEqual(info["ORIGINAL_DATA_SEQUENCE_FK1"], 5)
+        self.assertEqual(info["PIPELINE_FILENAME"], "T_2_pipeline.pickle")
+        self.assertNotIn("PREPROCESSED_DATA_SEQUENCE_PK", info)
+        self.assertNotIn("PROGRESS_STATE", info)
+
+    def test_transformer_files(self):
+        trans_dir = PATH_CONFIG.RESULT_ML_PREPROCESS_TRANS_DIR
+        for name in ("T_2_0.pickle", "T_2_pipeline.pickle", "T_9_0.pickle"):
+            self._write(os.path.join(trans_dir, name))
+        summary = str([{"field_name": "hum", "file_name": "T_2_0.pickle"},
+                       {"field_name": "memo", "file_name": None},
+                       {"field_name": "temp", "file_name": "T_2_1.pickle"}])
+        files = result_cache.transformer_files(dict(
+            SUMMARY=summary, PIPELINE_FILENAME="T_2_pipeline.pickle", PREPROCESSED_DATA_SEQUENCE_PK=2))
+        self.assertEqual([os.path.basename(path) for path in files], ["T_2_0.pickle", "T_2_pipeline.pickle"])
+        # SUMMARY 가 없는 이전 데이터는 T_{pk}_*.pickle
+        files = result_cache.transformer_files(dict(SUMMARY="", PIPELINE_FILENAME=None,
+                                                    PREPROCESSED_DATA_SEQUENCE_PK=9))
+        self.assertEqual([os.path.basename(path) for path in files], ["T_9_0.pickle"])
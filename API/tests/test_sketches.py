@@ -0,0 +1,146 @@
+# API/tests
+"""
+스트리밍 통계 요약 구조(sketches.py)의 오차 한계 확인
+
+from_error(error) 로 만든 스케치가 청크 단위 누적/병합 후에도 허용 오차 안의 값을 반환해야 함
+"""
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ..machine_learning.services.data_preprocess.sketches import QuantileSketch, StreamingHistogram
+from ..machine_learning.services.data_preprocess.sketches import HyperLogLog, MisraGries
+
+ERROR = 0.01
+
+
+def _rank_errors(values, qs, estimates):
+    # 추정값의 실제 순위(비율)와 요청한 분위수의 차이
+    ranks = np.searchsorted(np.sort(values), estimates, side="left") / len(values)
+    return np.abs(ranks - qs)
+
+
+class QuantileSketchTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.values = np.random.RandomState(2019).lognormal(size=100000)
+        self.qs = np.linspace(0.01, 0.99, 99)
+
+    def test_rank_error_of_chunked_updates(self):
+        sketch = QuantileSketch.from_error(ERROR)
+        for chunk in np.array_split(self.values, 37):
+            sketch.update(chunk)
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertLessEqual(_rank_errors(self.values, self.qs, sketch.quantiles(self.qs)).max(), 2 * ERROR)
+        # 메모리는 값의 수가 아니라 k 에 비례
+        self.assertLess(sum(len(buffer) for buffer in sketch.compactors), 20 * sketch.k)
+
+    def test_rank_error_of_merged_sketches(self):
+        sketches = []
+        for chunk in np.array_split(self.values, 8):
+            sketch = QuantileSketch.from_error(ERROR)
+            sketch.update(chunk)
+            sketches.append(sketch)
+        merged = sketches[0]
+        for sketch in sketches[1:]:
+            merged.merge(sketch)
+        self.assertEqual(merged.count, len(self.values))
+        self.assertLessEqual(_rank_errors(self.values, self.qs, merged.quantiles(self.qs)).max(), 2 * ERROR)
+
+    def test_small_input_is_exact(self):
+        sketch = QuantileSketch()
+        sketch.update([3.0, 1.0, 2.0])
+        np.testing.assert_array_equal(sketch.quantiles([0.0, 0.5, 1.0]), [1.0, 2.0, 3.0])
+        self.assertTrue(np.isnan(QuantileSketch().quantiles([0.5])).all())
+
+    def test_histogram_is_scaled_to_count(self):
+        sketch = QuantileSketch.from_error(ERROR)
+        sketch.update(self.values)
+        value_range = (self.values.min(), self.values.max())
+        freq, _ = sketch.histogram(10, value_range)
+        expected, _ = np.histogram(self.values, bins=10, range=value_range)
+        self.assertAlmostEqual(freq.sum(), len(self.values), delta=10)
+        self.assertLessEqual(np.abs(freq - expected).sum() / len(self.values), 4 * ERROR)
+
+
+class StreamingHistogramTest(SimpleTestCase):
+
+    def _assert_close_to_numpy(self, values, chunks, tolerance):
+        histogram = StreamingHistogram()
+        for chunk in chunks:
+            histogram.update(chunk)
+        value_range = (values.min(), values.max())
+        freq, edges = histogram.histogram(10, value_range)
+        expected, expected_edges = np.histogram(values, bins=10, range=value_range)
+        np.testing.assert_allclose(edges, expected_edges)
+        self.assertEqual(freq.sum(), len(values))
+        self.assertLessEqual(np.abs(freq - expected).sum() / len(values), tolerance)
+
+    def test_random_order(self):
+        values = np.random.RandomState(2019).normal(size=100000)
+        self._assert_close_to_numpy(values, np.array_split(values, 50), 0.02)
+
+    def test_range_growing_in_both_directions(self):
+        # 청크마다 범위가 넓어지면 bin 을 합치면서 확장
+        values = np.random.RandomState(2019).normal(size=100000)
+        order = np.argsort(np.abs(values))
+        self._assert_close_to_numpy(values, np.array_split(values[order], 50), 0.03)
+
+    def test_merge_keeps_counts(self):
+        values = np.random.RandomState(2019).uniform(-5, 5, 20000)
+        left, right = StreamingHistogram(), StreamingHistogram()
+        left.update(values[:10000])
+        right.update(values[10000:] * 3)
+        left.merge(right)
+        self.assertEqual(left.counts.sum(), 20000)
+        self.assertLessEqual(left.low, values[10000:].min() * 3)
+
+
+class HyperLogLogTest(SimpleTestCase):
+
+    def test_relative_error(self):
+        for n in (100, 5000, 50000, 300000):
+            numbers, strings = HyperLogLog.from_error(ERROR), HyperLogLog.from_error(ERROR)
+            for chunk in np.array_split(np.arange(n), 7):
+                numbers.update(chunk)
+                strings.update(pd.Series(chunk).astype(str).radd("id-"))
+            self.assertLessEqual(abs(numbers.estimate() / n - 1), ERROR, n)
+            self.assertLessEqual(abs(strings.estimate() / n - 1), ERROR, n)
+
+    def test_duplicates_missing_values_and_merge(self):
+        left, right = HyperLogLog.from_error(ERROR), HyperLogLog.from_error(ERROR)
+        left.update(np.tile(np.arange(1000.0), 5))
+        right.update(np.concatenate([np.arange(500.0, 2000.0), [np.nan] * 100]))
+        self.assertLessEqual(abs(left.estimate() / 1000 - 1), ERROR)
+        self.assertLessEqual(abs(left.merge(right).estimate() / 2000 - 1), ERROR)
+
+
+class MisraGriesTest(SimpleTestCase):
+
+    def test_frequency_error_bound(self):
+        values = np.random.RandomState(2019).zipf(1.5, size=100000)
+        heavy = MisraGries(capacity=50)
+        for chunk in np.array_split(values, 10):
+            heavy.update(chunk)
+        true_counts = pd.Series(values).value_counts()
+        self.assertLessEqual(len(heavy.counts), heavy.capacity)
+        underestimate = true_counts[heavy.counts.index] - heavy.counts
+        # 실제 빈도보다 크지 않고, count / (capacity + 1) 이상 작지 않음
+        self.assertGreaterEqual(underestimate.min(), 0)
+        self.assertLessEqual(underestimate.max(), len(values) / (heavy.capacity + 1))
+        # 빈도가 count / (capacity + 1) 보다 큰 값은 반드시 남아 있음
+        frequent = true_counts[true_counts > len(values) / (heavy.capacity + 1)]
+        self.assertTrue(set(frequent.index) <= set(heavy.counts.index))
+        self.assertEqual(heavy.top(3).index.tolist(), true_counts.index[:3].tolist())
+
+    def test_merge_and_add_counts(self):
+        values = pd.Series(np.random.RandomState(2019).choice(list("aaaabbbcd") + list("efghij"), 10000))
+        left, right = MisraGries.from_error(0.1), MisraGries.from_error(0.1)
+        left.update(values[:5000])
+        right.add_counts(values[5000:].value_counts())
+        left.merge(right)
+        self.assertEqual(left.count, len(values))
+        self.assertEqual(left.top(1).index[0], "a")
+        self.assertLessEqual((values.value_counts()[left.counts.index] - left.counts).max(),
+                             len(values) / (left.capacity + 1))
@@ -0,0 +1,42 @@
+# API/tests
+"""
+희소 컬럼이 있는 학습 데이터의 모델 입력 (MachineLearningTask._model_input) 확인
+
+    TRAIN_CONFIG.SPARSE_ESTIMATORS 의 모델은 csr_matrix, 그 외 모델은 dense DataFrame 으로 학습
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from unittest import mock
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from django.test import SimpleTestCase
+
+from ..config.train_config import TRAIN_CONFIG
+from ..machine_learning.services.model_train.train_helper import MachineLearningTask
+from ..utils.custom_call import to_dense_frame
+
+
+class ModelInputTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        block = sparse.random(50, 4, density=0.2, format="csr", random_state=0)
+        self.x_data = pd.DataFrame.sparse.from_spmatrix(block, columns=["s0", "s1", "s2", "s3"])
+        self.x_data["n"] = np.arange(50.0)
+
+    def test_sparse_estimator(self):
+        x_input = MachineLearningTask._model_input(LogisticRegression(), self.x_data)
+        self.assertTrue(sparse.isspmatrix_csr(x_input))
+        np.testing.assert_array_equal(x_input.toarray(), to_dense_frame(self.x_data).values)
+
+    def test_dense_estimator(self):
+        x_input = MachineLearningTask._model_input(GaussianNB(), self.x_data)
+        self.assertIsInstance(x_input, pd.DataFrame)
+        self.assertFalse(any(isinstance(dtype, pd.SparseDtype) for dtype in x_input.dtypes))
+        with mock.patch.object(TRAIN_CONFIG, "SPARSE_ESTIMATORS", ["GaussianNB"]):
+            self.assertTrue(sparse.isspmatrix_csr(MachineLearningTask._model_input(GaussianNB(), self.x_data)))
+
+    def test_dense_data(self):
+        x_data = pd.DataFrame({"a": [1.0, 2.0]})
+        self.assertIs(MachineLearningTask._model_input(LogisticRegression(), x_data), x_data)
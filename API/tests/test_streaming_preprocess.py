@@ -0,0 +1,122 @@
+# API/tests
+"""
+청크 단위 전처리(StreamingPreprocessTask)와 기존 전처리(PreprocessTask)의 결과 비교
+
+전체 데이터와 같은 결과로 fit 되는 전처리기(scaler, encoder, mean/most_frequent imputer)는
+청크 크기가 행 수보다 작아도 전처리 데이터, 요약 정보, 저장된 전처리기 정보가 같아야 함
+"""
+import numpy as np
+import pandas as pd
+from unittest import mock
+from django.test import SimpleTestCase
+
+from .utils import PreprocessCatalog, ResultDirMixin
+from ..machine_learning.services.data_preprocess import preprocess_helper
+from ..machine_learning.services.data_preprocess.preprocess_helper import PreprocessTask
+from ..machine_learning.services.data_preprocess.streaming_preprocess import StreamingPreprocessTask
+from ..utils.columnar_storage import load_columnar
+from ..utils.custom_call import to_dense_frame
+from ..utils.feature_cache import FeatureCache
+
+N_ROWS = 1000
+CHUNKSIZE = 170
+
+
+def _original_data(n_rows=N_ROWS):
+    rng = np.random.RandomState(2019)
+    return pd.DataFrame({
+        "temp": rng.normal(20, 5, n_rows),
+        "hum": rng.uniform(0, 100, n_rows),
+        "wind": np.where(rng.rand(n_rows) < 0.1, np.nan, rng.exponential(size=n_rows)),
+        "season": rng.choice(["spring", "summer", "fall", "winter"], n_rows),
+        "weather": rng.choice(["clear", "mist", "rain"], n_rows),
+        "holiday": np.where(rng.rand(n_rows) < 0.05, np.nan, rng.choice([0, 1], n_rows)),
+        "label": rng.choice(["a", "b", "c"], n_rows),
+        "memo": "-",
+    })
+
+
+class StreamingPreprocessEquivalenceTest(ResultDirMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data_path = self.original_path("O_1.csv")
+        _original_data().to_csv(self.data_path, index=False)
+        for patcher in (mock.patch.object(preprocess_helper, "preprocess_function_registry",
+                                          PreprocessCatalog()),
+                        mock.patch.object(preprocess_helper, "feature_cache", FeatureCache(self.work_dir, 0))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run_both(self, request_data):
+        request_info = dict(original_data_sequence_pk=1, request_data=request_data)
+        in_memory = PreprocessTask(pk=1).task_result(self.data_path, request_info)
+        streaming = StreamingPreprocessTask(pk=2, chunksize=CHUNKSIZE).task_result(self.data_path, request_info)
+        self.assertTrue(in_memory)
+        self.assertTrue(streaming)
+        return in_memory, streaming
+
+    @staticmethod
+    def _load(result):
+        return to_dense_frame(load_columnar(result["file_path"]))
+
+    def assertSameResult(self, in_memory, streaming):
+        expected, actual = self._load(in_memory), self._load(streaming)
+        self.assertEqual(list(expected.columns), list(actual.columns))
+        self.assertEqual(len(expected), len(actual))
+        for name in expected.columns:
+            if pd.api.types.is_numeric_dtype(expected[name]):
+                np.testing.assert_allclose(actual[name].astype(float), expected[name].astype(float),
+                                           rtol=1e-9, atol=1e-12, err_msg=name)
+            else:  # 전처리하지 않은 범주형 컬럼
+                self.assertEqual(actual[name].astype(str).tolist(), expected[name].astype(str).tolist(), name)
+        for key in ("amount_info", "columns_info", "sample_data"):
+            self.assertEqual(in_memory[key], streaming[key], key)
+        # 저장된 전처리기 정보 (파일명의 요청 ID 만 다름)
+        for expected_step, actual_step in zip(in_memory["summary"], streaming["summary"]):
+            if expected_step["file_name"]:
+                actual_step = dict(actual_step, file_name=actual_step["file_name"].replace("T_2_", "T_1_"))
+            self.assertEqual(expected_step, actual_step)
+
+    def test_exact_fitters(self):
+        request_data = [
+            {"preprocess_functions_sequence_pk": 7, "field_name": "wind"},
+            {"preprocess_functions_sequence_pk": 7, "field_name": "holiday",
+             "condition": {"strategy": "most_frequent"}},
+            {"preprocess_functions_sequence_pk": 1, "field_name": "temp"},
+            {"preprocess_functions_sequence_pk": 2, "field_name": "hum"},
+            {"preprocess_functions_sequence_pk": 3, "field_name": "wind"},
+            {"preprocess_functions_sequence_pk": 4, "field_name": "season"},
+            {"preprocess_functions_sequence_pk": 5, "field_name": "weather"},
+            {"preprocess_functions_sequence_pk": 6, "field_name": "label"},
+            {"preprocess_functions_sequence_pk": 10, "field_name": "memo"},
+        ]
+        self.assertSameResult(*self._run_both(request_data))
+
+    def test_multiple_steps_on_same_field(self):
+        # wind : 결측치 대체 => 표준화 => 최소/최대 스케일 (앞 단계가 fit 되어야 다음 단계를 fit)
+        request_data = [
+            {"preprocess_functions_sequence_pk": 7, "field_name": "wind"},
+            {"preprocess_functions_sequence_pk": 1, "field_name": "wind, temp"},
+            {"preprocess_functions_sequence_pk": 2, "field_name": "wind"},
+            {"preprocess_functions_sequence_pk": 4, "field_name": "season"},
+        ]
+        fit_pass = StreamingPreprocessTask._fit_pass
+        n_pass = []
+
+        def counting_fit_pass(task, data_path):
+            n_pass.append(data_path)
+            return fit_pass(task, data_path)
+
+        with mock.patch.object(StreamingPreprocessTask, "_fit_pass", counting_fit_pass):
+            in_memory, streaming = self._run_both(request_data)
+        self.assertEqual(len(n_pass), 3)
+        self.assertSameResult(in_memory, streaming)
+
+    def test_unsupported_step_falls_back_to_in_memory(self):
+        request_data = [
+            {"preprocess_functions_sequence_pk": 8, "field_name": "hum",
+             "condition": {"strategy": "kmeans", "n_bins": 3}},
+            {"preprocess_functions_sequence_pk": 1, "field_name": "temp"},
+        ]
+        self.assertSameResult(*self._run_both(request_data))
@@ -0,0 +1,112 @@
+# API/tests
+"""
+모델 검증 전략(validation_strategy.py) 확인
+
+    전략별 검증 fit 수와 점수 종류, fit 을 하나씩 나눠 실행한 점수(분산 학습)와
+    한 번에 실행한 점수(run_validation)가 같은지, adaptive 전략의 선택 조건
+"""
+import numpy as np
+import pandas as pd
+from unittest import mock
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+from django.test import SimpleTestCase
+
+from ..config.train_config import TRAIN_CONFIG
+from ..machine_learning.services.model_train import validation_strategy
+from ..machine_learning.services.model_train.validation_strategy import (
+    resolve_validation_strategy, count_probe_fits, run_validation, validation_fits, validation_score,
+    validation_result,
+)
+
+STRATEGIES = ["cv_holdout", "cv_fold_holdout", "cv_only", "holdout_only"]
+
+
+def _train_data(n_rows=300):
+    rng = np.random.RandomState(2019)
+    x_data = pd.DataFrame(rng.normal(size=(n_rows, 3)), columns=["a", "b", "c"])
+    y_data = x_data["a"] * 2 - x_data["b"] + rng.normal(scale=0.1, size=n_rows)
+    return x_data, y_data
+
+
+class RunValidationTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.x_data, self.y_data = _train_data()
+        self.estimator = DecisionTreeRegressor(max_depth=4, random_state=0)
+
+    def test_fits_and_scores_of_strategies(self):
+        k = TRAIN_CONFIG.CV_N_SPLITS
+        expected_fits = dict(cv_holdout=k + 2, cv_fold_holdout=k + 1, cv_only=k + 1, holdout_only=2)
+        for strategy in STRATEGIES:
+            info = run_validation(strategy, self.estimator, self.x_data, self.y_data)
+            self.assertEqual(info["strategy"], strategy)
+            self.assertEqual(info["n_fits"], expected_fits[strategy], strategy)
+            self.assertEqual(info["n_fits"], len(validation_fits(strategy)) + 1, strategy)
+            self.assertEqual(info["cv_score"] is None, strategy == "holdout_only", strategy)
+            self.assertEqual(info["holdout_score"] is None, strategy == "cv_only", strategy)
+            if strategy == "cv_fold_holdout":  # 추가 fit 없이 fold 점수 사용
+                self.assertEqual(info["holdout_score"], info["cv_score"][TRAIN_CONFIG.CV_HOLDOUT_FOLD])
+
+    def test_split_fits_give_same_scores(self):
+        # 분산 학습은 fit 을 하위 작업으로 나눠 실행하므로 같은 분할/같은 점수여야 함
+        for strategy in STRATEGIES:
+            expected = run_validation(strategy, self.estimator, self.x_data, self.y_data, cpu_budget=2)
+            scores = {(kind, index): validation_score(kind, index, self.estimator, self.x_data, self.y_data)
+                      for kind, index in validation_fits(strategy)}
+            actual = validation_result(strategy, scores)
+            for key in ("strategy", "cv_score", "holdout_score", "n_fits"):
+                self.assertEqual(expected[key], actual[key], (strategy, key))
+
+    def test_estimator_is_not_changed(self):
+        estimator = RandomForestRegressor(n_estimators=5, n_jobs=-1, random_state=0)
+        info = run_validation("cv_only", estimator, self.x_data, self.y_data, cpu_budget=2)
+        # CPU 예산은 복사본에만 적용
+        self.assertEqual(estimator.get_params()["n_jobs"], -1)
+        self.assertFalse(hasattr(estimator, "estimators_"))
+        self.assertEqual(info["cv_jobs"], dict(fold_jobs=2, estimator_jobs=1))
+
+
+class ResolveValidationStrategyTest(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.x_data, self.y_data = _train_data()
+        self.estimator = DecisionTreeRegressor(random_state=0)
+
+    def _resolve(self, strategy="adaptive", estimator=None):
+        return resolve_validation_strategy(strategy, estimator or self.estimator, self.x_data, self.y_data)
+
+    def test_requested_strategy(self):
+        self.assertEqual(self._resolve("cv_only"), ("cv_only", dict(requested_strategy="cv_only")))
+        with mock.patch.object(TRAIN_CONFIG, "VALIDATION_STRATEGY", "holdout_only"):
+            self.assertEqual(self._resolve(None)[0], "holdout_only")
+
+    def test_adaptive(self):
+        strategy, info = self._resolve()
+        self.assertEqual(strategy, "cv_fold_holdout")
+        self.assertEqual(info["probe_fits"], 1)
+        self.assertIn("estimated_fit_seconds", info)
+        with mock.patch.object(TRAIN_CONFIG, "ADAPTIVE_CV_MAX_SECONDS", -1):
+            self.assertEqual(self._resolve()[0], "holdout_only")
+        # 행 수가 많으면 fit 시간을 추정하지 않고 holdout_only
+        with mock.patch.object(TRAIN_CONFIG, "ADAPTIVE_CV_MAX_ROWS", 100), \
+                mock.patch.object(validation_strategy, "_estimated_fit_seconds") as estimated:
+            strategy, info = self._resolve()
+        self.assertEqual(strategy, "holdout_only")
+        self.assertNotIn("probe_fits", info)
+        estimated.assert_not_called()
+
+    def test_adaptive_probe_failure(self):
+        strategy, info = self._resolve(estimator=DecisionTreeRegressor(max_depth=-1))
+        self.assertEqual(strategy, "cv_fold_holdout")
+        self.assertEqual(info["reason"], "fit time is not estimated")
+        self.assertEqual(info["probe_fits"], 1)
+
+    def test_count_probe_fits(self):
+        validation_info = dict(strategy="cv_fold_holdout", n_fits=6)
+        count_probe_fits(validation_info, dict(requested_strategy="adaptive", probe_fits=1))
+        self.assertEqual(validation_info["n_fits"], 7)
+        self.assertEqual(validation_info["requested_strategy"], "adaptive")
+        self.assertEqual(count_probe_fits(dict(n_fits=2), dict(requested_strategy="holdout_only"))["n_fits"], 2)
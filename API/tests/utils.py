@@ -0,0 +1,77 @@
+# API/tests
+"""
+테스트에서 공통으로 사용하는 도구
+
+    PreprocessCatalog : DB 의 PreprocessFunction 카탈로그 대신 사용할 전처리 기능 목록
+    ResultDirMixin : 임시 디렉터리를 작업 디렉터리로 사용 (PATH_CONFIG 의 결과 경로가 상대 경로이므로)
+"""
+import os
+import shutil
+import tempfile
+
+from ..config.result_path_config import PATH_CONFIG
+from ..utils.class_registry import resolve_class
+
+
+PREPROCESS_FUNCTIONS = {
+    1: ("preprocessing", "StandardScaler"),
+    2: ("preprocessing", "MinMaxScaler"),
+    3: ("preprocessing", "MaxAbsScaler"),
+    4: ("preprocessing", "OneHotEncoder"),
+    5: ("preprocessing", "OrdinalEncoder"),
+    6: ("preprocessing", "LabelEncoder"),
+    7: ("impute", "SimpleImputer"),
+    8: ("preprocessing", "KBinsDiscretizer"),
+    9: ("preprocessing", "RobustScaler"),
+    10: ("preprocessing", "DropColumns"),
+}
+
+
+class PreprocessCatalog:
+    """
+    utils.class_registry.preprocess_function_registry 와 같은 인터페이스의 전처리 기능 목록
+    (PREPROCESS_FUNCTIONS 의 pk => sklearn 클래스)
+    """
+
+    def row(self, pk):
+        object_name, function_name = PREPROCESS_FUNCTIONS[int(pk)]
+        return dict(PREPROCESS_FUNCTIONS_SEQUENCE_PK=int(pk),
+                    PREPROCESS_FUNCTIONS_NAME=function_name,
+                    LIBRARY_NAME="sklearn",
+                    LIBRARY_OBJECT_NAME=object_name,
+                    LIBRARY_FUNCTION_NAME=function_name)
+
+    def new_instance(self, pk):
+        if PREPROCESS_FUNCTIONS[int(pk)][1] == "DropColumns":
+            return None
+        return resolve_class(self.row(pk))()
+
+    def __contains__(self, pk):
+        try:
+            return int(pk) in PREPROCESS_FUNCTIONS
+        except (TypeError, ValueError):
+            return False
+
+
+class ResultDirMixin:
+    """
+    TestCase mixin running each test in new temporary directory with result directories
+    """
+
+    def setUp(self):
+        super().setUp()
+        self._cwd = os.getcwd()
+        self.work_dir = tempfile.mkdtemp()
+        os.chdir(self.work_dir)
+        for path in (PATH_CONFIG.RESULT_ML_ORIGINAL_DATA_DIR, PATH_CONFIG.RESULT_ML_PREPROCESSED_DATA_DIR,
+                     PATH_CONFIG.RESULT_ML_PREPROCESS_TRANS_DIR, PATH_CONFIG.RESULT_ML_MODEL_DIR):
+            os.makedirs(path, exist_ok=True)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        super().tearDown()
+
+    @staticmethod
+    def original_path(file_name):
+        return os.path.join(PATH_CONFIG.RESULT_ML_ORIGINAL_DATA_DIR, file_name)
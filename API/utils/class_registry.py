@@ -0,0 +1,168 @@
+# API/utils
+"""
+알고리즘(Algorithm) / 전처리 기능(PreprocessFunction) 카탈로그의 클래스 레지스트리
+
+요청마다 카탈로그 행을 DB 에서 읽어 직렬화하고 __import__/getattr 로 클래스를 찾는 대신,
+처음 사용할 때 카탈로그 전체를 한 번 읽어 행(직렬화된 dict)과 클래스를 함께 보관함
+
+    resolve : LIBRARY_NAME.LIBRARY_OBJECT_NAME 모듈의 LIBRARY_FUNCTION_NAME 클래스
+              (`CallMixin._get_base_object` 와 같은 규칙, 클래스별로 한 번만 import)
+    validate : 클래스를 찾지 못하거나 기본 파라미터로 생성할 수 없는 행은 errors 에 기록
+               (해당 행의 new_instance 는 None, DropColumns 와 같이 클래스가 없는 기능 포함)
+    refresh : 같은 프로세스의 변경은 post_save/post_delete signal 로 바로 무효화하고,
+              다른 프로세스(celery worker, admin 등)의 변경은 CATALOG_CHECK_SECONDS 마다
+              카탈로그 값의 해시(version)를 비교해서 바뀐 경우 다시 읽음
+"""
+import time
+import logging
+import threading
+from functools import lru_cache
+from importlib import import_module
+
+from django.db.models.signals import post_save, post_delete
+
+from ..common.models.algorithm import Algorithm
+from ..common.models.preprocess_function import PreprocessFunction
+from ..common.serializers.serializers import ALGOSerializer, PreprocessFunctionSerializer
+
+logger = logging.getLogger("collect_log_utils")
+
+# 다른 프로세스에서 카탈로그가 바뀌었는지 확인하는 간격(초)
+CATALOG_CHECK_SECONDS = 30
+
+
+@lru_cache(maxsize=None)
+def _resolve(library_name, object_name, function_name):
+    try:
+        container = import_module("{}.{}".format(library_name, object_name))
+    except ImportError:
+        # 하위 모듈이 아닌 경우 (eg. 최상위 모듈의 속성)
+        container = getattr(import_module(library_name), object_name)
+    return getattr(container, function_name)
+
+
+def resolve_class(params):
+    """
+    Return class of catalog row 'params' (import is done once per class)
+
+        Parameters:
+        -----------
+             params (dict) : serialized Algorithm or PreprocessFunction
+                             (LIBRARY_NAME, LIBRARY_OBJECT_NAME, LIBRARY_FUNCTION_NAME)
+
+        Raises:
+        -------
+             ImportError, AttributeError : if class is not found
+    """
+    return _resolve(str(params["LIBRARY_NAME"]), str(params["LIBRARY_OBJECT_NAME"]),
+                    str(params["LIBRARY_FUNCTION_NAME"]))
+
+
+class ClassRegistry:
+    """
+    Serialized catalog rows and resolved classes by primary key
+
+        Attributes:
+        -----------
+            model (django.db.models.Model) : Algorithm or PreprocessFunction
+            serializer (ModelSerializer) : serializer of 'model'
+            entries (dict) : pk => dict(row=serialized row, cls=class or None, error=str or None)
+            version (int) : hash of catalog values when 'entries' was loaded
+    """
+
+    def __init__(self, model, serializer):
+        self.model = model
+        self.serializer = serializer
+        self.entries = None
+        self.version = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    def _current_version(self):
+        fields = [field.attname for field in self.model._meta.concrete_fields]
+        return hash(tuple(self.model.objects.order_by("pk").values_list(*fields)))
+
+    def _load(self):
+        entries = dict()
+        for row in self.serializer(self.model.objects.all(), many=True).data:
+            row = dict(row)
+            entry = dict(row=row, cls=None, error=None)
+            try:
+                cls = resolve_class(row)
+                cls()  # 기본 파라미터로 생성 가능한지 확인
+                entry["cls"] = cls
+            except Exception as e:
+                entry["error"] = "{}: {}".format(type(e).__name__, e)
+            entries[row[self.model._meta.pk.name]] = entry
+        failed = {pk: entry["error"] for pk, entry in entries.items() if entry["error"]}
+        if failed:
+            logger.info(f"{self.model.__name__} 카탈로그에서 클래스를 찾지 못한 항목 {failed}")
+        return entries
+
+    def _ensure(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.entries is not None and now - self._checked_at < CATALOG_CHECK_SECONDS:
+                return self.entries
+            version = self._current_version()
+            if self.entries is None or version != self.version:
+                self.entries = self._load()
+                self.version = version
+            self._checked_at = now
+            return self.entries
+
+    def invalidate(self, **kwargs):
+        """
+        Drop loaded entries (reloaded on next access), used as signal receiver
+        """
+        with self._lock:
+            self.entries = None
+
+    def ids(self):
+        return list(self._ensure().keys())
+
+    def __contains__(self, pk):
+        try:
+            return int(pk) in self._ensure()
+        except (TypeError, ValueError):
+            return False
+
+    def row(self, pk):
+        """
+        Return copy of serialized row of 'pk' (same as serializer(model.objects.get(pk=pk)).data)
+
+            Raises:
+            -------
+                 model.DoesNotExist : if 'pk' is not in catalog
+        """
+        try:
+            return dict(self._ensure()[int(pk)]["row"])
+        except (KeyError, TypeError, ValueError):
+            raise self.model.DoesNotExist(f"{self.model.__name__} {pk} does not exist")
+
+    def new_instance(self, pk):
+        """
+        Return new instance of class of 'pk' with default parameters
+        (None if class of the row is not resolved)
+        """
+        try:
+            cls = self._ensure()[int(pk)]["cls"]
+        except (KeyError, TypeError, ValueError):
+            raise self.model.DoesNotExist(f"{self.model.__name__} {pk} does not exist")
+        return None if cls is None else cls()
+
+    def errors(self):
+        """
+        Return pk => error message of rows whose class is not resolved
+        """
+        return {pk: entry["error"] for pk, entry in self._ensure().items() if entry["error"]}
+
+
+algorithm_registry = ClassRegistry(Algorithm, ALGOSerializer)
+preprocess_function_registry = ClassRegistry(PreprocessFunction, PreprocessFunctionSerializer)
+
+for _registry in (algorithm_registry, preprocess_function_registry):
+    post_save.connect(_registry.invalidate, sender=_registry.model, weak=False,
+                      dispatch_uid=f"class_registry_save_{_registry.model.__name__}")
+    post_delete.connect(_registry.invalidate, sender=_registry.model, weak=False,
+                        dispatch_uid=f"class_registry_delete_{_registry.model.__name__}")
@@ -0,0 +1,434 @@
+# API/utils
+"""
+컬럼 단위 바이너리 저장 형식 (.npz)
+
+각 컬럼을 하나의 numpy 배열로 저장하므로 CSV/JSON 파싱 없이 바로 로드할 수 있고,
+np.load 가 컬럼 단위로 지연 로드하기 때문에 필요한 컬럼만 읽을 수 있음
+
+    __columns__ : 컬럼명 배열 (저장 순서 유지)
+    __dtypes__  : 컬럼별 원래 dtype 문자열
+    c{i}        : i 번째 컬럼의 값
+    m{i}        : i 번째 컬럼의 결측값 마스크 (object/category 컬럼인 경우에만 존재)
+    t{i}        : object 컬럼 값별 타입 태그 (TAG_*, 문자열/결측값이 아닌 값이 섞인 경우에만 존재)
+                  (c{i} 에는 값의 문자열 표현을 저장하고 로드할 때 태그의 타입으로 되돌림)
+    k{i}        : category 컬럼의 코드 (c{i}, m{i}, t{i} 에는 범주 목록, dtype 은 'category[:ordered]')
+    p{i}, n{i}  : 희소(SparseArray) 컬럼의 0 이 아닌 값의 위치와 행 수
+                  (c{i} 에는 0 이 아닌 값만 저장, dtype 은 'sparse:{subtype}')
+    __index_dtype__, c_index, ... : 기본 인덱스(0 부터 이어지는 RangeIndex)가 아닌 경우의 인덱스
+                                    (컬럼과 같은 방식으로 저장)
+
+ColumnarWriter 로 청크 단위 저장한 경우 두 번째 청크부터는 'c{i}.{k}', 'm{i}.{k}',
+'__dtypes__.{k}' 로 저장하고 '__parts__' 에 청크 수를 기록함
+
+문자열/정수/실수/bool/None/NaN/list/dict(json) 외의 값이 있는 object 컬럼이나
+중복되거나 문자열이 아닌 컬럼명이 있는 데이터는 저장하지 않고 ColumnarTypeError 를 발생시키므로 호출자는 원래 형식(csv/json)으로 저장해야 함
+"""
+import os
+import json
+import zipfile
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+COLUMNAR_EXT = ".npz"
+_ZIP_MAGIC = b"PK\x03\x04"
+
+# object 컬럼 값의 타입 태그
+TAG_STR, TAG_INT, TAG_FLOAT, TAG_BOOL, TAG_NONE, TAG_NAN, TAG_JSON = range(7)
+_INDEX_ID = "_index"
+
+
+class ColumnarTypeError(TypeError):
+    """
+    Raised when object column has value which cannot be saved in columnar file
+    """
+
+
+def is_columnar_file(file_path):
+    """
+    Return True if 'file_path' is a columnar (.npz) data file
+
+        Parameters:
+        -----------
+             file_path (str) : data file path
+
+        Returns:
+        --------
+             (bool) : True, if extension is '.npz' and file starts with zip magic bytes
+    """
+    if os.path.splitext(file_path)[1] != COLUMNAR_EXT or not os.path.isfile(file_path):
+        return False
+    with open(file_path, "rb") as f:
+        return f.read(4) == _ZIP_MAGIC
+
+
+def columnar_path(file_path):
+    """
+    Return path of the columnar copy of 'file_path'
+    (eg. 'result/ml_result/original_data/O_1.csv' => '.../O_1.npz')
+    """
+    return os.path.splitext(file_path)[0] + COLUMNAR_EXT
+
+
+def fresh_columnar_copy(file_path):
+    """
+    Return path of the columnar copy of 'file_path' if it exists
+    and is not older than 'file_path', otherwise None
+    """
+    copy_path = columnar_path(file_path)
+    if copy_path == file_path or not is_columnar_file(copy_path):
+        return None
+    if os.path.getmtime(copy_path) < os.path.getmtime(file_path):
+        return None
+    return copy_path
+
+
+def _value_tag(value):
+    if value is None:
+        return TAG_NONE
+    if isinstance(value, str):
+        return TAG_STR
+    if isinstance(value, (bool, np.bool_)):
+        return TAG_BOOL
+    if isinstance(value, (int, np.integer)):
+        return TAG_INT
+    if isinstance(value, (float, np.floating)):
+        return TAG_NAN if np.isnan(value) else TAG_FLOAT
+    if isinstance(value, (list, dict)):
+        return TAG_JSON
+    if not isinstance(value, (tuple, set)) and pd.isna(value):  # NaT, pd.NA
+        return TAG_NAN
+    raise ColumnarTypeError("{} 타입의 값은 컬럼 단위 형식으로 저장할 수 없습니다".format(type(value).__name__))
+
+
+def _value_text(value, tag):
+    if tag == TAG_STR:
+        return value
+    if tag == TAG_INT:
+        return str(int(value))
+    if tag == TAG_FLOAT:
+        return repr(float(value))  # repr 은 같은 실수로 되돌릴 수 있음
+    if tag == TAG_BOOL:
+        return str(bool(value))
+    if tag == TAG_JSON:
+        try:
+            return json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            raise ColumnarTypeError(str(e))
+    return ""
+
+
+def _encode_object(values):
+    """
+    Return dict of key prefix => array of object values (c, m and t if values are mixed)
+    """
+    values = np.asarray(values, dtype=object)
+    mask = pd.isna(values)
+    if pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty") \
+            and not any(value is None for value in values[mask]):
+        # 문자열과 NaN 만 있는 경우 (태그 없이 저장)
+        text = values.copy()
+        text[mask] = ""
+        return dict(c=np.asarray(text, dtype=str), m=mask)
+    tags = np.fromiter((_value_tag(value) for value in values), dtype=np.int8, count=len(values))
+    text = [_value_text(value, tag) for value, tag in zip(values, tags)]
+    return dict(c=np.asarray(text, dtype=str), m=mask, t=tags)
+
+
+def _decode_object(values, mask=None, tags=None):
+    decoded = values.astype(object)
+    if tags is None:
+        if mask is not None and mask.any():
+            decoded[mask] = np.nan
+        return decoded
+    decoded[tags == TAG_NAN] = np.nan
+    decoded[tags == TAG_NONE] = None
+    for tag, convert in ((TAG_INT, int), (TAG_FLOAT, float), (TAG_BOOL, lambda text: text == "True"),
+                         (TAG_JSON, json.loads)):
+        for position in np.flatnonzero(tags == tag):
+            decoded[position] = convert(values[position])
+    return decoded
+
+
+def _encode_column(series):
+    """
+    Return (dtype string, dict of key prefix => array) of single column
+    (ColumnarTypeError if object column has value which cannot be saved)
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.SparseDtype) and dtype.fill_value == 0:
+        # 0 이 아닌 값과 그 위치만 저장
+        values = series.array
+        positions = values.sp_index.to_int_index().indices
+        return "sparse:{}".format(dtype.subtype), dict(
+            c=values.sp_values, p=positions.astype(np.int64), n=np.asarray([len(values)]))
+    if isinstance(dtype, pd.SparseDtype):
+        series = pd.Series(np.asarray(series), name=series.name)
+        dtype = series.dtype
+    if dtype.kind in "biufc" and isinstance(dtype, np.dtype):
+        return str(dtype), dict(c=series.values)
+    if dtype.kind == "M" and isinstance(dtype, np.dtype):  # datetime64[ns] (tz 없음)
+        return str(dtype), dict(c=series.values.view("i8"))
+    if isinstance(dtype, pd.CategoricalDtype):
+        # 범주 목록(object 값)과 코드(-1 => 결측값)로 저장
+        arrays = _encode_object(dtype.categories.values)
+        arrays["k"] = np.asarray(series.cat.codes.values, dtype=np.int64)
+        return "category:ordered" if dtype.ordered else "category", arrays
+    # object 등은 값의 문자열 표현과 타입 태그로 저장
+    return "object", _encode_object(series.values)
+
+
+def _decode_column(dtype, values, mask=None, positions=None, length=None, tags=None, codes=None):
+    if dtype.startswith("sparse:"):
+        matrix = sparse.csc_matrix(
+            (values, (positions, np.zeros(len(positions), dtype=np.int64))), shape=(length, 1))
+        return pd.arrays.SparseArray.from_spmatrix(matrix)
+    if dtype == "object":
+        return _decode_object(values, mask, tags)
+    if dtype.startswith("category"):
+        categories = pd.Index(list(_decode_object(values, mask, tags)))
+        return pd.Categorical.from_codes(codes, categories=categories, ordered=dtype.endswith(":ordered"))
+    if dtype.startswith("datetime64"):
+        return values.view(dtype)
+    return values
+
+
+def _concat_values(values):
+    if all(isinstance(v, np.ndarray) for v in values):
+        return np.concatenate(values)
+    # SparseArray 등은 dtype 을 유지하면서 이어붙임
+    return pd.concat([pd.Series(v) for v in values], ignore_index=True).array
+
+
+def _frame(names, decoded, index=None):
+    # object 컬럼은 dtype 을 지정 (문자열 dtype 으로 추론되어 None 이 NaN 으로 바뀌지 않도록)
+    columns = [pd.Series(values, index=index, copy=False,
+                         dtype=object if getattr(values, "dtype", None) == object else None)
+               for values in decoded]
+    return pd.DataFrame(dict(zip(names, columns)), columns=names, index=index)
+
+
+def _part_key(key, part):
+    return key if part == 0 else "{}.{}".format(key, part)
+
+
+class ColumnarWriter:
+    """
+    Write pandas.DataFrame chunks to one columnar binary file (.npz)
+    with memory bounded by single chunk
+
+        Attributes:
+        -----------
+            file_path (str) : saved path (must end with '.npz')
+            columns (list) : column names of first chunk
+            parts (int) : number of written chunks
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.tmp_path = file_path[: -len(COLUMNAR_EXT)] + ".tmp" + COLUMNAR_EXT
+        self.columns = None
+        self.parts = 0
+        self.rows = 0
+        self._zip = zipfile.ZipFile(self.tmp_path, mode="w",
+                                    compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    def _write_array(self, key, array):
+        with self._zip.open(key + ".npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asarray(array), allow_pickle=False)
+
+    def _write_column(self, column_id, encoded):
+        for prefix, array in encoded[1].items():
+            self._write_array(_part_key("{}{}".format(prefix, column_id), self.parts), array)
+
+    def append(self, data):
+        names = list(data.columns)
+        if self.columns is None:
+            # 컬럼명으로 컬럼을 구분하므로 중복되거나 문자열이 아닌 컬럼명은 저장하지 않음
+            if len(set(names)) != len(names) or not all(isinstance(name, str) for name in names):
+                raise ColumnarTypeError("컬럼명이 중복되거나 문자열이 아닌 데이터는 컬럼 단위 형식으로 저장할 수 없습니다")
+            self.columns = names
+        elif names != self.columns:
+            raise ColumnarTypeError("청크의 컬럼이 첫 번째 청크와 다릅니다")
+        # 모든 컬럼을 변환할 수 있는지 먼저 확인 (ColumnarTypeError 이면 아무것도 쓰지 않음)
+        encoded = [_encode_column(data.iloc[:, i]) for i in range(len(self.columns))]
+        index = data.index
+        encoded_index = None
+        if not (isinstance(index, pd.RangeIndex) and index.step == 1 and index.start == self.rows):
+            encoded_index = _encode_column(index.to_series(index=pd.RangeIndex(len(index))))
+        for i, column in enumerate(encoded):
+            self._write_column(i, column)
+        if encoded_index is not None:
+            self._write_column(_INDEX_ID, encoded_index)
+            self._write_array(_part_key("__index_dtype__", self.parts), np.asarray([encoded_index[0]], dtype=str))
+        if self.parts == 0 and isinstance(index.name, str):
+            self._write_array("__index_name__", np.asarray([index.name], dtype=str))
+        self._write_array(_part_key("__dtypes__", self.parts),
+                          np.asarray([dtype for dtype, _ in encoded], dtype=str))
+        self.parts += 1
+        self.rows += len(data)
+
+    def close(self):
+        self._write_array("__columns__", np.asarray(self.columns or [], dtype=str))
+        self._write_array("__parts__", np.asarray([self.parts]))
+        self._zip.close()
+        os.replace(self.tmp_path, self.file_path)
+        return self.file_path
+
+    def abort(self):
+        """
+        Close and remove temporary file without saving
+        """
+        self._zip.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def save_columnar(data, file_path):
+    """
+    Save pandas.DataFrame as columnar binary file (.npz)
+
+        Parameters:
+        -----------
+             data (pandas.DataFrame) : data to save
+             file_path (str) : saved path (must end with '.npz')
+
+        Returns:
+        --------
+             file_path (str) : saved path
+             (ColumnarTypeError if object column has value which cannot be saved
+              or column names are not unique strings)
+    """
+    writer = ColumnarWriter(file_path)
+    try:
+        writer.append(data)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+def read_columnar_columns(file_path):
+    """
+    Return list of column names saved in columnar file without loading values
+    """
+    with np.load(file_path, allow_pickle=False) as loaded:
+        return loaded["__columns__"].tolist()
+
+
+def _selected_positions(all_columns, columns):
+    if columns is None:
+        return list(range(len(all_columns)))
+    position = {name: i for i, name in enumerate(all_columns)}
+    return [position[name] for name in columns if name in position]
+
+
+def _decode_saved(loaded, part, dtype, column_id):
+    arrays = dict()
+    for prefix in "mpntk":
+        key = _part_key("{}{}".format(prefix, column_id), part)
+        arrays[prefix] = loaded[key] if key in loaded.files else None
+    return _decode_column(
+        dtype, loaded[_part_key("c{}".format(column_id), part)], mask=arrays["m"],
+        positions=arrays["p"], length=None if arrays["n"] is None else int(arrays["n"][0]),
+        tags=arrays["t"], codes=arrays["k"])
+
+
+def _decode_part(loaded, part, selected):
+    dtypes = loaded[_part_key("__dtypes__", part)].tolist()
+    return [_decode_saved(loaded, part, dtypes[i], i) for i in selected]
+
+
+def _decode_index(loaded, part, start, length):
+    """
+    Return index of saved chunk 'part' (RangeIndex from 'start' if index was not saved)
+    """
+    key = _part_key("__index_dtype__", part)
+    if key not in loaded.files:
+        return pd.RangeIndex(start, start + length)
+    return pd.Index(_decode_saved(loaded, part, str(loaded[key][0]), _INDEX_ID))
+
+
+def _part_length(loaded, part):
+    # 컬럼이 없는 청크는 행 수를 알 수 없으므로 0
+    key = _part_key("__dtypes__", part)
+    if key not in loaded.files or not len(loaded[key]):
+        return 0
+    dtype = str(loaded[key][0])
+    if dtype.startswith("sparse:"):
+        return int(loaded[_part_key("n0", part)][0])
+    if dtype.startswith("category"):
+        return len(loaded[_part_key("k0", part)])
+    return len(loaded[_part_key("c0", part)])
+
+
+def _index_name(loaded):
+    return str(loaded["__index_name__"][0]) if "__index_name__" in loaded.files else None
+
+
+def iter_columnar_chunks(file_path, columns=None):
+    """
+    Yield saved chunks of columnar binary file as pd.DataFrame
+
+        Parameters:
+        -----------
+             file_path (str) : saved path
+             columns (list) : column names to load (None => all columns)
+
+        Yields:
+        -------
+             chunk (pandas.DataFrame) : one saved chunk
+                                        (저장된 인덱스, 없으면 이전 청크에 이어지는 RangeIndex)
+    """
+    with np.load(file_path, allow_pickle=False) as loaded:
+        all_columns = loaded["__columns__"].tolist()
+        parts = int(loaded["__parts__"][0]) if "__parts__" in loaded.files else 1
+        selected = _selected_positions(all_columns, columns)
+        names = [all_columns[i] for i in selected]
+        start = 0
+        for part in range(parts):
+            length = _part_length(loaded, part)
+            index = _decode_index(loaded, part, start, length)
+            index.name = _index_name(loaded)
+            start += length
+            decoded = _decode_part(loaded, part, selected)
+            yield _frame(names, decoded, index)
+
+
+def load_columnar(file_path, columns=None):
+    """
+    Load columnar binary file (.npz) and Return as pd.DataFrame
+
+        Parameters:
+        -----------
+             file_path (str) : saved path
+             columns (list) : column names to load (None => all columns)
+
+        Returns:
+        --------
+             data (pandas.DataFrame) : loaded data
+    """
+    with np.load(file_path, allow_pickle=False) as loaded:
+        all_columns = loaded["__columns__"].tolist()
+        parts = int(loaded["__parts__"][0]) if "__parts__" in loaded.files else 1
+        selected = _selected_positions(all_columns, columns)
+        names = [all_columns[i] for i in selected]
+        decoded_parts = [_decode_part(loaded, part, selected) for part in range(parts)]
+        index = None
+        if any(_part_key("__index_dtype__", part) in loaded.files for part in range(parts)):
+            indexes, start = [], 0
+            for part in range(parts):
+                length = _part_length(loaded, part)
+                indexes.append(_decode_index(loaded, part, start, length))
+                start += length
+            index = indexes[0].append(indexes[1:]) if parts > 1 else indexes[0]
+        index_name = _index_name(loaded)
+
+    if parts == 1:
+        decoded = decoded_parts[0]
+    else:
+        decoded = [_concat_values([part[i] for part in decoded_parts])
+                   for i in range(len(selected))]
+    data = _frame(names, decoded, index)
+    data.index.name = index_name
+    return data
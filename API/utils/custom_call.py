@@ -5,9 +5,16 @@ import joblib
 import logging
 import numpy as np
 import pandas as pd
+from scipy import sparse
 
 from ..utils.custom_decorator import where_exception
+from ..utils.columnar_storage import is_columnar_file, fresh_columnar_copy, columnar_path
+from ..utils.columnar_storage import load_columnar, save_columnar, read_columnar_columns
+from ..utils.columnar_storage import iter_columnar_chunks, ColumnarWriter
+from ..utils.data_cache import data_cache
+from ..utils.class_registry import resolve_class
 from ..config.result_path_config import PATH_CONFIG
+from ..config.data_config import DATA_CONFIG
 
 ORIGINAL_DATA_DIR = PATH_CONFIG.RESULT_ML_ORIGINAL_DATA_DIR
 # 'result/ml_result/original_data'
@@ -21,26 +28,157 @@ MODEL_DIR = PATH_CONFIG.RESULT_ML_MODEL_DIR
 logger = logging.getLogger("collect_log_utils")
 
 
+def iter_data_chunks(file_path, chunksize=DATA_CONFIG.DATA_CHUNK_ROWS):
+    """
+    Yield data file as pd.DataFrame chunks (memory bounded by chunksize)
+
+        Parameters:
+        -----------
+             file_path (str) : csv, json lines or columnar(npz) file path
+             chunksize (int) : number of rows per chunk
+
+        Yields:
+        -------
+             chunk (pandas.DataFrame) : part of data
+
+    최신 컬럼 단위 사본이 있으면 사본에서 읽고,
+    전처리 데이터의 json(orient='index')은 청크로 나눌 수 없으므로 한 번에 읽음
+    """
+    columnar_copy = fresh_columnar_copy(file_path)
+    file_ext = os.path.splitext(file_path)[1]
+    if is_columnar_file(file_path) or columnar_copy:
+        for chunk in iter_columnar_chunks(columnar_copy or file_path):
+            yield chunk
+    elif file_ext == ".csv":
+        for chunk in pd.read_csv(file_path, chunksize=chunksize):
+            yield chunk
+    elif file_ext == ".json" and os.path.basename(file_path).startswith("P_"):
+        yield pd.read_json(file_path, orient="index").sort_index()
+    elif file_ext == ".json":
+        for chunk in pd.read_json(file_path, lines=True, chunksize=chunksize, encoding="utf-8"):
+            yield chunk
+
+
+def _read_data_file(file_path, base_path, columns=None):
+    file_ext = os.path.splitext(file_path)[1]
+    columnar_copy = fresh_columnar_copy(file_path)
+    if is_columnar_file(file_path) or columnar_copy:
+        # 요청한 컬럼의 배열만 디코딩
+        get_data = load_columnar(columnar_copy or file_path, columns=columns)
+    elif file_ext == ".csv":
+        wanted = None if columns is None else set(columns)
+        usecols = None if wanted is None else (lambda name: name in wanted)
+        get_data = pd.read_csv(file_path, usecols=usecols)
+    elif file_ext == ".json" and base_path == ORIGINAL_DATA_DIR:
+        if columns is None:
+            get_data = pd.read_json(file_path, lines=True, encoding="utf-8")
+        else:
+            # 청크 단위로 읽으면서 필요한 컬럼만 남김 (최대 메모리 = 청크 크기)
+            get_data = pd.concat(
+                [chunk[[c for c in columns if c in chunk.columns]]
+                 for chunk in pd.read_json(file_path, lines=True, encoding="utf-8",
+                                           chunksize=DATA_CONFIG.DATA_CHUNK_ROWS)],
+                ignore_index=True)
+    elif file_ext == ".json" and base_path == PREPROCESSED_DATA_DIR:
+        get_data = pd.read_json(file_path, orient="index").sort_index()
+        if columns is not None:
+            get_data = get_data[[c for c in columns if c in get_data.columns]]
+    return get_data
+
+
+def read_data_columns(file_path):
+    """
+    Return column names of data file reading only its header
+
+        Parameters:
+        -----------
+             file_path (str) : csv, json or columnar(npz) file path
+
+        Returns:
+        --------
+             (list) : column names
+    """
+    columnar_copy = fresh_columnar_copy(file_path)
+    file_ext = os.path.splitext(file_path)[1]
+    if is_columnar_file(file_path) or columnar_copy:
+        return read_columnar_columns(columnar_copy or file_path)
+    elif file_ext == ".csv":
+        return list(pd.read_csv(file_path, nrows=0).columns)
+    return list(next(iter_data_chunks(file_path, chunksize=1)).columns)
+
+
+def to_csr_matrix(data):
+    """
+    Return pd.DataFrame having sparse columns as scipy.sparse.csr_matrix
+
+        Parameters:
+        -----------
+             data (pandas.DataFrame) : numerical data (eg. X of model)
+
+        Returns:
+        --------
+             (scipy.sparse.csr_matrix) : converted data
+             or None if 'data' has no sparse column
+    """
+    if not any(isinstance(dtype, pd.SparseDtype) for dtype in data.dtypes):
+        return None
+    values, rows, indptr = [], [], [0]
+    for name in data.columns:
+        column = data[name].array
+        if isinstance(column, pd.arrays.SparseArray) and column.fill_value == 0:
+            column_rows = column.sp_index.to_int_index().indices
+            column_values = column.sp_values
+        else:
+            column = np.asarray(column, dtype=np.float64)
+            column_rows = np.flatnonzero(column)
+            column_values = column[column_rows]
+        values.append(np.asarray(column_values, dtype=np.float64))
+        rows.append(column_rows)
+        indptr.append(indptr[-1] + len(column_rows))
+    matrix = sparse.csc_matrix(
+        (np.concatenate(values), np.concatenate(rows), np.asarray(indptr)), shape=data.shape)
+    return matrix.tocsr()
+
+
+def to_dense_frame(data):
+    """
+    Return pd.DataFrame whose sparse columns are converted to dense numpy array
+    (for estimators not supporting sparse input)
+    """
+    if not any(isinstance(dtype, pd.SparseDtype) for dtype in data.dtypes):
+        return data
+    return pd.DataFrame(
+        {name: np.asarray(data[name]) for name in data.columns},
+        index=data.index, columns=data.columns)
+
+
 class CallMixin:
     """
     데이터 로드 / 전처리기 로드 또는 저장 / 모델 로드 또는 저장
     """
 
     @staticmethod
-    def _load_data(base_path, file_name):
+    def _load_data(base_path, file_name, copy=False, columns=None):
         """
         Load Data and Return as pd.DataFrame.
 
         Parameters:
         -----------
              file_name (str) : file name
-             (ex. 'P_1.json', 'O_1.csv')
+             (ex. 'P_1.json', 'O_1.csv', 'P_1.npz')
+             copy (bool) : False (default) => shares read-only arrays of the cached DataFrame
+             True, if caller modifies values of data (deep copy of the cached DataFrame)
+             columns (list) : column names to load (None => all columns)
+             (csv => usecols, npz => 요청한 컬럼만 디코딩, json => 청크별로 선택)
 
         Returns:
         --------
              get_data (pandas.DataFrame) :
-             DataFrame loaded from json or csv file
+             DataFrame loaded from json, csv or columnar(npz) file
 
+        한 번 로드한 데이터는 프로세스별 캐시에 보관함 (data_cache.py 참고)
+        파일형식이 npz 이거나 최신 컬럼 단위 사본(O_1.csv => O_1.npz)이 있는 경우,
+            => 파싱 없이 컬럼 단위 바이너리에서 로드 (columnar_storage.py 참고)
         파일형식이 json 인 경우,
         1) 데이터 저장 형태가 다음과 같으면
             => dict like {index -> {column -> value}}
@@ -52,42 +190,83 @@ class CallMixin:
         try:
             if base_path == "ORIGINAL_DATA_DIR":
                 base_path = ORIGINAL_DATA_DIR
-                if os.path.splitext(file_name)[1] == ".csv":
-                    file_path = os.path.join(base_path, file_name)
-                    get_data = pd.read_csv(file_path)
-                elif os.path.splitext(file_name)[1] == ".json":
-                    file_path = os.path.join(base_path, file_name)
-                    get_data = pd.read_json(file_path, lines=True, encoding="utf-8")
             elif base_path == "PREPROCESSED_DATA_DIR":
                 base_path = PREPROCESSED_DATA_DIR
-                if os.path.splitext(file_name)[1] == ".csv":
-                    file_path = os.path.join(base_path, file_name)
-                    get_data = pd.read_csv(file_path)
-                elif os.path.splitext(file_name)[1] == ".json":
-                    file_path = os.path.join(base_path, file_name)
-                    get_data = pd.read_json(file_path, orient="index").sort_index()
+            file_path = os.path.join(base_path, file_name)
+            get_data = data_cache.get(
+                file_path, loader=lambda path, cols: _read_data_file(path, base_path, cols),
+                copy=copy, columns=columns)
             return get_data
         except Exception as e:
             where_exception(error_msg=e)
             return None
 
-    # 오픈소스 라이브러리에서 base object 로드하는 함수
+    # 데이터를 로드하지 않고 컬럼명만 확인하는 함수
+    @staticmethod
+    def _load_columns(base_path, file_name):
+        if base_path == "ORIGINAL_DATA_DIR":
+            base_path = ORIGINAL_DATA_DIR
+        elif base_path == "PREPROCESSED_DATA_DIR":
+            base_path = PREPROCESSED_DATA_DIR
+        return read_data_columns(os.path.join(base_path, file_name))
+
+    # 데이터를 컬럼 단위 바이너리(.npz)로 저장하는 함수
+    @staticmethod
+    def _save_columnar_data(data, file_path):
+        """
+        Save pd.DataFrame as columnar binary file (.npz)
+
+        Parameters:
+        -----------
+             data (pandas.DataFrame) : data to save
+             file_path (str) : saved path
+             (ex. 'result/ml_result/original_data/O_1.npz')
+
+        Returns:
+        --------
+             file_path (str) : saved path
+        """
+        logger.info(f"columnar data saved to {file_path}")
+        return save_columnar(data, file_path)
+
+    # csv/json 파일의 컬럼 단위 사본(.npz)을 청크 단위로 저장하는 함수
+    @staticmethod
+    def _save_columnar_copy(file_path):
+        """
+        Convert csv or json file to columnar copy chunk by chunk
+
+        Parameters:
+        -----------
+             file_path (str) : csv or json file path
+             (ex. 'result/ml_result/original_data/O_1.csv')
+
+        Returns:
+        --------
+             copy_path (str) : saved path of columnar copy
+             (ex. 'result/ml_result/original_data/O_1.npz')
+             or None if conversion failed
+        """
+        copy_path = columnar_path(file_path)
+        if copy_path == file_path:
+            return None
+        writer = None
+        try:
+            writer = ColumnarWriter(copy_path)
+            for chunk in iter_data_chunks(file_path):
+                writer.append(chunk)
+            logger.info(f"columnar copy saved to {copy_path} ({writer.parts} chunks)")
+            return writer.close()
+        except Exception as e:
+            where_exception(error_msg=e)
+            if writer is not None:
+                writer.abort()
+            return None
+
+    # 오픈소스 라이브러리에서 base object 로드하는 함수 (클래스는 한 번만 import, class_registry 참고)
     @staticmethod
     def _get_base_object(params):
         try:
-            module_ = __import__(params["LIBRARY_NAME"])
-            class_ = getattr(module_, str(params["LIBRARY_OBJECT_NAME"]))
-            base_object_ = getattr(class_, params["LIBRARY_FUNCTION_NAME"])
-            base_object = base_object_()
-            return base_object
-        except AttributeError:
-            module_ = __import__(
-                params["LIBRARY_NAME"] + "." + params["LIBRARY_OBJECT_NAME"]
-            )
-            class_ = getattr(module_, params["LIBRARY_OBJECT_NAME"])
-            base_object_ = getattr(class_, params["LIBRARY_FUNCTION_NAME"])
-            base_object = base_object_()
-            return base_object
+            return resolve_class(params)()
         except Exception as e:
             where_exception(error_msg=e)
 
@@ -118,7 +297,7 @@ class CallMixin:
 
 class PreprocessUtils:
     @staticmethod
-    def _to_array(after_fitted):
+    def _to_array(after_fitted, keep_sparse=False):
         """
         Return value as numpy array type
 
@@ -126,14 +305,20 @@ class PreprocessUtils:
             -----------
                  after_fitted (array or csr_matrix) :
                  raw value of preprocessor's 'fit_transform'
+                 keep_sparse (bool) :
+                 True, if sparse matrix with more than one column
+                 is kept sparse (as csc_matrix)
 
             Returns:
             --------
                  after_fitted (array) :
                  value converted to numpy array
+                 (or csc_matrix, if keep_sparse)
         """
         if isinstance(after_fitted, np.ndarray):
             return after_fitted
+        elif keep_sparse and len(after_fitted.shape) == 2 and after_fitted.shape[1] > 1:
+            return after_fitted.tocsc()
         else:
             after_fitted = after_fitted.toarray()
             return after_fitted
@@ -48,10 +48,12 @@ ERROR_CASE_13 = dict(ERROR_CASE_13='NOT INITIATED RESOURCE(HTTP_451_Unavailable
 ############### TEST 요청인데, progress_state가 아직 success 아닌 경우 
 ############### download 요청인데, delete_flag가 TRUE인 경우
 ############### 모델 변경 요청(PATCH)인데 delete_flag가 True인 경우
+############### 원본 데이터 등록(progress_state)이 아직 success 가 아닌데 전처리/학습 요청한 경우
 # ERROR_CASE_10. 요청된 지시를 따를 수 없는 경우(4022)
 ############### 학습 데이터가 numeric이 아닌 경우 (모델생성)
 ############### 컬럼이 일치하지 않는 경우 (모델적용)
 ############### unseen 컬럼이 있는 경우 (모델적용)
+############### 예상 메모리가 worker 메모리 한도를 넘는 경우 (전처리 데이터 생성)
 # ERROR_CASE_11. 모델 생성 요청시 model_parameters로 전달한 값으로 모델 파라미터를 변경할 수 없는 경우(4103)
 # ERROR_CASE_12. 전처리 테스트 도중 발생하는 에러(4104)
 # ERROR_CASE_13. 초기화 되지 않아서 정상작동하지 않는 경우(4051)
@@ -160,6 +162,9 @@ class CustomErrorCode:
         elif mode == 'BATCH':
             response = {'type': '4009', 'title': 'Conflict',
                         'detail': "Conflict with the current state of the Train Model Resource being '{}'".format(error_msg)}
+        elif mode == 'INGEST':
+            response = {'type': '4009', 'title': 'Conflict',
+                        'detail': "Conflict with the current state of the Original Data Resource being '{}'".format(error_msg)}
         return response
 
     def UNPROCESSABLE_ENTITY_4022(self, error_msg):
@@ -0,0 +1,170 @@
+# API/utils
+"""
+프로세스 단위 DataFrame 캐시 (CallMixin._load_data 에서 사용)
+
+같은 원본 데이터를 전처리 테스트(PATCH)/전처리 요청 검사(POST)/celery 작업에서
+반복해서 파싱하지 않도록 로드한 DataFrame 을 메모리에 보관함
+
+    key : (절대경로, 수정시각(ns), 파일크기, 컬럼) => 파일이 바뀌면 자동으로 새로 로드
+          (전체 컬럼이 캐시되어 있으면 일부 컬럼 요청은 캐시된 데이터에서 선택)
+    eviction : 전체 크기(byte)가 max_bytes 를 넘으면 가장 오래 사용하지 않은 데이터부터 제거
+    copy=False (기본값) : 캐시된 배열을 공유하는 새 DataFrame 반환 (읽기만 하는 호출자)
+                          캐시된 배열은 읽기 전용이므로 값을 직접 바꾸면 ValueError 가 발생하고,
+                          컬럼 추가/삭제/교체는 반환된 DataFrame 에만 적용되어 캐시된 데이터는 바뀌지 않음
+                          (값을 바꿔야 하는 컬럼만 호출자가 복사, preprocess_tester.py 참고)
+                          읽기 전용으로 만들 수 없는 컬럼(category/희소 등 extension array)이 있으면 deep copy
+    copy=True : 캐시된 데이터의 deep copy 반환 (데이터 전체를 변경하는 호출자)
+    max_bytes : 웹 서버는 DATA_CONFIG.DATA_CACHE_MAX_BYTES,
+                celery worker 는 DATA_CONFIG.DATA_CACHE_WORKER_MAX_BYTES (use_worker_limit 참고)
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from ..config.data_config import DATA_CONFIG
+
+logger = logging.getLogger("collect_log_utils")
+
+
+def _freeze(data):
+    """
+    Make numpy arrays of 'data' read-only,
+    Return False if 'data' has extension array which cannot be read-only
+    """
+    manager = data._mgr if hasattr(data, "_mgr") else data._data
+    frozen = True
+    for block in manager.blocks:
+        if isinstance(block.values, np.ndarray):
+            block.values.flags.writeable = False
+        else:
+            frozen = False
+    return frozen
+
+
+class DataFrameCache:
+    """
+    Thread safe LRU cache of pandas.DataFrame bounded by total bytes
+
+        Attributes:
+        -----------
+            max_bytes (int) : max total bytes of cached data (0 => disabled)
+            hits (int) : number of requests served from cache
+            misses (int) : number of requests loaded from file
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()  # key => (data, nbytes, shared)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(file_path, columns=None):
+        stat = os.stat(file_path)
+        columns = None if columns is None else tuple(columns)
+        return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, columns
+
+    def _pop(self, key):
+        _, nbytes, _ = self._frames.pop(key)
+        self._bytes -= nbytes
+
+    def _put(self, key, data):
+        nbytes = int(data.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return None
+        shared = _freeze(data)
+        with self._lock:
+            # 같은 경로의 이전 버전(수정시각/크기가 다른 key) 제거
+            for old_key in [k for k in self._frames if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._pop(old_key)
+            self._frames[key] = (data, nbytes, shared)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._frames)))
+        return shared
+
+    def _lookup(self, key):
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None:
+                self._frames.move_to_end(key)
+            return cached
+
+    def get(self, file_path, loader, copy=False, columns=None):
+        """
+        Return cached data of 'file_path' or load it with 'loader'
+
+            Parameters:
+            -----------
+                 file_path (str) : data file path
+                 loader (function) : loader(file_path, columns) => pandas.DataFrame
+                 copy (bool) : False => new DataFrame sharing read-only arrays of cached data,
+                               True => deep copy of cached data
+                 columns (list) : column names to load (None => all columns)
+
+            Returns:
+            --------
+                 data (pandas.DataFrame) : loaded data
+        """
+        if self.max_bytes <= 0:
+            return loader(file_path, columns)
+        key = self._key(file_path, columns)
+        cached = self._lookup(key)
+        data = None if cached is None else cached[0]
+        if cached is None and columns is not None:
+            cached = self._lookup(key[:3] + (None,))
+            if cached is not None:
+                data = cached[0][[c for c in columns if c in cached[0].columns]]
+        with self._lock:
+            if data is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if data is not None:
+            logger.info(f"{file_path} 데이터를 캐시에서 로드했습니다 (hits={self.hits}, misses={self.misses})")
+        else:
+            data = loader(file_path, columns)
+            shared = None if data is None else self._put(key, data)
+            if shared is None:
+                # 캐시에 넣지 않은 데이터(max_bytes 보다 큼)는 복사할 필요 없음
+                return data
+            cached = (data, None, shared)
+        if copy or not cached[2]:
+            return data.copy(deep=True)
+        # 컬럼 추가/삭제가 캐시된 DataFrame 에 적용되지 않도록 배열만 공유
+        return data.copy(deep=False)
+
+    def stats(self):
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, entries=len(self._frames),
+                        bytes=self._bytes, max_bytes=self.max_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def resize(self, max_bytes):
+        """
+        Change max_bytes and evict least recently used data over it
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._frames and self._bytes > max(max_bytes, 0):
+                self._pop(next(iter(self._frames)))
+
+
+data_cache = DataFrameCache(max_bytes=DATA_CONFIG.DATA_CACHE_MAX_BYTES)
+
+
+def use_worker_limit(**kwargs):
+    """
+    Apply DATA_CONFIG.DATA_CACHE_WORKER_MAX_BYTES to data_cache (celery 'worker_init' signal handler)
+    """
+    data_cache.resize(DATA_CONFIG.DATA_CACHE_WORKER_MAX_BYTES)
+    logger.info(f"celery worker DataFrame 캐시 최대 크기 : {data_cache.max_bytes} bytes")
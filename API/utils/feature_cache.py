@@ -0,0 +1,130 @@
+# API/utils
+"""
+컬럼 단위 전처리 결과 캐시 (PreprocessTask._task_result 에서 사용)
+
+같은 원본 데이터에 대한 서로 다른 전처리 요청도 대부분의 컬럼별 단계
+(eg. 'temp' 컬럼의 StandardScaler)가 같으므로, 단계별 변환 결과 블록과
+fit 된 전처리기를 디스크에 저장해두고 다음 요청에서 다시 계산하지 않음
+
+    key : 컬럼 계보(lineage) 해시
+          = sha256(원본 파일 해시, 컬럼명, 해당 컬럼에 앞서 적용된 단계들, 전처리 기능 ID, 파라미터)
+          => 앞 단계가 다르면 같은 컬럼/같은 전처리기라도 다른 key
+    value : dict(changed_field, transformer, encoded_info, routing) (joblib 파일 1개)
+    eviction : 전체 파일 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은(mtime) 파일부터 삭제
+               (여러 celery worker 가 같은 디렉토리를 공유하므로 메모리가 아닌 파일 시각 사용)
+"""
+import os
+import hashlib
+import logging
+import threading
+
+import joblib
+
+from ..config.data_config import DATA_CONFIG
+from ..config.result_path_config import PATH_CONFIG
+
+logger = logging.getLogger("collect_log_utils")
+
+CACHE_EXT = ".joblib"
+
+
+def lineage_key(*parts):
+    """
+    Return sha256 hex digest of 'parts' (used as column lineage and cache key)
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Disk LRU cache of per column preprocessing results bounded by total bytes
+
+        Attributes:
+        -----------
+            cache_dir (str) : directory of cached files
+            max_bytes (int) : max total bytes of cached files (0 => disabled)
+            hits (int) : number of steps served from cache
+            misses (int) : number of steps computed
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0 and os.path.isdir(self.cache_dir)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_EXT)
+
+    def get(self, key):
+        """
+        Return cached dict of 'key' (None if not exists)
+        """
+        if not self.enabled:
+            return None
+        file_path = self._path(key)
+        try:
+            cached = joblib.load(file_path)
+            os.utime(file_path)  # 최근 사용 시각 갱신 (LRU)
+        except (OSError, EOFError, ValueError):  # 없는 파일 또는 다른 프로세스가 삭제/저장 중인 파일
+            cached = None
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cached
+
+    def put(self, key, value):
+        """
+        Save 'value' as cache of 'key' and evict least recently used files
+        """
+        if not self.enabled:
+            return
+        file_path = self._path(key)
+        tmp_path = "{}.{}.{}.tmp".format(file_path, os.getpid(), threading.get_ident())
+        try:
+            joblib.dump(value, tmp_path)
+            os.replace(tmp_path, file_path)
+        except Exception as e:
+            logger.warning(f"컬럼 전처리 결과 캐시 저장에 실패했습니다 ({e})")
+            if os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(CACHE_EXT):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, file_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, max_bytes=self.max_bytes)
+
+
+feature_cache = FeatureCache(
+    cache_dir=PATH_CONFIG.RESULT_ML_FEATURE_CACHE_DIR, max_bytes=DATA_CONFIG.FEATURE_CACHE_MAX_BYTES)
@@ -9,6 +9,7 @@ from datetime import timedelta
 from django.apps import apps
 from django.conf import settings
 from celery.schedules import crontab
+from celery.signals import worker_init
 
 # Django의 세팅 모듈을 Celery의 기본으로 사용하도록 등록합니다.
 
@@ -82,6 +83,14 @@ app.conf.update(
 )
 
 
+# worker 프로세스의 DataFrame 캐시 크기 (DATA_CONFIG.DATA_CACHE_WORKER_MAX_BYTES, 기본값은 사용하지 않음)
+# (worker_init 은 prefork 전에 실행되므로 자식 프로세스도 같은 설정을 사용)
+@worker_init.connect
+def limit_worker_data_cache(**kwargs):
+    from API.utils.data_cache import use_worker_limit
+    use_worker_limit()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print('Request: {0!r}'.format(self.request))